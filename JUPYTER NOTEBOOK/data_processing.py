@@ -147,3 +147,90 @@ class dataset_ABSA(Dataset):
 
     def __len__(self):
         return len(self.data)
+
+# For the joint ATE+ABSA model - one sample per review with its tagged spans and span polarities
+class dataset_joint(Dataset):
+    def __init__(self, df, tokenizer):
+        self.df = df
+        self.tokenizer = tokenizer
+
+    def __getitem__(self, idx):
+        tokens_str, tags_str, pols_str = self.df.iloc[idx, :3].values
+
+        # Parse the string representations of lists
+        tokens = parse_list_string(tokens_str)
+        tags = [int(x) for x in parse_list_string(tags_str)]
+        pols = [int(x) for x in parse_list_string(pols_str)]
+
+        # Start with [CLS] so token positions line up with inference-time encoding
+        bert_tokens = [self.tokenizer.cls_token]
+        bert_tags = [0]
+        spans = [] # (start, end) sub-token positions of each aspect, end exclusive
+        span_pols = []
+        current_start = None
+        current_polarity = -1
+
+        for i in range(len(tokens)):
+            if not tokens[i]:
+                continue
+
+            sub_tokens = self.tokenizer.tokenize(tokens[i])
+            position = len(bert_tokens)
+
+            if tags[i] == 1: # 'b-term' closes any open span and starts a new one
+                if current_start is not None and current_polarity != -1:
+                    spans.append((current_start, position))
+                    span_pols.append(current_polarity)
+                current_start = position
+                current_polarity = pols[i]
+            elif tags[i] == 2: # 'i-term' extends the open span, same polarity rule as dataset_ABSA
+                if current_start is not None and pols[i] != -1:
+                    current_polarity = pols[i]
+            else: # 'non-aspect' (0)
+                if current_start is not None and current_polarity != -1:
+                    spans.append((current_start, position))
+                    span_pols.append(current_polarity)
+                current_start = None
+                current_polarity = -1
+
+            bert_tokens.extend(sub_tokens)
+            bert_tags.extend([tags[i]] * len(sub_tokens))
+
+        # Close any trailing aspect before appending [SEP]
+        if current_start is not None and current_polarity != -1:
+            spans.append((current_start, len(bert_tokens)))
+            span_pols.append(current_polarity)
+
+        bert_tokens.append(self.tokenizer.sep_token)
+        bert_tags.append(0)
+
+        ids_tensor = torch.tensor(self.tokenizer.convert_tokens_to_ids(bert_tokens), dtype=torch.long)
+        tags_tensor = torch.tensor(bert_tags, dtype=torch.long)
+
+        return bert_tokens, ids_tensor, tags_tensor, spans, span_pols
+
+    def __len__(self):
+        return len(self.df)
+
+# Joint: pad ids/tags and build the span mask and span polarity labels (-100 for padded spans)
+def create_mini_batch_joint(samples):
+    batch_size = len(samples)
+    max_len = max(len(s[1]) for s in samples)
+    max_spans = max(1, max(len(s[3]) for s in samples))
+
+    ids_tensors = torch.zeros((batch_size, max_len), dtype=torch.long)
+    tags_tensors = torch.zeros((batch_size, max_len), dtype=torch.long)
+    span_mask = torch.zeros((batch_size, max_spans, max_len), dtype=torch.float)
+    polarity_labels = torch.full((batch_size, max_spans), -100, dtype=torch.long)
+
+    for row, (_, ids_tensor, tags_tensor, spans, span_pols) in enumerate(samples):
+        ids_tensors[row, :len(ids_tensor)] = ids_tensor
+        tags_tensors[row, :len(tags_tensor)] = tags_tensor
+        for span_index, ((start, end), polarity) in enumerate(zip(spans, span_pols)):
+            span_mask[row, span_index, start:end] = 1
+            polarity_labels[row, span_index] = polarity
+
+    masks_tensors = torch.zeros(ids_tensors.shape, dtype=torch.long)
+    masks_tensors = masks_tensors.masked_fill(ids_tensors != 0, 1)
+
+    return ids_tensors, tags_tensors, masks_tensors, span_mask, polarity_labels
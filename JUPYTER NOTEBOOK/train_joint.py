@@ -0,0 +1,154 @@
+# train_joint.py
+# Trains the single-encoder bert_ATE_ABSA model on the same mrt_train.csv / mrt_test.csv
+# files used for bert_ATE and bert_ABSA, and saves it as joint_model_v1.pkl.
+import pandas as pd
+import torch
+from sklearn.metrics import classification_report
+from torch.utils.data import DataLoader
+from transformers import BertTokenizer, get_linear_schedule_with_warmup
+from torch.optim import AdamW
+from transformers import logging
+
+from data_processing import dataset_joint, create_mini_batch_joint
+from bert_ate_absa_models import bert_ATE_ABSA
+
+# Suppress warnings
+logging.set_verbosity_error()
+
+DEVICE = torch.device("cuda:0" if torch.cuda.is_available() else "cpu")
+print("Using device:", DEVICE)
+
+
+# Save and Load Models as .pkl
+def save_model_pkl(model, path):
+    torch.save(model.state_dict(), path)
+
+def load_model_pkl(model, path):
+    model.load_state_dict(torch.load(path, map_location=DEVICE))
+    return model
+
+
+# Joint: Train Model
+def train_joint(loader, val_loader, model, optimizer, epochs, save_path="joint_model_v1.pkl"):
+    print("Starting Joint ATE+ABSA Training...")
+    total_steps = len(loader) * epochs
+    scheduler = get_linear_schedule_with_warmup(
+        optimizer,
+        num_warmup_steps=int(0.1 * total_steps),
+        num_training_steps=total_steps
+    )
+    best_val_loss = float("inf")
+
+    for epoch in range(epochs):
+        print(f"Epoch {epoch + 1}/{epochs}...")
+        model.train()
+        total_loss = 0
+        batch_count = 0
+
+        for ids_tensors, tags_tensors, masks_tensors, span_mask, polarity_labels in loader:
+            batch_count += 1
+            ids_tensors, tags_tensors, masks_tensors, span_mask, polarity_labels = (
+                ids_tensors.to(DEVICE),
+                tags_tensors.to(DEVICE),
+                masks_tensors.to(DEVICE),
+                span_mask.to(DEVICE),
+                polarity_labels.to(DEVICE),
+            )
+
+            optimizer.zero_grad()
+            outputs = model(
+                input_ids=ids_tensors,
+                attention_mask=masks_tensors,
+                span_mask=span_mask,
+                labels=tags_tensors,
+                polarity_labels=polarity_labels
+            )
+            loss = outputs["loss"]
+            loss.backward()
+            optimizer.step()
+            scheduler.step()
+            total_loss += loss.item()
+
+            # Print progress every 10 batches
+            if batch_count % 10 == 0:
+                print(f"  Batch {batch_count}/{len(loader)} - Loss: {loss.item():.4f}")
+
+        print(f"Epoch {epoch + 1} completed. Average Loss: {total_loss / len(loader):.4f}")
+
+        # Validation
+        val_loss = validate_joint(val_loader, model)
+        print(f"  Validation Loss: {val_loss:.4f}")
+
+        if val_loss < best_val_loss:
+            best_val_loss = val_loss
+            save_model_pkl(model, save_path)
+            print("  ✅ Model saved with improved validation loss.")
+
+    print("Joint Training Completed.")
+
+
+# Joint: Validate Model
+def validate_joint(loader, model):
+    model.eval()
+    total_loss = 0
+    with torch.no_grad():
+        for ids_tensors, tags_tensors, masks_tensors, span_mask, polarity_labels in loader:
+            outputs = model(
+                input_ids=ids_tensors.to(DEVICE),
+                attention_mask=masks_tensors.to(DEVICE),
+                span_mask=span_mask.to(DEVICE),
+                labels=tags_tensors.to(DEVICE),
+                polarity_labels=polarity_labels.to(DEVICE)
+            )
+            total_loss += outputs["loss"].item()
+    return total_loss / len(loader)
+
+
+# Joint: Test Model - returns flattened (truths, predictions) for both tasks
+def test_joint(loader, model):
+    model.eval()
+    tag_predictions, tag_truths = [], []
+    pol_predictions, pol_truths = [], []
+    with torch.no_grad():
+        for ids_tensors, tags_tensors, masks_tensors, span_mask, polarity_labels in loader:
+            outputs = model(
+                input_ids=ids_tensors.to(DEVICE),
+                attention_mask=masks_tensors.to(DEVICE),
+                span_mask=span_mask.to(DEVICE)
+            )
+            _, tag_preds = torch.max(outputs["logits"], dim=2)
+            _, pol_preds = torch.max(outputs["polarity_logits"], dim=2)
+
+            for pred, truth, mask in zip(tag_preds.cpu(), tags_tensors, masks_tensors):
+                valid = mask.bool()
+                tag_predictions.extend(pred[valid].tolist())
+                tag_truths.extend(truth[valid].tolist())
+
+            labelled = polarity_labels != -100
+            pol_predictions.extend(pol_preds.cpu()[labelled].tolist())
+            pol_truths.extend(polarity_labels[labelled].tolist())
+
+    return (tag_truths, tag_predictions), (pol_truths, pol_predictions)
+
+
+if __name__ == "__main__":
+    pretrain_model_name = "bert-base-uncased"
+    tokenizer = BertTokenizer.from_pretrained(pretrain_model_name)
+
+    joint_model = bert_ATE_ABSA.from_pretrained(pretrain_model_name)
+    joint_model.to(DEVICE)
+    optimizer_joint = AdamW(joint_model.parameters(), lr=2e-5, weight_decay=1e-4)
+
+    train_ds = dataset_joint(pd.read_csv("mrt_train.csv"), tokenizer)
+    test_ds = dataset_joint(pd.read_csv("mrt_test.csv"), tokenizer)
+    train_loader = DataLoader(train_ds, batch_size=8, collate_fn=create_mini_batch_joint, shuffle=True)
+    test_loader = DataLoader(test_ds, batch_size=8, collate_fn=create_mini_batch_joint, shuffle=False)
+
+    train_joint(train_loader, test_loader, joint_model, optimizer_joint, epochs=3)
+
+    joint_model = load_model_pkl(joint_model, "joint_model_v1.pkl")
+    (tag_truths, tag_preds), (pol_truths, pol_preds) = test_joint(test_loader, joint_model)
+    print("ATE (token BIO) report:")
+    print(classification_report(tag_truths, tag_preds, labels=[0, 1, 2], target_names=['non-aspect', 'b-term', 'i-term'], zero_division=0))
+    print("ABSA (span polarity) report:")
+    print(classification_report(pol_truths, pol_preds, labels=[0, 1, 2], target_names=['Negative', 'Neutral', 'Positive'], zero_division=0))
@@ -1,32 +1,123 @@
 import os
-from flask import Flask
+import threading
+from functools import partial
+from flask import Flask, has_request_context, request
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
 
-db = SQLAlchemy()
 
-def create_app():
+class _DashboardRoutingSession(Session):
+    # With ABSA_DASHBOARD_READONLY, GET requests (the dashboard reads) run on the read-only 'dashboard'
+    # engine so they never queue behind the write connections; everything else uses the default engine
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context() and request.method in ('GET', 'HEAD'):
+            dashboard_engine = self._db.engines.get('dashboard')
+            if dashboard_engine is not None:
+                return dashboard_engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={'class_': _DashboardRoutingSession})
+
+def create_app(load_models=True, service_mode=None, inference_url=None, db_path=None):
+    # service_mode 'full' serves everything and runs the ABSA models in this process. 'dashboard' serves the
+    # read API without ever importing torch/transformers/pandas; inference requests are forwarded to
+    # inference_url (a 'full' process) if one is given, otherwise they answer 503. db_path overrides
+    # ABSA_DB_PATH (use an absolute path; Flask-SQLAlchemy resolves relative ones against instance/).
     app = Flask(__name__)
+    app.config['SERVICE_MODE'] = (service_mode or os.environ.get('ABSA_SERVICE_MODE', 'full')).strip().lower()
+    app.config['INFERENCE_URL'] = inference_url or os.environ.get('ABSA_INFERENCE_URL')
+    print("🧩 Service mode:", app.config['SERVICE_MODE'])
 
     # Use local path instead of OneDrive
-    db_path = r"C:\Users\unitf\OneDrive\Desktop\FYP\mrt_absa_webapp\data\mrt_reviews_copy.db" 
+    db_path = db_path or os.environ.get('ABSA_DB_PATH', r"C:\Users\unitf\OneDrive\Desktop\FYP\mrt_absa_webapp\data\mrt_reviews_copy.db")
     print("📂 DB path:", db_path)
     print("📁 File exists?", os.path.exists(db_path))
 
     app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{db_path}"      
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = _engine_options()
+    if os.environ.get('ABSA_DASHBOARD_READONLY', '0').strip().lower() in ('1', 'true', 'yes'):
+        app.config['SQLALCHEMY_BINDS'] = {'dashboard': f"sqlite:///file:{os.path.abspath(db_path)}?mode=ro&uri=true"}
 
     db.init_app(app)
+    _migrate_database(db_path)
+    with app.app_context():
+        event.listen(db.engine, 'connect', _configure_sqlite_connection)
+        if 'dashboard' in db.engines:
+            event.listen(db.engines['dashboard'], 'connect', partial(_configure_sqlite_connection, read_only=True))
 
     with app.app_context():
         from backend.models import Station, Review
         from backend.routes import bp
         app.register_blueprint(bp)
 
+    # The ABSA models load in the background (see ABSA_MODEL_LOADING) so the dashboard routes serve right away
+    if load_models and app.config['SERVICE_MODE'] != 'dashboard':
+        _start_model_loading()
+
     return app
 
 
+def _engine_options():
+    # SQLAlchemy pools file-backed SQLite connections (QueuePool); size it for the worker's thread count
+    return {
+        'pool_size': int(os.environ.get('ABSA_DB_POOL_SIZE', '5')),
+        'max_overflow': int(os.environ.get('ABSA_DB_MAX_OVERFLOW', '10')),
+        'pool_timeout': float(os.environ.get('ABSA_DB_POOL_TIMEOUT', '30')),
+    }
+
+
+def _configure_sqlite_connection(dbapi_connection, connection_record, read_only=False):
+    # Applied to every new pooled connection. WAL lets the dashboard read while a review is being written
+    # (readers no longer block on the writer), synchronous=NORMAL is durable across application crashes
+    # in WAL mode, and busy_timeout makes a second writer wait for the lock instead of failing with
+    # "database is locked". SQLite only enforces foreign keys on connections that ask for it.
+    journal_mode = os.environ.get('ABSA_SQLITE_JOURNAL_MODE', 'WAL').strip().upper()
+    synchronous = os.environ.get('ABSA_SQLITE_SYNCHRONOUS', 'NORMAL').strip().upper()
+    busy_timeout_ms = int(os.environ.get('ABSA_SQLITE_BUSY_TIMEOUT_MS', '5000'))
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA busy_timeout = {busy_timeout_ms}")
+    if not read_only:
+        # The journal mode is stored in the database file; read-only connections inherit it
+        cursor.execute(f"PRAGMA journal_mode = {journal_mode}")
+    cursor.execute(f"PRAGMA synchronous = {synchronous}")
+    cursor.execute("PRAGMA foreign_keys = ON")
+    cursor.close()
+
+
+def _migrate_database(db_path):
+    # Existing databases predate some columns the models declare; see backend/migrations.py
+    if not os.path.exists(db_path):
+        return
+    import sqlite3
+    from backend.migrations import apply_migrations
+    conn = sqlite3.connect(db_path, timeout=60) # Other workers may hold the lock while they migrate
+    try:
+        applied = apply_migrations(conn)
+    finally:
+        conn.close()
+    if applied:
+        print("🛠️ Applied migrations:", ", ".join(applied))
+
+
+def _start_model_loading():
+    # Importing model_loader (torch, transformers) alone takes seconds, so in 'background' mode
+    # even the import happens on the warm-up thread; 'lazy' leaves everything to the first inference call
+    loading = os.environ.get('ABSA_MODEL_LOADING', 'background').strip().lower()
+    if loading == 'eager':
+        from backend import model_loader
+        model_loader.ensure_models_loaded()
+    elif loading != 'lazy':
+        def warm_up():
+            from backend import model_loader
+            model_loader.ensure_models_loaded()
+        threading.Thread(target=warm_up, name='absa-model-warmup', daemon=True).start()
+
+
 # Optional: Function to initialize the DB if needed
 def init_db():
-    app = create_app()
+    app = create_app(load_models=False)
     with app.app_context():
         db.create_all()
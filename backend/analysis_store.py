@@ -0,0 +1,55 @@
+# backend/analysis_store.py
+# Persistent ABSA results keyed by the hash of the normalized review text (the same normalization the
+# in-process review cache uses), the model_version and the dictionary_version. A review whose text was
+# analysed before with the current models reuses the stored aspects instead of running BERT again.
+# On an existing database it is seeded once from the stored aspect rows (migrations.backfill_analysis_store).
+# Standard library only: the web app (ORM model AnalysisResult), backend/reanalyze.py and backend/ingest.py share it.
+
+import hashlib
+import json
+import re
+from datetime import datetime
+
+INSERT_ANALYSIS_SQL = """
+    INSERT OR IGNORE INTO analysis_results (text_hash, model_version, dictionary_version, aspects, created_at)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+
+def normalize_review_text(text):
+    text = text.lower()
+    # Keep common punctuation that might impact sentiment: .,!?;'
+    # Remove other special characters that are usually noise
+    text = re.sub(r'[^a-z0-9\s.,!?;\'\u2019]', '', text) # \u2019 is unicode for right single quotation mark
+    text = re.sub(r'\s+', ' ', text).strip() # Replace multiple spaces with single space
+    return text
+
+def normalized_text_hash(text):
+    return hashlib.sha1(normalize_review_text(text or "").encode('utf-8')).hexdigest()
+
+def is_storable(aspects):
+    # Model failures are retried next time rather than reused
+    return all(aspect.get('polarity') != "N/A" for aspect in aspects)
+
+def canonical_aspects(aspects):
+    # The shape perform_absa_analysis returns. perform_absa_analysis_bulk also reports where each term was
+    # found, but that belongs to one review's raw text, not to every text that normalizes the same way.
+    return [{'term': aspect['term'], 'category': aspect['category'], 'polarity': aspect['polarity']} for aspect in aspects]
+
+def analysis_row(text_hash, versions, aspects):
+    # Parameters for INSERT_ANALYSIS_SQL
+    return (text_hash, versions[0], versions[1], json.dumps(canonical_aspects(aspects)), datetime.now().isoformat(sep=' ', timespec='seconds'))
+
+def load_stored_analyses(conn, text_hashes, versions, batch_size=500):
+    # {text_hash: aspects} for the hashes already analysed with these (model_version, dictionary_version)
+    text_hashes = list(text_hashes)
+    stored = {}
+    for start in range(0, len(text_hashes), batch_size):
+        batch = text_hashes[start:start + batch_size]
+        placeholders = ','.join('?' * len(batch))
+        for text_hash, aspects in conn.execute(f"""
+                SELECT text_hash, aspects FROM analysis_results
+                WHERE model_version = ? AND dictionary_version = ? AND text_hash IN ({placeholders})
+                """, [*versions, *batch]):
+            stored[text_hash] = canonical_aspects(json.loads(aspects)) # Rows stored before canonical_aspects existed
+    return stored
@@ -0,0 +1,729 @@
+# backend/benchmarks.py
+# Offline benchmarks for the inference code paths. Run from the repository root, e.g.
+#   python -m backend.benchmarks joint --test-csv mrt_test.csv
+#   python -m backend.benchmarks dictionary
+#   python -m backend.benchmarks precision --db data/mrt_reviews_copy.db
+#   python -m backend.benchmarks startup
+#   python -m backend.benchmarks load
+#   python -m backend.benchmarks serve --configs 1x4,2x2,4x1
+#   python -m backend.benchmarks reanalyze --workers 1,2,4,8
+#   python -m backend.benchmarks concurrency --writers 2 --readers 4
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import random
+import re
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+# --- Helpers (shared with backend/export_models.py) ---
+def quiet():
+    # model_loader prints DEBUG lines for every call; keep them out of the timings and the report
+    return contextlib.redirect_stdout(io.StringIO())
+
+def _parse_list_string(list_str):
+    # Same format as the training CSVs (see data_processing.parse_list_string)
+    return [item.strip().replace("'", "") for item in list_str.strip("[]").split(', ')]
+
+def _gold_aspects(tokens, tags, pols):
+    # (aspect term, polarity id) pairs, following the span rules used by dataset_ABSA
+    aspects = []
+    current_tokens = []
+    current_polarity = -1
+    for token, tag, polarity in zip(tokens, tags, pols):
+        if tag == 1:
+            if current_tokens and current_polarity != -1:
+                aspects.append((" ".join(current_tokens), current_polarity))
+            current_tokens = [token]
+            current_polarity = polarity
+        elif tag == 2 and current_tokens:
+            current_tokens.append(token)
+            if polarity != -1:
+                current_polarity = polarity
+        else:
+            if current_tokens and current_polarity != -1:
+                aspects.append((" ".join(current_tokens), current_polarity))
+            current_tokens = []
+            current_polarity = -1
+    if current_tokens and current_polarity != -1:
+        aspects.append((" ".join(current_tokens), current_polarity))
+    return aspects
+
+def _load_labelled_reviews(test_csv, limit=None):
+    import pandas as pd # Imported here so the startup benchmark workers measure a clean import graph
+    df = pd.read_csv(test_csv)
+    if limit:
+        df = df.head(limit)
+    samples = []
+    for tokens_str, tags_str, pols_str in df.iloc[:, :3].values:
+        tokens = _parse_list_string(tokens_str)
+        tags = [int(x) for x in _parse_list_string(tags_str)]
+        pols = [int(x) for x in _parse_list_string(pols_str)]
+        samples.append({'text': " ".join(t for t in tokens if t), 'aspects': _gold_aspects(tokens, tags, pols)})
+    return samples
+
+def latency_summary(timings):
+    timings = sorted(timings)
+    return {
+        'mean_ms': round(statistics.mean(timings) * 1000, 2),
+        'p50_ms': round(timings[len(timings) // 2] * 1000, 2),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000, 2),
+    }
+
+def print_report(title, rows):
+    print(f"\n=== {title} ===")
+    columns = list(rows[0].keys())
+    widths = [max(len(str(c)), *(len(str(r[c])) for r in rows)) for c in columns]
+    print("  ".join(str(c).ljust(w) for c, w in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(str(row[c]).ljust(w) for c, w in zip(columns, widths)))
+
+
+# --- Joint model vs two-model pipeline ---
+def benchmark_joint(test_csv, joint_model_path, limit=None):
+    from backend import model_loader
+    from backend.bert_ate_absa_models import bert_ATE_ABSA
+    from transformers import BertConfig
+
+    with quiet():
+        model_loader.ensure_models_loaded()
+    if model_loader.joint_model is None:
+        model_loader.joint_model = model_loader._load_model_weights(
+            bert_ATE_ABSA, BertConfig.from_pretrained("bert-base-uncased"), model_loader._resolve_weight_path(joint_model_path), "Joint ATE+ABSA")
+    if model_loader.joint_model is None or model_loader.ate_model is None or model_loader.absa_model is None:
+        raise SystemExit("Both the pipeline models and the joint model must load to run this benchmark.")
+
+    samples = _load_labelled_reviews(test_csv, limit)
+    rows = []
+    original_mode = model_loader.INFERENCE_MODE
+    try:
+        for mode in ('pipeline', 'joint'):
+            model_loader.INFERENCE_MODE = mode
+            model_loader.refresh_result_caches() # Measure model cost, not cache hits
+            timings = []
+            true_positive = predicted_total = gold_total = 0
+            polarity_correct = polarity_total = 0
+
+            for sample in samples:
+                with quiet():
+                    start = time.perf_counter()
+                    model_loader.perform_absa_analysis(sample['text'])
+                    timings.append(time.perf_counter() - start)
+
+                    # Accuracy is measured on the model outputs alone, without dictionary matches
+                    if mode == 'joint':
+                        state = model_loader._joint_encode_segments([sample['text']])
+                        predicted_terms = state['terms'][0]
+                        polarities = model_loader._joint_classify_terms(state, [(0, term) for term, _ in sample['aspects']])
+                    else:
+                        predicted_terms = model_loader.extract_aspect_terms_bert(sample['text'])
+                        polarities = model_loader.analyze_sentiment_for_terms_batch([(sample['text'], term) for term, _ in sample['aspects']])
+
+                    gold_terms = {model_loader.preprocess_text(term) for term, _ in sample['aspects']}
+                    predicted_terms = {model_loader.preprocess_text(term) for term in predicted_terms}
+
+                true_positive += len(predicted_terms & gold_terms)
+                predicted_total += len(predicted_terms)
+                gold_total += len(gold_terms)
+                for (_, gold_polarity), predicted in zip(sample['aspects'], polarities):
+                    polarity_total += 1
+                    polarity_correct += int(predicted == model_loader.ABSA_ID2LABEL.get(gold_polarity))
+
+            precision = true_positive / predicted_total if predicted_total else 0.0
+            recall = true_positive / gold_total if gold_total else 0.0
+            f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+            rows.append({
+                'mode': mode,
+                'reviews': len(samples),
+                **latency_summary(timings),
+                'ate_f1': round(f1, 4),
+                'polarity_acc': round(polarity_correct / polarity_total, 4) if polarity_total else 'n/a',
+            })
+    finally:
+        model_loader.INFERENCE_MODE = original_mode
+
+    print_report("Joint ATE+ABSA vs two-model pipeline", rows)
+    return rows
+
+
+# --- Aho-Corasick dictionary matcher vs the per-term regex loop ---
+def _legacy_identify_dictionary_terms(preprocessed_review, dictionary, clean_text):
+    # The original identify_dictionary_terms loop, minus its DEBUG output
+    found = []
+    for term in sorted(dictionary.keys(), key=len, reverse=True):
+        if re.search(r'\b' + re.escape(term) + r'\b', preprocessed_review):
+            categories = dictionary.get(clean_text(term), [])
+            if categories:
+                found.append({'term': term, 'category': categories[0]})
+    return list({item['term']: item for item in found}.values())
+
+def _scaled_dictionary(dictionary, scale):
+    # Pad the real dictionary with (scale - 1) synthetic variants of every term
+    scaled = {term: list(categories) for term, categories in dictionary.items()}
+    for k in range(1, scale):
+        for term, categories in dictionary.items():
+            scaled[f"{term} v{k}"] = list(categories)
+    return scaled
+
+def benchmark_dictionary(dict_path, reviews_dir, scales=(1, 10, 100), limit=50):
+    import pandas as pd
+    from backend import model_loader
+
+    with quiet():
+        model_loader.reload_aspect_dictionary(dict_path)
+    base_dictionary = dict(model_loader.aspect_dictionary)
+    if not base_dictionary:
+        raise SystemExit(f"No dictionary terms loaded from '{dict_path}'.")
+
+    texts = []
+    for csv_path in sorted(glob.glob(os.path.join(reviews_dir, '*.csv'))):
+        texts.extend(pd.read_csv(csv_path)['cleaned_reviews'].dropna().astype(str).tolist())
+    texts = [model_loader._clean_text(text) for text in texts[:limit]]
+
+    rows = []
+    for scale in scales:
+        dictionary = _scaled_dictionary(base_dictionary, scale)
+        build_start = time.perf_counter()
+        matcher = model_loader._build_dictionary_matcher(dictionary)
+        build_seconds = time.perf_counter() - build_start
+
+        legacy_timings, matcher_timings = [], []
+        mismatches = 0
+        for text in texts:
+            start = time.perf_counter()
+            expected = _legacy_identify_dictionary_terms(text, dictionary, model_loader._clean_text)
+            legacy_timings.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            actual = matcher.find(text)
+            matcher_timings.append(time.perf_counter() - start)
+            mismatches += int(actual != expected)
+
+        legacy = latency_summary(legacy_timings)
+        trie = latency_summary(matcher_timings)
+        rows.append({
+            'scale': f"{scale}x",
+            'terms': len(dictionary),
+            'texts': len(texts),
+            'regex_mean_ms': legacy['mean_ms'],
+            'matcher_mean_ms': trie['mean_ms'],
+            'speedup': round(legacy['mean_ms'] / trie['mean_ms'], 1) if trie['mean_ms'] else 'inf',
+            'matcher_build_ms': round(build_seconds * 1000, 1),
+            'mismatches': mismatches,
+        })
+
+    print_report("Dictionary term matching: Aho-Corasick vs per-term regex", rows)
+    return rows
+
+
+# --- fp32 vs int8 vs bf16 inference precision ---
+def sample_reviews(db_path, sample_size, seed):
+    # Deterministic held-out sample of the reviews table, identical in every worker process
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT reviews_id, raw_reviews FROM reviews ORDER BY reviews_id").fetchall()
+    finally:
+        conn.close()
+    rows = [row for row in rows if row[1] and str(row[1]).strip()]
+    return random.Random(seed).sample(rows, min(sample_size, len(rows)))
+
+def _memory_usage_mb():
+    # Current and peak resident set size of this process
+    usage = {}
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith(('VmRSS:', 'VmHWM:')):
+                    key = 'rss_mb' if line.startswith('VmRSS') else 'peak_rss_mb'
+                    usage[key] = round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        import resource
+        usage['peak_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return usage
+
+def _precision_worker(db_path, sample_size, seed, output_path):
+    # Runs in a fresh process so that load time and RSS belong to one precision only
+    load_start = time.perf_counter()
+    with quiet():
+        from backend import model_loader
+        model_loader.ensure_models_loaded()
+    load_seconds = time.perf_counter() - load_start
+    memory_after_load = _memory_usage_mb()
+
+    predictions, timings = {}, []
+    for review_id, text in sample_reviews(db_path, sample_size, seed):
+        with quiet():
+            start = time.perf_counter()
+            results = model_loader.perform_absa_analysis(text)
+            timings.append(time.perf_counter() - start)
+        predictions[str(review_id)] = {item['term']: item['polarity'] for item in results}
+
+    with open(output_path, 'w') as output:
+        json.dump({
+            'precision': model_loader.active_precision,
+            'load_seconds': round(load_seconds, 2),
+            'memory_after_load': memory_after_load,
+            'memory_after_run': _memory_usage_mb(),
+            'timings': timings,
+            'predictions': predictions,
+        }, output)
+
+def benchmark_precision(db_path, sample_size=200, seed=13, precisions=('fp32', 'int8', 'bf16')):
+    runs = {}
+    for precision in precisions:
+        with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as handle:
+            output_path = handle.name
+        env = dict(os.environ, ABSA_INFERENCE_PRECISION=precision, ABSA_MICROBATCH='0',
+                   ABSA_REVIEW_CACHE_SIZE='0', ABSA_SENTIMENT_CACHE_SIZE='0')
+        command = [sys.executable, '-m', 'backend.benchmarks', 'precision-worker', '--db', db_path,
+                   '--sample', str(sample_size), '--seed', str(seed), '--output', output_path]
+        print(f"Running {precision} on {sample_size} sampled reviews...")
+        subprocess.run(command, env=env, check=True, stdout=subprocess.DEVNULL)
+        with open(output_path) as output:
+            runs[precision] = json.load(output)
+        os.remove(output_path)
+
+    reference = runs[precisions[0]]['predictions']
+    rows = []
+    for precision in precisions:
+        run = runs[precision]
+        same_review = same_polarity = shared_terms = 0
+        for review_id, expected in reference.items():
+            actual = run['predictions'].get(review_id, {})
+            same_review += int(actual == expected)
+            for term, polarity in expected.items():
+                if term in actual:
+                    shared_terms += 1
+                    same_polarity += int(actual[term] == polarity)
+        rows.append({
+            'requested': precision,
+            'applied': run['precision'],
+            'load_s': run['load_seconds'],
+            **latency_summary(run['timings']),
+            'rss_mb': run['memory_after_run'].get('rss_mb', 'n/a'),
+            'peak_rss_mb': run['memory_after_run'].get('peak_rss_mb', 'n/a'),
+            'review_match': round(same_review / len(reference), 4) if reference else 'n/a',
+            'polarity_match': round(same_polarity / shared_terms, 4) if shared_terms else 'n/a',
+        })
+
+    print_report(f"Inference precision vs {precisions[0]} ({len(reference)} reviews from {db_path})", rows)
+    return rows
+
+
+# --- Startup cost of the 'full' vs 'dashboard' service modes ---
+def _startup_worker(db_path, service_mode, output_path):
+    # Runs in a fresh process: time create_app and the first dashboard request, then report RSS and heavy imports
+    os.environ['ABSA_DB_PATH'] = os.path.abspath(db_path)
+    start = time.perf_counter()
+    with quiet():
+        from backend import create_app
+        app = create_app(service_mode=service_mode)
+    create_seconds = time.perf_counter() - start
+
+    with quiet():
+        response = app.test_client().get('/api/dashboard/overall_sentiment')
+    first_request_seconds = time.perf_counter() - start
+    heavy_modules = [name for name in ('torch', 'transformers', 'pandas') if name in sys.modules]
+
+    # In full mode, also wait for the background model warm-up so RSS includes the weights
+    if app.config['SERVICE_MODE'] != 'dashboard':
+        with quiet():
+            from backend import model_loader
+            model_loader.ensure_models_loaded()
+    ready_seconds = time.perf_counter() - start
+
+    with open(output_path, 'w') as output:
+        json.dump({
+            'create_app_s': round(create_seconds, 3),
+            'first_dashboard_response_s': round(first_request_seconds, 3),
+            'models_ready_s': round(ready_seconds, 3) if app.config['SERVICE_MODE'] != 'dashboard' else 'n/a',
+            'status': response.status_code,
+            'heavy_modules': heavy_modules,
+            **_memory_usage_mb(),
+        }, output)
+
+def benchmark_startup(db_path, modes=('full', 'dashboard')):
+    rows = []
+    for mode in modes:
+        with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as handle:
+            output_path = handle.name
+        command = [sys.executable, '-m', 'backend.benchmarks', 'startup-worker', '--db', db_path,
+                   '--mode', mode, '--output', output_path]
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        with open(output_path) as output:
+            result = json.load(output)
+        os.remove(output_path)
+        rows.append({'service_mode': mode, **result, 'heavy_modules': ','.join(result['heavy_modules']) or '-'})
+
+    print_report(f"Startup cost per service mode ({db_path})", rows)
+    return rows
+
+
+# --- Model load time and memory per weight format ---
+def _load_worker(output_path):
+    start = time.perf_counter()
+    with quiet():
+        from backend import model_loader
+        model_loader.ensure_models_loaded()
+    load_seconds = time.perf_counter() - start
+    with open(output_path, 'w') as output:
+        json.dump({
+            'state': model_loader.model_load_state,
+            'weights': ','.join(os.path.basename(path) for path in model_loader.loaded_model_paths),
+            'load_s': round(load_seconds, 3),
+            **_memory_usage_mb(),
+        }, output)
+
+def benchmark_load(weight_formats=('pickle', 'auto')):
+    # 'auto' picks up the .safetensors files written by `python -m backend.convert_weights`
+    rows = []
+    for weight_format in weight_formats:
+        with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as handle:
+            output_path = handle.name
+        env = dict(os.environ, ABSA_WEIGHT_FORMAT=weight_format)
+        subprocess.run([sys.executable, '-m', 'backend.benchmarks', 'load-worker', '--output', output_path],
+                       env=env, check=True, stdout=subprocess.DEVNULL)
+        with open(output_path) as output:
+            rows.append({'weight_format': weight_format, **json.load(output)})
+        os.remove(output_path)
+
+    print_report("Model load time and memory per weight format", rows)
+    return rows
+
+
+# --- Pre-fork serving throughput per worker / torch-thread configuration ---
+def _process_tree_memory_mb(root_pid):
+    # RSS counts shared weight pages once per process; PSS splits them between the processes sharing them
+    pids, queue = [], [root_pid]
+    while queue:
+        pid = queue.pop()
+        pids.append(pid)
+        try:
+            with open(f"/proc/{pid}/task/{pid}/children") as children:
+                queue.extend(int(child) for child in children.read().split())
+        except OSError:
+            pass
+    totals = {'processes': len(pids), 'rss_mb': 0.0, 'pss_mb': 0.0}
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/smaps_rollup") as rollup:
+                for line in rollup:
+                    if line.startswith(('Rss:', 'Pss:')):
+                        key = 'rss_mb' if line.startswith('Rss') else 'pss_mb'
+                        totals[key] += int(line.split()[1]) / 1024
+        except OSError:
+            pass
+    return {key: round(value, 1) if isinstance(value, float) else value for key, value in totals.items()}
+
+def _wait_until_ready(base_url, process, timeout=600):
+    from backend import inference_client
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"gunicorn exited with code {process.returncode} before becoming ready.")
+        if inference_client.get_model_load_status(base_url, timeout=2).get('ready'):
+            return
+        time.sleep(0.5)
+    raise SystemExit(f"{base_url} did not become ready within {timeout}s.")
+
+def _drive_load(base_url, texts, clients, duration):
+    # Closed loop: every client sends its next review as soon as the previous answer arrives
+    from concurrent.futures import ThreadPoolExecutor
+    from backend import inference_client
+
+    deadline = time.perf_counter() + duration
+    def client(offset):
+        timings, errors, index = [], 0, offset
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                inference_client.analyze_review(base_url, texts[index % len(texts)])
+                timings.append(time.perf_counter() - start)
+            except Exception:
+                errors += 1
+            index += clients
+        return timings, errors
+
+    with ThreadPoolExecutor(clients) as executor:
+        results = list(executor.map(client, range(clients)))
+    timings = [t for client_timings, _ in results for t in client_timings]
+    return timings, sum(errors for _, errors in results)
+
+def benchmark_serve(db_path, configs=('1x1', '2x1'), clients=8, duration=20.0, sample_size=200, seed=13, port=5077):
+    texts = [text for _, text in sample_reviews(db_path, sample_size, seed)]
+    conf_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gunicorn.conf.py')
+    rows = []
+    for config in configs:
+        workers, torch_threads = (int(part) for part in config.lower().split('x'))
+        base_url = f"http://127.0.0.1:{port}"
+        # Caches off, so every request reaches the models
+        env = dict(os.environ, ABSA_WORKERS=str(workers), ABSA_TORCH_THREADS=str(torch_threads),
+                   ABSA_WORKER_THREADS=str(max(4, clients // workers)), ABSA_BIND=f"127.0.0.1:{port}",
+                   ABSA_DB_PATH=os.path.abspath(db_path), ABSA_REVIEW_CACHE_SIZE='0', ABSA_SENTIMENT_CACHE_SIZE='0')
+        print(f"Serving with {workers} workers x {torch_threads} torch threads...")
+        process = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', conf_path, 'backend.wsgi:app'],
+                                   env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            _wait_until_ready(base_url, process)
+            _drive_load(base_url, texts, clients, min(3.0, duration)) # Warm-up
+            timings, errors = _drive_load(base_url, texts, clients, duration)
+            memory = _process_tree_memory_mb(process.pid)
+        finally:
+            process.terminate()
+            process.wait()
+        rows.append({
+            'workers': workers,
+            'torch_threads': torch_threads,
+            'clients': clients,
+            'req_per_s': round(len(timings) / duration, 2),
+            **(latency_summary(timings) if timings else {}),
+            'errors': errors,
+            **memory,
+        })
+
+    print_report(f"Pre-fork serving throughput ({len(texts)} reviews from {db_path}, {duration:.0f}s per config)", rows)
+    return rows
+
+
+# --- Bulk re-analysis scaling across worker processes ---
+def benchmark_reanalyze(db_path, worker_counts=(1, 2, 4, 8), limit=2000, chunk_size=128):
+    import shutil
+    from backend import reanalyze
+
+    rows = []
+    for workers in worker_counts:
+        # Each run writes into its own copy of the database
+        with tempfile.TemporaryDirectory() as scratch:
+            db_copy = os.path.join(scratch, 'reanalyze.db')
+            shutil.copyfile(db_path, db_copy)
+            print(f"Re-analysing {limit} reviews with {workers} worker(s)...")
+            with quiet():
+                start = time.perf_counter()
+                checkpoint = reanalyze.reanalyze(db_copy, job_name='benchmark', chunk_size=chunk_size, limit=limit, workers=workers)
+                seconds = time.perf_counter() - start
+        rows.append({
+            'workers': workers,
+            'torch_threads': max(1, (os.cpu_count() or 1) // workers) if workers > 1 else 'default',
+            'reviews': checkpoint['reviews_done'],
+            'wall_s': round(seconds, 2), # Includes every worker loading its models
+            'reviews_per_s': round(checkpoint['reviews_per_second'], 1),
+        })
+    baseline = rows[0]['reviews_per_s'] or 1
+    for row in rows:
+        row['speedup'] = round(row['reviews_per_s'] / baseline, 2)
+
+    print_report(f"Bulk re-analysis scaling ({limit} reviews, {os.cpu_count()} cores)", rows)
+    return rows
+
+
+# --- Concurrent review submissions and dashboard reads ---
+# SQLite settings compared by the concurrency benchmark; each is applied through the environment of the worker processes
+SQLITE_SETTINGS = {
+    'rollback-journal': {'ABSA_SQLITE_JOURNAL_MODE': 'DELETE', 'ABSA_SQLITE_SYNCHRONOUS': 'FULL', 'ABSA_SQLITE_BUSY_TIMEOUT_MS': '0'},
+    'wal': {},
+    'wal-readonly-dashboard': {'ABSA_DASHBOARD_READONLY': '1'},
+}
+
+def _concurrency_worker(db_path, role, start_at, duration, output_path):
+    # One closed-loop client in its own process (its own connection pool, like a gunicorn worker).
+    # Writers submit pre-analysed reviews, so no model is needed; readers cycle through the dashboard endpoints.
+    from backend.query_plans import DASHBOARD_ENDPOINTS
+    with quiet():
+        from backend import create_app
+        app = create_app(service_mode='dashboard', db_path=os.path.abspath(db_path))
+    client = app.test_client()
+    with sqlite3.connect(db_path) as conn:
+        station_ids = [row[0] for row in conn.execute("SELECT station_id FROM stations ORDER BY station_id")]
+
+    timings, errors, index = [], {}, 0
+    time.sleep(max(0.0, start_at - time.time()))
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        station_id = station_ids[index % len(station_ids)]
+        start = time.perf_counter()
+        with quiet():
+            if role == 'writer':
+                response = client.post('/api/reviews', json={
+                    'stationId': station_id,
+                    'review': f"Concurrency benchmark review {os.getpid()}-{index}: the platform was crowded.",
+                    'analyzedAspects': [{'category': 'crowdedness', 'polarity': 'Negative', 'term': 'platform'}],
+                })
+            else:
+                response = client.get(DASHBOARD_ENDPOINTS[index % len(DASHBOARD_ENDPOINTS)].format(station_id=station_id))
+        if response.status_code == 200:
+            timings.append(time.perf_counter() - start)
+        else:
+            error = (response.get_json(silent=True) or {}).get('error', str(response.status_code))
+            errors[error] = errors.get(error, 0) + 1
+        index += 1
+
+    with open(output_path, 'w') as output:
+        json.dump({'timings': timings, 'errors': errors}, output)
+
+def run_concurrency_workers(db_path, writers, readers, duration, environment=None, start_delay=10.0):
+    # Runs the writer and reader processes against db_path (which they modify) and returns
+    # {role: (timings of the successful requests, {error: count})}. tests/test_concurrency.py uses it too.
+    start_at = time.time() + start_delay # Leaves every worker time to create its app
+    repository_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as scratch:
+        workers = []
+        for number, role in enumerate(['writer'] * writers + ['reader'] * readers):
+            output_path = os.path.join(scratch, f'{role}-{number}.json')
+            command = [sys.executable, '-m', 'backend.benchmarks', 'concurrency-worker', '--db', os.path.abspath(db_path),
+                       '--role', role, '--start-at', str(start_at), '--duration', str(duration), '--output', output_path]
+            workers.append((role, output_path, subprocess.Popen(command, env=environment or dict(os.environ), cwd=repository_root,
+                                                                stdout=subprocess.DEVNULL)))
+
+        results = {'writer': ([], {}), 'reader': ([], {})}
+        for role, output_path, process in workers:
+            if process.wait() != 0:
+                raise SystemExit(f"A {role} worker exited with code {process.returncode}.")
+            with open(output_path) as output:
+                result = json.load(output)
+            results[role][0].extend(result['timings'])
+            for error, count in result['errors'].items():
+                results[role][1][error] = results[role][1].get(error, 0) + count
+    return results
+
+def benchmark_concurrency(db_path, writers=2, readers=4, duration=10.0, settings=tuple(SQLITE_SETTINGS)):
+    import shutil
+
+    rows = []
+    failed = False
+    for setting in settings:
+        with tempfile.TemporaryDirectory() as scratch:
+            # Every setting starts from a fresh copy in rollback-journal mode (WAL is stored in the file)
+            db_copy = os.path.join(scratch, 'concurrency.db')
+            shutil.copyfile(db_path, db_copy)
+            with sqlite3.connect(db_copy) as conn:
+                conn.execute("PRAGMA journal_mode = DELETE")
+            results = run_concurrency_workers(db_copy, writers, readers, duration, {**os.environ, **SQLITE_SETTINGS[setting]})
+
+        for role, (timings, errors) in results.items():
+            rows.append({
+                'setting': setting,
+                'role': role,
+                'ok_per_s': round(len(timings) / duration, 1),
+                **(latency_summary(timings) if timings else {'mean_ms': '-', 'p50_ms': '-', 'p95_ms': '-'}),
+                'errors': sum(errors.values()),
+                'first_error': next(iter(errors), '-')[:40],
+            })
+            if errors and setting != 'rollback-journal':
+                failed = True
+
+    print_report(f"{writers} writer(s) on /api/reviews and {readers} dashboard reader(s) for {duration:.0f}s", rows)
+    if failed:
+        # The rollback-journal row is the baseline; the configured settings must not fail any request
+        raise SystemExit(1)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks for the MRT ABSA inference paths.")
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    joint_parser = subparsers.add_parser('joint', help="Latency and accuracy of the joint model vs the two-model pipeline.")
+    joint_parser.add_argument('--test-csv', required=True, help="Labelled CSV with tokens, tags and polarities columns (e.g. mrt_test.csv).")
+    joint_parser.add_argument('--joint-model', default='joint_model_v1.pkl', help="Path to the trained bert_ATE_ABSA state dict.")
+    joint_parser.add_argument('--limit', type=int, default=None, help="Only use the first N reviews.")
+
+    dictionary_parser = subparsers.add_parser('dictionary', help="Dictionary term matching at 1x, 10x and 100x dictionary sizes.")
+    dictionary_parser.add_argument('--dictionary', default=os.path.join('data', 'aspect_dictionary.csv'))
+    dictionary_parser.add_argument('--reviews-dir', default='mrt_reviews_csvs', help="Directory of station CSVs with a cleaned_reviews column.")
+    dictionary_parser.add_argument('--limit', type=int, default=50, help="Number of reviews to match (the regex loop is slow at 100x).")
+
+    precision_parser = subparsers.add_parser('precision', help="Accuracy, latency and RSS of fp32 vs int8 vs bf16 inference.")
+    precision_parser.add_argument('--db', default=os.path.join('data', 'mrt_reviews_copy.db'), help="SQLite database with a reviews table.")
+    precision_parser.add_argument('--sample', type=int, default=200, help="Number of held-out reviews to compare on.")
+    precision_parser.add_argument('--seed', type=int, default=13)
+    precision_parser.add_argument('--precisions', default='fp32,int8,bf16', help="Comma-separated list; the first one is the reference.")
+
+    worker_parser = subparsers.add_parser('precision-worker', help=argparse.SUPPRESS)
+    worker_parser.add_argument('--db', required=True)
+    worker_parser.add_argument('--sample', type=int, required=True)
+    worker_parser.add_argument('--seed', type=int, required=True)
+    worker_parser.add_argument('--output', required=True)
+
+    startup_parser = subparsers.add_parser('startup', help="create_app time, first dashboard response and RSS per service mode.")
+    startup_parser.add_argument('--db', default=os.path.join('data', 'mrt_reviews_copy.db'))
+    startup_parser.add_argument('--modes', default='full,dashboard')
+
+    startup_worker_parser = subparsers.add_parser('startup-worker', help=argparse.SUPPRESS)
+    startup_worker_parser.add_argument('--db', required=True)
+    startup_worker_parser.add_argument('--mode', required=True)
+    startup_worker_parser.add_argument('--output', required=True)
+
+    load_parser = subparsers.add_parser('load', help="Model load time and peak RSS with pickled vs safetensors weights.")
+    load_parser.add_argument('--formats', default='pickle,auto', help="Comma-separated ABSA_WEIGHT_FORMAT values.")
+
+    load_worker_parser = subparsers.add_parser('load-worker', help=argparse.SUPPRESS)
+    load_worker_parser.add_argument('--output', required=True)
+
+    serve_parser = subparsers.add_parser('serve', help="Requests/s, latency and memory of gunicorn at several workers x torch threads.")
+    serve_parser.add_argument('--db', default=os.path.join('data', 'mrt_reviews_copy.db'))
+    serve_parser.add_argument('--configs', default='1x1,2x1', help="Comma-separated WORKERSxTORCH_THREADS, e.g. 1x4,2x2,4x1.")
+    serve_parser.add_argument('--clients', type=int, default=8, help="Concurrent closed-loop clients.")
+    serve_parser.add_argument('--duration', type=float, default=20.0, help="Seconds measured per configuration.")
+    serve_parser.add_argument('--sample', type=int, default=200)
+    serve_parser.add_argument('--port', type=int, default=5077)
+
+    reanalyze_parser = subparsers.add_parser('reanalyze', help="Bulk re-analysis throughput at 1, 2, 4 and 8 worker processes.")
+    reanalyze_parser.add_argument('--db', default=os.path.join('data', 'mrt_reviews_copy.db'), help="Copied for every run, never modified.")
+    reanalyze_parser.add_argument('--workers', default='1,2,4,8')
+    reanalyze_parser.add_argument('--limit', type=int, default=2000, help="Reviews re-analysed per run.")
+    reanalyze_parser.add_argument('--chunk-size', type=int, default=128)
+
+    concurrency_parser = subparsers.add_parser('concurrency', help="Review submissions and dashboard reads at the same time, per SQLite setting.")
+    concurrency_parser.add_argument('--db', default=os.path.join('data', 'mrt_reviews_copy.db'), help="Copied for every setting, never modified.")
+    concurrency_parser.add_argument('--writers', type=int, default=2, help="Processes submitting reviews.")
+    concurrency_parser.add_argument('--readers', type=int, default=4, help="Processes requesting dashboard endpoints.")
+    concurrency_parser.add_argument('--duration', type=float, default=10.0, help="Seconds measured per setting.")
+    concurrency_parser.add_argument('--settings', default=','.join(SQLITE_SETTINGS))
+
+    concurrency_worker_parser = subparsers.add_parser('concurrency-worker', help=argparse.SUPPRESS)
+    concurrency_worker_parser.add_argument('--db', required=True)
+    concurrency_worker_parser.add_argument('--role', choices=('writer', 'reader'), required=True)
+    concurrency_worker_parser.add_argument('--start-at', type=float, required=True)
+    concurrency_worker_parser.add_argument('--duration', type=float, required=True)
+    concurrency_worker_parser.add_argument('--output', required=True)
+
+    args = parser.parse_args(argv)
+    if args.benchmark == 'joint':
+        benchmark_joint(args.test_csv, args.joint_model, args.limit)
+    elif args.benchmark == 'dictionary':
+        benchmark_dictionary(args.dictionary, args.reviews_dir, limit=args.limit)
+    elif args.benchmark == 'precision':
+        benchmark_precision(args.db, args.sample, args.seed, tuple(p.strip() for p in args.precisions.split(',') if p.strip()))
+    elif args.benchmark == 'precision-worker':
+        _precision_worker(args.db, args.sample, args.seed, args.output)
+    elif args.benchmark == 'startup':
+        benchmark_startup(args.db, tuple(m.strip() for m in args.modes.split(',') if m.strip()))
+    elif args.benchmark == 'startup-worker':
+        _startup_worker(args.db, args.mode, args.output)
+    elif args.benchmark == 'serve':
+        benchmark_serve(args.db, tuple(c.strip() for c in args.configs.split(',') if c.strip()),
+                        args.clients, args.duration, args.sample, port=args.port)
+    elif args.benchmark == 'reanalyze':
+        benchmark_reanalyze(args.db, tuple(int(w) for w in args.workers.split(',') if w.strip()), args.limit, args.chunk_size)
+    elif args.benchmark == 'load':
+        benchmark_load(tuple(f.strip() for f in args.formats.split(',') if f.strip()))
+    elif args.benchmark == 'load-worker':
+        _load_worker(args.output)
+    elif args.benchmark == 'concurrency':
+        benchmark_concurrency(args.db, args.writers, args.readers, args.duration,
+                              tuple(s.strip() for s in args.settings.split(',') if s.strip()))
+    elif args.benchmark == 'concurrency-worker':
+        _concurrency_worker(args.db, args.role, args.start_at, args.duration, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -51,3 +51,50 @@ class bert_ABSA(BertPreTrainedModel):
             return {"loss": loss, "logits": logits}
         else:
             return {"logits": logits}
+
+
+class bert_ATE_ABSA(BertPreTrainedModel):
+    # Joint model: one BERT pass tags aspect spans and classifies each span's polarity
+    def __init__(self, config):
+        super(bert_ATE_ABSA, self).__init__(config)
+        self.bert = BertModel(config)
+        self.dropout = nn.Dropout(p=0.3)
+        self.ate_classifier = nn.Linear(config.hidden_size, 3)  # BIO tags per token
+        self.absa_classifier = nn.Linear(config.hidden_size * 2, 3)  # [CLS] context + pooled span -> 3 sentiment classes
+        self.loss_fn = nn.CrossEntropyLoss()
+        self.span_loss_fn = nn.CrossEntropyLoss(ignore_index=-100)  # -100 marks padded spans
+
+    def encode(self, input_ids, attention_mask=None, token_type_ids=None):
+        # Run the encoder once; the hidden states are reused for every span of the segment
+        bert_outputs = self.bert(input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids)
+        last_hidden_state = bert_outputs.last_hidden_state  # Shape: [batch_size, seq_len, hidden_size]
+        logits = self.ate_classifier(last_hidden_state)  # Shape: [batch_size, seq_len, 3]
+        return last_hidden_state, logits
+
+    def classify_spans(self, last_hidden_state, span_mask):
+        # span_mask marks the tokens of each span. Shape: [batch_size, num_spans, seq_len]
+        span_mask = span_mask.to(last_hidden_state.dtype)
+        span_lengths = span_mask.sum(dim=2, keepdim=True).clamp(min=1)
+        span_repr = torch.bmm(span_mask, last_hidden_state) / span_lengths  # Mean-pooled spans: [batch_size, num_spans, hidden_size]
+
+        cls_repr = last_hidden_state[:, :1, :].expand(-1, span_repr.size(1), -1)
+        features = self.dropout(torch.cat([cls_repr, span_repr], dim=2))
+        return self.absa_classifier(features)  # Shape: [batch_size, num_spans, 3]
+
+    def forward(self, input_ids, attention_mask=None, token_type_ids=None, span_mask=None, labels=None, polarity_labels=None):
+        last_hidden_state, logits = self.encode(input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids)
+        outputs = {"logits": logits}
+
+        if span_mask is not None:
+            outputs["polarity_logits"] = self.classify_spans(last_hidden_state, span_mask)
+
+        if labels is not None or polarity_labels is not None:
+            loss = logits.new_zeros(())
+            if labels is not None:
+                loss = loss + self.loss_fn(logits.view(-1, 3), labels.view(-1))
+            # Skip the span loss when the batch has no labelled spans (avoids a NaN mean)
+            if polarity_labels is not None and span_mask is not None and (polarity_labels != -100).any():
+                loss = loss + self.span_loss_fn(outputs["polarity_logits"].view(-1, 3), polarity_labels.view(-1))
+            outputs["loss"] = loss
+
+        return outputs
@@ -0,0 +1,55 @@
+# backend/convert_weights.py
+# Converts pickled state dicts (ate_model_v1.pkl, absa_model_v1.pkl, joint_model_v1.pkl) to .safetensors files
+# next to them, which model_loader memory-maps instead of unpickling the .pkl. Run from the repository root:
+#   python -m backend.convert_weights backend/models/ate_model_v1.pkl backend/models/absa_model_v1.pkl
+
+import argparse
+import sys
+
+import torch
+from safetensors.torch import save_file, load_file
+
+from .model_loader import safetensors_path_for, file_digest
+
+
+def convert_state_dict(model_path, output_path=None):
+    output_path = output_path or safetensors_path_for(model_path)
+    state_dict = torch.load(model_path, map_location='cpu')
+
+    # safetensors stores each tensor once, so tensors sharing storage are written as separate copies
+    tensors, seen_storage = {}, set()
+    for name, tensor in state_dict.items():
+        tensor = tensor.detach().contiguous()
+        storage = tensor.untyped_storage().data_ptr()
+        tensors[name] = tensor.clone() if storage in seen_storage else tensor
+        seen_storage.add(storage)
+    # source_sha1 lets model_loader report the same model_version for the converted file as for the .pkl
+    save_file(tensors, output_path, metadata={'format': 'pt', 'source': model_path, 'source_sha1': file_digest(model_path)})
+
+    # Check the round trip before anything starts loading the new file
+    converted = load_file(output_path)
+    mismatched = [name for name in state_dict if name not in converted or not torch.equal(state_dict[name], converted[name])]
+    if mismatched or len(converted) != len(state_dict):
+        raise ValueError(f"'{output_path}' does not match '{model_path}' (e.g. {mismatched[:5]}).")
+    print(f"Converted '{model_path}' -> '{output_path}' ({len(converted)} tensors).")
+    return output_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert pickled model state dicts to memory-mappable .safetensors files.")
+    parser.add_argument('model_paths', nargs='+', help="Pickled state dicts (.pkl) to convert.")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for model_path in args.model_paths:
+        try:
+            convert_state_dict(model_path)
+        except Exception as e:
+            print(f"Error converting '{model_path}': {e}")
+            failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,147 @@
 # backend/crud.py
 
-from .models import Station, Review, AspectSentiments
+import json
+import os
+from .models import Station, Review, AspectSentiments, AnalysisResult, SentimentRollup
 from backend import db
 from datetime import datetime
-from backend import model_loader
-from sqlalchemy import func
+from flask import current_app
+from sqlalchemy import case, func, insert, text as sql_text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from .analysis_store import normalized_text_hash, is_storable, canonical_aspects
+from .rollup import ROLLUP_DELTA_SQL, rollup_delta_params
+from .response_cache import BUMP_DATA_VERSION_SQL
+from .inference_client import InferenceUnavailableError
+from . import inference_client
+
+# model_loader (torch, transformers, pandas) is imported on first use, and never in 'dashboard' service
+# mode, where inference is forwarded to INFERENCE_URL or disabled
+def _inference_url():
+    if current_app.config.get('SERVICE_MODE', 'full') != 'dashboard':
+        return None
+    url = current_app.config.get('INFERENCE_URL')
+    if not url:
+        raise InferenceUnavailableError("Inference is disabled in dashboard service mode.")
+    return url
+
+def _perform_absa_analysis(text):
+    # Returns (aspects, model_version, dictionary_version); the versions are unknown when inference is forwarded.
+    # Texts analysed before with the current models are served from the analysis_results store; a new result
+    # is added to the caller's transaction.
+    url = _inference_url()
+    if url:
+        return inference_client.analyze_review(url, text), None, None
+    from backend import model_loader
+    model_loader.ensure_models_loaded()
+    if model_loader.model_load_state != 'ready' or not text.strip(): # perform_absa_analysis raises / returns []
+        return model_loader.perform_absa_analysis(text), None, None
+
+    versions = (model_loader.get_model_version(), model_loader.get_dictionary_version())
+    text_hash = normalized_text_hash(text)
+    stored = db.session.get(AnalysisResult, (text_hash, *versions))
+    if stored is not None:
+        return canonical_aspects(json.loads(stored.aspects)), *versions
+
+    analyzed_aspects = model_loader.perform_absa_analysis(text)
+    if is_storable(analyzed_aspects):
+        # Another request may have stored the same text meanwhile; either copy is fine
+        db.session.execute(sqlite_insert(AnalysisResult).values(
+            text_hash=text_hash, model_version=versions[0], dictionary_version=versions[1],
+            aspects=json.dumps(analyzed_aspects), created_at=datetime.now()
+        ).on_conflict_do_nothing())
+    return analyzed_aspects, *versions
+
+def _perform_absa_analysis_many(texts):
+    # Batch counterpart of _perform_absa_analysis, one (aspects, model_version, dictionary_version) per text.
+    # Locally, stored texts are reused and the rest go through model_loader.perform_absa_analysis_bulk in
+    # one pass; new results are added to the store in the caller's transaction.
+    if not texts: # Every review of the batch came with its aspects
+        return []
+    url = _inference_url()
+    if url:
+        return [(inference_client.analyze_review(url, text), None, None) for text in texts]
+    from backend import model_loader
+    model_loader.ensure_models_loaded()
+    if model_loader.model_load_state != 'ready':
+        raise RuntimeError("ABSA models or tokenizers failed to load.")
+
+    versions = (model_loader.get_model_version(), model_loader.get_dictionary_version())
+    text_hashes = [normalized_text_hash(text) for text in texts]
+    analyses = {stored.text_hash: canonical_aspects(json.loads(stored.aspects)) for stored in AnalysisResult.query.filter(
+        AnalysisResult.model_version == versions[0],
+        AnalysisResult.dictionary_version == versions[1],
+        AnalysisResult.text_hash.in_(set(text_hashes))
+    )}
+    pending = {}
+    for text, text_hash in zip(texts, text_hashes):
+        if text_hash not in analyses and text.strip():
+            pending.setdefault(text_hash, text)
+    if pending:
+        # Same shape as _perform_absa_analysis, whether an aspect list comes from the store or from the models
+        new_analyses = [canonical_aspects(aspects) for aspects in model_loader.perform_absa_analysis_bulk(list(pending.values()))]
+        stored_rows = [dict(text_hash=text_hash, model_version=versions[0], dictionary_version=versions[1],
+                            aspects=json.dumps(aspects), created_at=datetime.now())
+                       for text_hash, aspects in zip(pending, new_analyses) if is_storable(aspects)]
+        if stored_rows:
+            db.session.execute(sqlite_insert(AnalysisResult).on_conflict_do_nothing(), stored_rows)
+        analyses.update(zip(pending, new_analyses))
+    return [(analyses.get(text_hash, []), *versions) for text_hash in text_hashes]
+
+def _insert_reviews(entries):
+    # entries: (station, text, aspects, analysis_method, model_version, dictionary_version). Adds the reviews,
+    # their aspect rows (one executemany INSERT each, no per-object ORM work) and the rollup update to the
+    # current transaction; returns the new reviews_ids in entry order. The caller commits or rolls back.
+    now_dt = datetime.now()
+    review_ids = db.session.execute(
+        insert(Review).returning(Review.reviews_id, sort_by_parameter_order=True),
+        [dict(
+            station_id=station.station_id,
+            raw_reviews=text,
+            review_date=now_dt.strftime('%Y-%m-%d %H:%M:%S'),  # this can still be string
+            precise_review_datetime=now_dt,  # this is datetime object
+            station_name=station.station_name,
+            is_estimated_date=False,
+            text_hash=normalized_text_hash(text),
+            review_month=now_dt.strftime('%Y-%m'),
+            review_year=now_dt.strftime('%Y'),
+            analysis_model_version=model_version, # None unless analysed locally, so reanalyze picks it up
+            analysis_dictionary_version=dictionary_version
+        ) for station, text, _, _, model_version, dictionary_version in entries]
+    ).scalars().all()
+
+    aspect_rows = []
+    for review_id, (station, text, aspects, analysis_method, model_version, dictionary_version) in zip(review_ids, entries):
+        for aspect_data in aspects:
+            # Ensure aspect_data has the expected keys even if it's from frontend
+            aspect_rows.append(dict(
+                review_id=review_id,
+                station_id=station.station_id,
+                segment_index=aspect_data.get('segment_index', 0), # Use .get() in case segment_index is missing
+                segment_text=aspect_data.get('term', text), # Use 'term' from analysis, or fallback to full review text
+                aspect_category=aspect_data.get('category'),
+                sentiment_polarity=aspect_data.get('polarity'),
+                extracted_aspect_term=aspect_data.get('term'), # Assuming 'term' is the extracted aspect
+                analysis_method=analysis_method,
+                model_version=model_version,
+                dictionary_version=dictionary_version,
+                review_month=now_dt.strftime('%Y-%m')
+            ))
+    if aspect_rows:
+        db.session.execute(insert(AspectSentiments), aspect_rows)
+
+    # The dashboard rollup changes in the same transaction as the aspect rows, and the cached dashboard
+    # responses are invalidated with it
+    db.session.execute(sql_text(ROLLUP_DELTA_SQL), rollup_delta_params(review_ids, 1))
+    db.session.execute(sql_text(BUMP_DATA_VERSION_SQL))
+    return review_ids
+
+def _validate_aspects(aspects, position=None):
+    where = f"reviews[{position}]: " if position is not None else ""
+    if not isinstance(aspects, list):
+        raise ValueError(f"{where}analyzedAspects must be a list.")
+    for aspect_data in aspects:
+        if not isinstance(aspect_data, dict) or not aspect_data.get('category') or not aspect_data.get('polarity'):
+            raise ValueError(f"{where}every analyzed aspect needs a category and a polarity.")
 
 def get_stations():
     # Retrieve all station objects from the database
@@ -27,61 +164,139 @@ def create_station_review(station_id, text, submitted_analyzed_aspects=None): #
         raise ValueError(f"Station with ID {station_id} not found.")
 
     # Only perform ABSA analysis if submitted_analyzed_aspects are NOT provided
-    if submitted_analyzed_aspects is None:
-        analyzed_aspects = model_loader.perform_absa_analysis(text)
-    else:
-        analyzed_aspects = submitted_analyzed_aspects # Use the provided (and potentially edited) aspects
-    
-    now_dt = datetime.now()
-
-    # Create a new Review object with the provided data
-    review = Review(
-        station_id=station_id,
-        raw_reviews=text,
-        review_date=now_dt.strftime('%Y-%m-%d %H:%M:%S'),  # this can still be string
-        precise_review_datetime=now_dt,  # this is datetime object
-        station_name=station.station_name,
-        is_estimated_date=False
-    )
-
-    db.session.add(review)
-    db.session.commit()
-
-    for aspect_data in analyzed_aspects:
-        # Ensure aspect_data has the expected keys even if it's from frontend
-        # You might want more robust validation here if frontend data can be malformed
-        aspect_sentiment_entry = AspectSentiments(
-            review_id=review.reviews_id,
-            station_id=station_id,
-            segment_index=aspect_data.get('segment_index', 0), # Use .get() in case segment_index is missing
-            segment_text=aspect_data.get('term', text), # Use 'term' from analysis, or fallback to full review text
-            aspect_category=aspect_data.get('category'),
-            sentiment_polarity=aspect_data.get('polarity'),
-            extracted_aspect_term=aspect_data.get('term'), # Assuming 'term' is the extracted aspect
-            analysis_method='Manual Edit' if submitted_analyzed_aspects else 'Hybrid' # Indicate if edited
-        )
-        db.session.add(aspect_sentiment_entry)
-    
-    db.session.commit()
+    model_version = dictionary_version = None
+    if submitted_analyzed_aspects is not None:
+        _validate_aspects(submitted_analyzed_aspects)
+    analysis_method = 'Manual Edit' if submitted_analyzed_aspects else 'Hybrid' # Indicate if edited
+
+    # The stored analysis, the review, its aspects and the rollup update are one transaction: all of it is written or none
+    try:
+        if submitted_analyzed_aspects is None:
+            analyzed_aspects, model_version, dictionary_version = _perform_absa_analysis(text)
+        else:
+            analyzed_aspects = submitted_analyzed_aspects # Use the provided (and potentially edited) aspects
+        review_id, = _insert_reviews([(station, text, analyzed_aspects, analysis_method, model_version, dictionary_version)])
+        review = db.session.get(Review, review_id)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
 
     return review, analyzed_aspects
 
+MAX_BATCH_REVIEWS = int(os.environ.get('ABSA_MAX_BATCH_REVIEWS', '1000'))
+
+def create_station_reviews_batch(items):
+    # items: [{'stationId', 'review', 'analyzedAspects' (optional)}]. Reviews without analyzedAspects are
+    # analysed together; everything is written in one transaction. Returns (review_ids, aspects per review).
+    if not isinstance(items, list) or not items:
+        raise ValueError("reviews must be a non-empty list.")
+    if len(items) > MAX_BATCH_REVIEWS:
+        raise ValueError(f"At most {MAX_BATCH_REVIEWS} reviews per batch.")
+
+    station_ids = []
+    for position, item in enumerate(items):
+        if not isinstance(item, dict) or not isinstance(item.get('review'), str):
+            raise ValueError(f"reviews[{position}] needs a stationId and a review text.")
+        station_id = item.get('stationId')
+        if isinstance(station_id, str) and station_id.strip().isdigit():
+            station_id = int(station_id)
+        elif not isinstance(station_id, int) or isinstance(station_id, bool):
+            raise ValueError(f"reviews[{position}]: stationId must be an integer.")
+        station_ids.append(station_id)
+        if item.get('analyzedAspects') is not None:
+            _validate_aspects(item['analyzedAspects'], position)
+
+    stations = {station.station_id: station for station in Station.query.filter(Station.station_id.in_(set(station_ids)))}
+    for station_id in station_ids:
+        if station_id not in stations:
+            raise ValueError(f"Station with ID {station_id} not found.")
+
+    try:
+        to_analyze = [position for position, item in enumerate(items) if item.get('analyzedAspects') is None]
+        analyses = dict(zip(to_analyze, _perform_absa_analysis_many([items[position]['review'] for position in to_analyze])))
+
+        entries = []
+        for position, item in enumerate(items):
+            if position in analyses:
+                aspects, model_version, dictionary_version = analyses[position]
+            else:
+                aspects, model_version, dictionary_version = item['analyzedAspects'], None, None
+            entries.append((stations[station_ids[position]], item['review'], aspects,
+                            'Manual Edit' if item.get('analyzedAspects') else 'Hybrid', model_version, dictionary_version))
+        review_ids = _insert_reviews(entries)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return review_ids, [entry[2] for entry in entries]
+
 # NEW FUNCTION: For previewing analysis without saving
 def analyze_review_only(text):
-    return model_loader.perform_absa_analysis(text)
+    try:
+        analyzed_aspects = _perform_absa_analysis(text)[0]
+        db.session.commit() # Keeps the stored analysis for when the review is submitted
+    except Exception:
+        db.session.rollback()
+        raise
+    return analyzed_aspects
+
+def get_inference_metrics():
+    if current_app.config.get('SERVICE_MODE', 'full') == 'dashboard':
+        return {'service_mode': 'dashboard', 'inference_url': current_app.config.get('INFERENCE_URL')}
+    from backend import model_loader
+    return model_loader.get_inference_metrics()
+
+def get_model_load_status():
+    if current_app.config.get('SERVICE_MODE', 'full') == 'dashboard':
+        # A dashboard replica is ready as soon as it serves; inference readiness is the remote service's
+        url = current_app.config.get('INFERENCE_URL')
+        return {
+            'state': 'ready',
+            'ready': True,
+            'service_mode': 'dashboard',
+            'inference': inference_client.get_model_load_status(url) if url else {'state': 'disabled', 'ready': False},
+        }
+    from backend import model_loader
+    return {**model_loader.get_model_load_status(), 'service_mode': 'full'}
 
 # --- NEW DASHBOARD DATA FUNCTIONS ---
 
-# 1. Overall Sentiment Distribution
-def get_overall_sentiment_distribution():
-    results = db.session.query(
-        AspectSentiments.sentiment_polarity,
-        db.func.count(AspectSentiments.aspect_sentiment_id)
+# The dashboard panels are all projections of one (station, aspect category, polarity) count cube, read in a
+# single grouped query from sentiment_rollup (per station, category, polarity and month counts of
+# AspectSentiments rows, see backend/rollup.py). Each get_* function below takes an optional cube so that
+# /api/dashboard/summary can build every panel from one read; called alone they read it themselves.
+def get_sentiment_cube():
+    # [(station_id, station_name, aspect_category, sentiment_polarity, count)]; station_name is None for
+    # rollup rows whose station no longer exists (they still count towards the station-less panels)
+    return db.session.query(
+        SentimentRollup.station_id,
+        Station.station_name,
+        SentimentRollup.aspect_category,
+        SentimentRollup.sentiment_polarity,
+        func.sum(SentimentRollup.aspect_count)
+    ).outerjoin(
+        Station, SentimentRollup.station_id == Station.station_id
     ).group_by(
-        AspectSentiments.sentiment_polarity
+        SentimentRollup.station_id,
+        SentimentRollup.aspect_category,
+        SentimentRollup.sentiment_polarity
     ).all()
-    
-    data = {r[0]: r[1] for r in results}
+
+def _cube_totals(cube, *dimensions):
+    # Sums the cube over everything but dimensions (indexes into a cube row), keyed in sorted order
+    totals = {}
+    for row in cube:
+        key = tuple(row[d] for d in dimensions)
+        totals[key] = totals.get(key, 0) + row[4]
+    return dict(sorted(totals.items(), key=lambda item: tuple('' if k is None else k for k in item[0])))
+
+STATION_NAME, ASPECT_CATEGORY, SENTIMENT_POLARITY = 1, 2, 3
+
+# 1. Overall Sentiment Distribution
+def get_overall_sentiment_distribution(cube=None):
+    cube = get_sentiment_cube() if cube is None else cube
+    data = {polarity: count for (polarity,), count in _cube_totals(cube, SENTIMENT_POLARITY).items()}
     # Ensure all polarities are present, even if count is 0
     return {
         "Positive": data.get("Positive", 0),
@@ -90,15 +305,8 @@ def get_overall_sentiment_distribution():
     }
 
 # 2. Sentiment Distribution by Aspect Category
-def get_sentiment_by_aspect_category():
-    results = db.session.query(
-        AspectSentiments.aspect_category,
-        AspectSentiments.sentiment_polarity,
-        db.func.count(AspectSentiments.aspect_sentiment_id)
-    ).group_by(
-        AspectSentiments.aspect_category,
-        AspectSentiments.sentiment_polarity
-    ).all()
+def get_sentiment_by_aspect_category(cube=None):
+    cube = get_sentiment_cube() if cube is None else cube
 
     # Define the 5 core aspects + 'other/uncategorized' for consistent output
     target_aspects = ['cleanliness', 'comfort', 'safety', 'service', 'facilities', 'other/uncategorized']
@@ -109,7 +317,7 @@ def get_sentiment_by_aspect_category():
         for aspect in target_aspects
     }
 
-    for category, polarity, count in results:
+    for (category, polarity), count in _cube_totals(cube, ASPECT_CATEGORY, SENTIMENT_POLARITY).items():
         normalized_category = category.lower()
         if normalized_category == 'other':
             normalized_category = 'other/uncategorized'
@@ -128,55 +336,28 @@ def get_sentiment_by_aspect_category():
 
 
 # 3. Top N Positive/Negative Aspects (Combined Function)
-def get_top_n_aspects(n=5):
-    # Top Positive Aspects
-    top_positive_results = db.session.query(
-        AspectSentiments.aspect_category,
-        db.func.count(AspectSentiments.aspect_sentiment_id)
-    ).filter(
-        AspectSentiments.sentiment_polarity == 'Positive',
-        AspectSentiments.aspect_category != 'other/uncategorized' # Exclude 'other' for top aspects
-    ).group_by(
-        AspectSentiments.aspect_category
-    ).order_by(
-        db.func.count(AspectSentiments.aspect_sentiment_id).desc()
-    ).limit(n).all()
+def get_top_n_aspects(n=5, cube=None):
+    cube = get_sentiment_cube() if cube is None else cube
+    totals = _cube_totals(cube, SENTIMENT_POLARITY, ASPECT_CATEGORY)
 
-    top_positive = [{"category": r[0], "count": r[1]} for r in top_positive_results]
+    def top(polarity):
+        # Exclude 'other' for top aspects; ties keep category order
+        counts = [(category, count) for (row_polarity, category), count in totals.items()
+                  if row_polarity == polarity and category != 'other/uncategorized']
+        return [{"category": category, "count": count}
+                for category, count in sorted(counts, key=lambda item: item[1], reverse=True)[:n]]
 
-    # Top Negative Aspects
-    top_negative_results = db.session.query(
-        AspectSentiments.aspect_category,
-        db.func.count(AspectSentiments.aspect_sentiment_id)
-    ).filter(
-        AspectSentiments.sentiment_polarity == 'Negative',
-        AspectSentiments.aspect_category != 'other/uncategorized' # Exclude 'other' for top aspects
-    ).group_by(
-        AspectSentiments.aspect_category
-    ).order_by(
-        db.func.count(AspectSentiments.aspect_sentiment_id).desc()
-    ).limit(n).all()
-    
-    top_negative = [{"category": r[0], "count": r[1]} for r in top_negative_results]
-
-    return {"top_positive": top_positive, "top_negative": top_negative}
+    return {"top_positive": top('Positive'), "top_negative": top('Negative')}
 
 
 # 5. Station Comparison by Overall Sentiment
-def get_station_sentiment_comparison():
-    results = db.session.query(
-        Station.station_name,
-        AspectSentiments.sentiment_polarity,
-        db.func.count(AspectSentiments.aspect_sentiment_id)
-    ).join(
-        Station, AspectSentiments.station_id == Station.station_id
-    ).group_by(
-        Station.station_name,
-        AspectSentiments.sentiment_polarity
-    ).all()
+def get_station_sentiment_comparison(cube=None):
+    cube = get_sentiment_cube() if cube is None else cube
 
     station_data = {}
-    for station_name, polarity, count in results:
+    for (station_name, polarity), count in _cube_totals(cube, STATION_NAME, SENTIMENT_POLARITY).items():
+        if station_name is None:
+            continue
         if station_name not in station_data:
             station_data[station_name] = {"Positive": 0, "Negative": 0, "Neutral": 0, "Total": 0}
         
@@ -203,30 +384,33 @@ def get_station_sentiment_comparison():
 
 
 # MODIFIED FUNCTION: Get total number of analyzed aspects (rows) across all stations
-def get_total_reviews_all_stations():
+def get_total_reviews_all_stations(cube=None):
     """Calculates the total number of rows (analyzed aspects) in the AspectSentiments table."""
-    total_aspect_sentiments = db.session.query(AspectSentiments).count() # Changed to count AspectSentiments
-    return total_aspect_sentiments
+    cube = get_sentiment_cube() if cube is None else cube
+    return sum(row[4] for row in cube) # Counts AspectSentiments rows
+
+
+def get_overall_positive_sentiment_percentage(cube=None):
+    cube = get_sentiment_cube() if cube is None else cube
+    sentiment_counts = _cube_totals(cube, SENTIMENT_POLARITY)
+    total_sentiments = sum(sentiment_counts.values())
+    positive_sentiments = next((count for (polarity,), count in sentiment_counts.items() if polarity.lower() == 'positive'), 0)
+    if total_sentiments == 0:
+        return 0
+    return round((positive_sentiments / total_sentiments) * 100, 2)
 
 
-def get_overall_sentiment_analysis():
+def get_overall_sentiment_analysis(cube=None):
     """
     Calculates aggregate sentiment counts (Positive, Neutral, Negative)
     for each aspect category across ALL stations.
     """
-    results = db.session.query(
-        AspectSentiments.aspect_category,
-        AspectSentiments.sentiment_polarity,
-        func.count().label('count')
-    ).group_by(
-        AspectSentiments.aspect_category,
-        AspectSentiments.sentiment_polarity
-    ).all()
+    cube = get_sentiment_cube() if cube is None else cube
 
     overall_aspect_data = {}
     overall_total_reviews = 0 # To count all sentiment entries
 
-    for aspect_category, polarity, count in results:
+    for (aspect_category, polarity), count in _cube_totals(cube, ASPECT_CATEGORY, SENTIMENT_POLARITY).items():
         if aspect_category not in overall_aspect_data:
             overall_aspect_data[aspect_category] = {
                 "Positive": 0,
@@ -242,9 +426,93 @@ def get_overall_sentiment_analysis():
     }
 
 
+def get_total_reviews_by_station(cube=None):
+    cube = get_sentiment_cube() if cube is None else cube
+    totals = {station_name: count for (station_name,), count in _cube_totals(cube, STATION_NAME).items()
+              if station_name is not None}
+    return {
+        'labels': list(totals),
+        'total_reviews': list(totals.values())
+    }
 
 
+# Per-station aspect breakdown (StationDetails). Categories are normalized in SQL (lower case, 'other' ->
+# 'other/uncategorized') and polarities capitalized, so one grouped read serves any number of stations and each
+# aspect's total is the sum of its polarity counts.
+STATION_ASPECTS = ['cleanliness', 'comfort', 'safety', 'service', 'facilities', 'other/uncategorized']
 
+def get_station_sentiments(station_ids):
+    # {station_id: {'aspect_data': {aspect: {'Positive', 'Negative', 'Neutral', 'total'}}, 'overall_total_reviews'}}
+    # for every id in station_ids; stations without aspects get zeros
+    category = func.lower(SentimentRollup.aspect_category)
+    normalized_category = case((category == 'other', 'other/uncategorized'), else_=category)
+    polarity = SentimentRollup.sentiment_polarity
+    normalized_polarity = func.upper(func.substr(polarity, 1, 1)).op('||')(func.lower(func.substr(polarity, 2)))
+    results = db.session.query(
+        SentimentRollup.station_id,
+        normalized_category,
+        normalized_polarity,
+        func.sum(SentimentRollup.aspect_count)
+    ).filter(
+        SentimentRollup.station_id.in_(station_ids)
+    ).group_by(
+        SentimentRollup.station_id,
+        normalized_category,
+        normalized_polarity
+    ).all()
 
-
-    
\ No newline at end of file
+    breakdowns = {
+        station_id: {
+            'aspect_data': {aspect: {'Positive': 0, 'Negative': 0, 'Neutral': 0, 'total': 0} for aspect in STATION_ASPECTS},
+            'overall_total_reviews': 0
+        }
+        for station_id in station_ids
+    }
+    for station_id, aspect_category, sentiment_polarity, count in results:
+        breakdown = breakdowns[station_id]
+        aspect_data = breakdown['aspect_data'].get(aspect_category)
+        if aspect_data is None:
+            print(f"Warning: Untracked aspect category '{aspect_category}' for station {station_id}")
+            continue
+        if sentiment_polarity in aspect_data:
+            aspect_data[sentiment_polarity] += count
+        aspect_data['total'] += count # Every polarity counts towards the total, as the raw count did
+        breakdown['overall_total_reviews'] += count
+    return breakdowns
+
+def get_all_station_sentiments(station_ids=None):
+    # Breakdown of every station (or of the existing ones among station_ids), ordered by station_id
+    if station_ids is not None and not station_ids:
+        return []
+    query = Station.query.order_by(Station.station_id)
+    if station_ids is not None:
+        query = query.filter(Station.station_id.in_(station_ids))
+    stations = query.all()
+    breakdowns = get_station_sentiments([station.station_id for station in stations])
+    return [
+        {'station_id': station.station_id, 'station_name': station.station_name, **breakdowns[station.station_id]}
+        for station in stations
+    ]
+
+
+# Panels of /api/dashboard/summary, named after the endpoints that serve them one at a time; each value is
+# the JSON body of that endpoint
+DASHBOARD_SUMMARY_FIELDS = {
+    'overall_sentiment': get_overall_sentiment_distribution,
+    'aspect_sentiment': get_sentiment_by_aspect_category,
+    'top_aspects': lambda cube: get_top_n_aspects(cube=cube),
+    'station_comparison': get_station_sentiment_comparison,
+    'total_reviews_all_stations': lambda cube: {'total_reviews': get_total_reviews_all_stations(cube)},
+    'overall_positive_sentiment_percentage': lambda cube: {'positive_sentiment_percentage': get_overall_positive_sentiment_percentage(cube)},
+    'overall_sentiment_analysis': get_overall_sentiment_analysis,
+    'total_reviews_by_station': get_total_reviews_by_station,
+}
+
+def get_dashboard_summary(fields=None):
+    # fields: names from DASHBOARD_SUMMARY_FIELDS, or None for all of them; every panel comes from one cube read
+    fields = list(DASHBOARD_SUMMARY_FIELDS) if fields is None else fields
+    unknown = [field for field in fields if field not in DASHBOARD_SUMMARY_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown summary field(s): {', '.join(unknown)}. Available: {', '.join(DASHBOARD_SUMMARY_FIELDS)}.")
+    cube = get_sentiment_cube()
+    return {field: DASHBOARD_SUMMARY_FIELDS[field](cube) for field in fields}
@@ -0,0 +1,87 @@
+# backend/dictionary_matcher.py
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == '_'
+
+def _is_boundary(text, position):
+    # Same rule as the regex \b: a word character on exactly one side of the position
+    before = position > 0 and _is_word_char(text[position - 1])
+    after = position < len(text) and _is_word_char(text[position])
+    return before != after
+
+
+class DictionaryMatcher:
+    """
+    Aho-Corasick automaton over the aspect dictionary terms. It is built once when
+    the dictionary is loaded; find() then reports every term that occurs in a text
+    on word boundaries (the same matches as re.search(r'\\b' + term + r'\\b')) in a
+    single pass over the text, whatever the dictionary size.
+    """
+
+    def __init__(self, entries):
+        # entries: (term, category) pairs, in the order results should be reported
+        self.terms = []
+        self.categories = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        seen = set()
+        for term, category in entries:
+            if not term or term in seen:
+                continue
+            seen.add(term)
+            self._add(term, len(self.terms))
+            self.terms.append(term)
+            self.categories.append(category)
+        self._build_failure_links()
+
+    def __len__(self):
+        return len(self.terms)
+
+    def _add(self, term, term_index):
+        state = 0
+        for ch in term:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(term_index)
+
+    def _build_failure_links(self):
+        # Breadth-first, so every state's failure target is finished before the state itself
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                # A state also emits every term ending at its failure target
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+        self._output = [tuple(outputs) for outputs in self._output]
+
+    def find(self, text):
+        # Returns [{'term': ..., 'category': ...}] for each distinct term found, in dictionary order
+        found = set()
+        state = 0
+        for position, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for term_index in self._output[state]:
+                if term_index in found:
+                    continue
+                end = position + 1
+                if _is_boundary(text, end - len(self.terms[term_index])) and _is_boundary(text, end):
+                    found.add(term_index)
+        return [{'term': self.terms[i], 'category': self.categories[i]} for i in sorted(found)]
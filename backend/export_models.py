@@ -0,0 +1,108 @@
+# backend/export_models.py
+# Exports bert_ATE and bert_ABSA to frozen TorchScript graphs for ABSA_INFERENCE_BACKEND=torchscript,
+# then checks that the graphs give the same results as the eager models. Run from the repository root:
+#   python -m backend.export_models --db data/mrt_reviews_copy.db
+# The eager weights are read from ABSA_ATE_MODEL_PATH / ABSA_ABSA_MODEL_PATH as usual.
+
+import argparse
+import os
+import sys
+import time
+
+# The export always starts from the fp32 eager models, whatever the app is configured to serve
+os.environ['ABSA_INFERENCE_MODE'] = 'pipeline'
+os.environ['ABSA_INFERENCE_BACKEND'] = 'eager'
+os.environ['ABSA_INFERENCE_PRECISION'] = 'fp32'
+os.environ['ABSA_MICROBATCH'] = '0'
+
+import torch
+
+from .benchmarks import quiet, sample_reviews, latency_summary, print_report
+from .inference_backends import export_torchscript, load_torchscript
+
+
+def _analyze_all(model_loader, reviews):
+    results, timings = {}, []
+    model_loader.refresh_result_caches()
+    for review_id, text in reviews:
+        with quiet():
+            start = time.perf_counter()
+            analysis = model_loader.perform_absa_analysis(text)
+            timings.append(time.perf_counter() - start)
+        results[review_id] = analysis
+    return results, timings
+
+def _max_logit_difference(model_loader, eager_models, exported_models, reviews):
+    # Largest absolute logit difference over the sampled reviews, batched the way inference batches them
+    with quiet():
+        texts = [model_loader.preprocess_text(text) for _, text in reviews[:32]]
+    encoding = model_loader.ate_tokenizer(texts, padding='longest', truncation=True, max_length=128, return_tensors='pt')
+    ate_inputs = {'input_ids': encoding['input_ids'].to(model_loader.device), 'attention_mask': encoding['attention_mask'].to(model_loader.device)}
+    encoding = model_loader.absa_tokenizer(texts, texts, padding='longest', truncation=True, max_length=128,
+                                           return_tensors='pt', return_token_type_ids=True)
+    absa_inputs = {key: encoding[key].to(model_loader.device) for key in ('input_ids', 'attention_mask', 'token_type_ids')}
+    with torch.no_grad():
+        ate_diff = (eager_models[0](**ate_inputs)['logits'] - exported_models[0](**ate_inputs)['logits']).abs().max().item()
+        absa_diff = (eager_models[1](**absa_inputs)['logits'] - exported_models[1](**absa_inputs)['logits']).abs().max().item()
+    return ate_diff, absa_diff
+
+def export_models(ate_output=None, absa_output=None, db_path=None, sample_size=200, seed=13):
+    with quiet():
+        from backend import model_loader
+        model_loader.ensure_models_loaded()
+    if model_loader.ate_model is None or model_loader.absa_model is None:
+        print("Error: the eager ATE/ABSA models could not be loaded; check ABSA_ATE_MODEL_PATH and ABSA_ABSA_MODEL_PATH.")
+        return False
+
+    ate_output = ate_output or model_loader.torchscript_path_for(model_loader.loaded_model_paths[0])
+    absa_output = absa_output or model_loader.torchscript_path_for(model_loader.loaded_model_paths[1])
+    # The graphs record the digest of the source .pkl, so they keep the model_version of the eager models
+    export_torchscript(model_loader.ate_model, 'ate', model_loader.ate_tokenizer, ate_output, model_loader.device,
+                       model_loader.loaded_model_digests[0])
+    export_torchscript(model_loader.absa_model, 'absa', model_loader.absa_tokenizer, absa_output, model_loader.device,
+                       model_loader.loaded_model_digests[1])
+    print(f"Exported ATE graph to '{ate_output}' and ABSA graph to '{absa_output}'.")
+
+    if not db_path:
+        return True
+
+    # Verification: full perform_absa_analysis results with the eager models, then with the graphs
+    reviews = sample_reviews(db_path, sample_size, seed)
+    eager_models = (model_loader.ate_model, model_loader.absa_model)
+    exported_models = (load_torchscript(ate_output, 'ate', model_loader.device),
+                       load_torchscript(absa_output, 'absa', model_loader.device))
+
+    eager_results, eager_timings = _analyze_all(model_loader, reviews)
+    model_loader.ate_model, model_loader.absa_model = exported_models
+    exported_results, exported_timings = _analyze_all(model_loader, reviews)
+    model_loader.ate_model, model_loader.absa_model = eager_models
+
+    ate_diff, absa_diff = _max_logit_difference(model_loader, eager_models, exported_models, reviews)
+    mismatches = [review_id for review_id in eager_results if eager_results[review_id] != exported_results[review_id]]
+    print_report(f"Eager vs TorchScript ({len(reviews)} reviews from {db_path})", [
+        {'backend': 'eager', **latency_summary(eager_timings), 'identical_reviews': len(reviews), 'max_logit_diff': 0.0},
+        {'backend': 'torchscript', **latency_summary(exported_timings), 'identical_reviews': len(reviews) - len(mismatches),
+         'max_logit_diff': round(max(ate_diff, absa_diff), 8)},
+    ])
+    if mismatches:
+        print(f"Error: {len(mismatches)} reviews differ between eager and TorchScript (e.g. reviews_id {mismatches[:5]}).")
+        return False
+    print("Verification passed: TorchScript results are identical to eager.")
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the ATE and ABSA models to TorchScript and verify them.")
+    parser.add_argument('--ate-output', default=None, help="Defaults to the ATE .pkl path with a .torchscript.pt suffix.")
+    parser.add_argument('--absa-output', default=None, help="Defaults to the ABSA .pkl path with a .torchscript.pt suffix.")
+    parser.add_argument('--db', default=os.path.join('data', 'mrt_reviews_copy.db'), help="Reviews used for verification; pass '' to skip it.")
+    parser.add_argument('--sample', type=int, default=200, help="Number of reviews to verify on.")
+    parser.add_argument('--seed', type=int, default=13)
+    args = parser.parse_args(argv)
+
+    if not export_models(args.ate_output, args.absa_output, args.db, args.sample, args.seed):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
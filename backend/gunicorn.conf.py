@@ -0,0 +1,65 @@
+# backend/gunicorn.conf.py
+# Pre-fork multi-worker serving for backend.wsgi:app:
+#   gunicorn -c backend/gunicorn.conf.py backend.wsgi:app
+#
+# Settings (environment variables):
+#   ABSA_WORKERS          worker processes (default: number of CPU cores)
+#   ABSA_TORCH_THREADS    torch intra-op threads per worker (default: cores // workers, at least 1)
+#   ABSA_WORKER_THREADS   request threads per worker (default 4); concurrent requests in one worker
+#                         share forward passes through the micro-batch scheduler
+#   ABSA_BIND             listen address (default 0.0.0.0:5000, or 0.0.0.0:$PORT)
+#   ABSA_DB_POOL_SIZE     pooled SQLite connections per worker (default 5, plus ABSA_DB_MAX_OVERFLOW=10);
+#                         keep it at least ABSA_WORKER_THREADS
+#   ABSA_SQLITE_JOURNAL_MODE / ABSA_SQLITE_SYNCHRONOUS / ABSA_SQLITE_BUSY_TIMEOUT_MS
+#                         per-connection pragmas (default WAL / NORMAL / 5000)
+#   ABSA_DASHBOARD_READONLY=1
+#                         serve GET requests from a separate read-only connection pool
+#
+# Tuning guide. Measure on the target machine with
+#   python -m backend.benchmarks serve --configs 1x4,2x2,4x1 --clients 16
+# where each WxT runs W workers with T torch threads each.
+#   - Keep workers x torch threads <= physical cores. Beyond that the BLAS/OpenMP pools of the
+#     workers fight over the same cores and throughput drops while latency rises.
+#   - Many short reviews from many clients (the usual web traffic): prefer more workers with
+#     1-2 torch threads each. Small matrices parallelise poorly inside one forward pass.
+#   - Few clients sending long reviews: prefer fewer workers with more torch threads, which
+#     lowers the latency of each request.
+#   - Memory: the weights are loaded once in the master and shared copy-on-write (or shared
+#     through the page cache with .safetensors weights), so each extra worker only adds its own
+#     activations, tokenizer and Python heap. The benchmark reports total PSS to confirm it.
+#   - Set ABSA_WORKER_THREADS to at least the number of concurrent clients per worker, so the
+#     micro-batch scheduler has requests to batch together.
+#   - Every worker writes reviews to the same SQLite file. WAL keeps dashboard reads from waiting
+#     on those writes, and the busy timeout queues concurrent writers instead of failing them:
+#       python -m backend.benchmarks concurrency --writers 2 --readers 4
+
+import gc
+import multiprocessing
+import os
+
+preload_app = True # Load backend.wsgi (and the models) in the master before forking
+worker_class = 'gthread'
+
+_cores = multiprocessing.cpu_count()
+workers = int(os.environ.get('ABSA_WORKERS', _cores))
+threads = int(os.environ.get('ABSA_WORKER_THREADS', '4'))
+torch_threads = int(os.environ.get('ABSA_TORCH_THREADS', max(1, _cores // max(1, workers))))
+bind = os.environ.get('ABSA_BIND', f"0.0.0.0:{os.environ.get('PORT', 5000)}")
+timeout = 120 # A cold first batch on a busy machine can take a while
+
+
+def when_ready(server):
+    # Everything allocated so far (modules, models, dictionary) moves to a permanent generation, so
+    # the workers' garbage collector never writes to those pages and breaks the copy-on-write sharing
+    gc.freeze()
+    server.log.info(f"Starting {workers} workers x {threads} request threads, {torch_threads} torch threads each")
+
+
+def post_fork(server, worker):
+    # Each worker gets its own share of the cores instead of one thread per core
+    import torch
+    torch.set_num_threads(torch_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError: # Already started; only possible if the master ran parallel work
+        pass
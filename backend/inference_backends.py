@@ -0,0 +1,81 @@
+# backend/inference_backends.py
+# Serialized (TorchScript) versions of bert_ATE and bert_ABSA, plus the adapter that lets
+# model_loader call them exactly like the eager nn.Modules.
+
+import torch
+from torch import nn
+
+
+class _ATETraceWrapper(nn.Module):
+    # Positional tensor-only signature so torch.jit.trace can follow it; returns the logits
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        return self.model(input_ids, attention_mask=attention_mask)['logits']
+
+
+class _ABSATraceWrapper(nn.Module):
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask, token_type_ids):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids)['logits']
+
+
+class TorchScriptModel:
+    """
+    Wraps a loaded TorchScript module so it is called with the same keyword arguments
+    as bert_ATE / bert_ABSA and returns the same {'logits': ...} dict.
+    """
+
+    def __init__(self, module, kind, source_digest=None):
+        self.module = module
+        self.kind = kind
+        self.source_digest = source_digest # sha1 of the .pkl the graph was exported from, if recorded
+
+    def __call__(self, input_ids, attention_mask=None, token_type_ids=None):
+        if attention_mask is None:
+            attention_mask = torch.ones_like(input_ids)
+        if self.kind == 'absa':
+            if token_type_ids is None:
+                token_type_ids = torch.zeros_like(input_ids)
+            return {'logits': self.module(input_ids, attention_mask, token_type_ids)}
+        return {'logits': self.module(input_ids, attention_mask)}
+
+    def eval(self):
+        return self
+
+
+def _example_inputs(kind, tokenizer, device):
+    # Two rows of different lengths so the traced graph sees real padding
+    if kind == 'absa':
+        encoding = tokenizer(["the station is clean", "the toilet near the platform is dirty and smelly"],
+                             ["station", "toilet"], padding='longest', return_tensors='pt', return_token_type_ids=True)
+        return (encoding['input_ids'].to(device), encoding['attention_mask'].to(device), encoding['token_type_ids'].to(device))
+    encoding = tokenizer(["the station is clean", "the toilet near the platform is dirty and smelly"],
+                         padding='longest', return_tensors='pt')
+    return (encoding['input_ids'].to(device), encoding['attention_mask'].to(device))
+
+
+def export_torchscript(model, kind, tokenizer, output_path, device, source_digest=None):
+    """Traces an eager bert_ATE ('ate') or bert_ABSA ('absa') model, freezes it and saves it."""
+    wrapper = (_ABSATraceWrapper(model) if kind == 'absa' else _ATETraceWrapper(model)).eval()
+    example_inputs = _example_inputs(kind, tokenizer, device)
+    with torch.no_grad():
+        traced = torch.jit.trace(wrapper, example_inputs, check_trace=False)
+        frozen = torch.jit.freeze(traced)
+    torch.jit.save(frozen, output_path, _extra_files={'source_sha1': source_digest} if source_digest else None)
+    return frozen
+
+
+def load_torchscript(path, kind, device):
+    extra_files = {'source_sha1': ''}
+    module = torch.jit.load(path, map_location=device, _extra_files=extra_files)
+    module.eval()
+    source_digest = extra_files['source_sha1']
+    if isinstance(source_digest, bytes):
+        source_digest = source_digest.decode()
+    return TorchScriptModel(module, kind, source_digest or None)
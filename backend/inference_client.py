@@ -0,0 +1,41 @@
+# backend/inference_client.py
+# Minimal HTTP client used by dashboard-mode processes to forward inference to a full-mode process.
+# Standard library only, so importing it never pulls in torch, transformers or pandas.
+
+import json
+import urllib.error
+import urllib.request
+
+
+class InferenceUnavailableError(RuntimeError):
+    # Raised when this process cannot run inference and no inference service answered
+    pass
+
+
+def _request_json(url, payload=None, timeout=60):
+    data = json.dumps(payload).encode('utf-8') if payload is not None else None
+    request = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'},
+                                     method='POST' if data is not None else 'GET')
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+    except urllib.error.HTTPError as e:
+        try:
+            message = json.loads(e.read().decode('utf-8')).get('error', e.reason)
+        except ValueError:
+            message = e.reason
+        raise InferenceUnavailableError(f"Inference service returned {e.code}: {message}")
+    except (urllib.error.URLError, OSError) as e:
+        raise InferenceUnavailableError(f"Inference service at {url} is unreachable: {e}")
+
+
+def analyze_review(base_url, text, timeout=60):
+    # Same aspects list as model_loader.perform_absa_analysis, computed by the remote process
+    return _request_json(f"{base_url.rstrip('/')}/api/analyze_review", {'review': text}, timeout)['analyzed_aspects']
+
+
+def get_model_load_status(base_url, timeout=5):
+    try:
+        return _request_json(f"{base_url.rstrip('/')}/api/health/ready", timeout=timeout)
+    except InferenceUnavailableError as e: # Includes the 503 a still-loading service answers with
+        return {'state': 'unavailable', 'ready': False, 'error': str(e)}
@@ -0,0 +1,128 @@
+# backend/inference_scheduler.py
+
+import os
+import threading
+import time
+from collections import deque
+
+
+class _PendingRequest:
+    # One caller's submission: its items are scored in one or more shared batches
+    def __init__(self, size):
+        self.results = [None] * size
+        self.remaining = size
+        self.error = None
+        self.done = threading.Event()
+
+
+class MicroBatchScheduler:
+    """
+    Collects work items submitted by concurrent callers (e.g. Flask request threads)
+    and runs them through batch_fn in shared batches. A batch is dispatched as soon as
+    it holds max_batch_size items, or max_wait_ms after its oldest item arrived.
+    batch_fn must take a list of items and return one result per item, in order.
+    """
+
+    def __init__(self, name, batch_fn, max_batch_size=32, max_wait_ms=5):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self._queue = deque() # (request, slot, item, enqueued_at)
+        self._condition = threading.Condition()
+        self._worker = None
+        self._worker_pid = None
+
+        # Metrics
+        self._batches_run = 0
+        self._items_processed = 0
+        self._last_batch_size = 0
+        self._max_batch_size_seen = 0
+        self._total_wait = 0.0
+        self._max_wait_seen = 0.0
+
+    def submit(self, items):
+        # Blocks until every item has been processed and returns the results in order
+        items = list(items)
+        if not items:
+            return []
+
+        request = _PendingRequest(len(items))
+        now = time.perf_counter()
+        with self._condition:
+            self._ensure_worker()
+            for slot, item in enumerate(items):
+                self._queue.append((request, slot, item, now))
+            self._condition.notify()
+
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.results
+
+    def metrics(self):
+        with self._condition:
+            return {
+                'name': self.name,
+                'queue_depth': len(self._queue),
+                'batches_run': self._batches_run,
+                'items_processed': self._items_processed,
+                'last_batch_size': self._last_batch_size,
+                'max_batch_size_seen': self._max_batch_size_seen,
+                'avg_batch_size': round(self._items_processed / self._batches_run, 2) if self._batches_run else 0,
+                'avg_wait_ms': round(self._total_wait / self._items_processed * 1000, 2) if self._items_processed else 0,
+                'max_wait_ms': round(self._max_wait_seen * 1000, 2),
+                'config': {'max_batch_size': self.max_batch_size, 'max_wait_ms': self.max_wait * 1000},
+            }
+
+    def _ensure_worker(self):
+        # Threads do not survive fork(), so a forked worker process starts its own
+        if self._worker is None or not self._worker.is_alive() or self._worker_pid != os.getpid():
+            self._worker_pid = os.getpid()
+            self._worker = threading.Thread(target=self._run, name=f"{self.name}-microbatch", daemon=True)
+            self._worker.start()
+
+    def _next_batch(self):
+        with self._condition:
+            while not self._queue:
+                self._condition.wait()
+
+            # Wait for more work until the batch is full or the oldest item has waited long enough
+            deadline = self._queue[0][3] + self.max_wait
+            while len(self._queue) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            batch = [self._queue.popleft() for _ in range(min(self.max_batch_size, len(self._queue)))]
+
+            started_at = time.perf_counter()
+            waits = [started_at - enqueued_at for _, _, _, enqueued_at in batch]
+            self._batches_run += 1
+            self._items_processed += len(batch)
+            self._last_batch_size = len(batch)
+            self._max_batch_size_seen = max(self._max_batch_size_seen, len(batch))
+            self._total_wait += sum(waits)
+            self._max_wait_seen = max(self._max_wait_seen, max(waits))
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                results = self.batch_fn([item for _, _, item, _ in batch])
+                error = None
+            except Exception as e:
+                print(f"ERROR: {self.name} micro-batch failed: {e}")
+                results = [None] * len(batch)
+                error = e
+
+            for (request, slot, _, _), result in zip(batch, results):
+                request.results[slot] = result
+                if error is not None:
+                    request.error = error
+                request.remaining -= 1
+                if request.remaining == 0:
+                    request.done.set()
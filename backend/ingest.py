@@ -0,0 +1,183 @@
+# backend/ingest.py
+# Imports the scraped station CSVs (mrt_reviews_csvs/<STATION NAME>.csv, columns date and cleaned_reviews)
+# into the reviews table. Run from the repository root:
+#   python -m backend.ingest --db data/mrt_reviews_copy.db --reference-date 2025-06-11
+# Each CSV is read in chunks of --chunk-size rows. Relative dates ("2 months ago", "a year ago") are resolved
+# against --reference-date (the day the reviews were scraped) for a whole chunk at once and stored as
+# precise_review_datetime with is_estimated_date = 1; absolute dates are stored as they are.
+# The station (named after the file) is created if missing, and each file is imported in one transaction.
+# Every imported review stores a content hash, so running the import again only adds reviews it has not seen.
+# Its normalized-text hash is stored too; imported reviews whose text matches an earlier review reuse that
+# review's stored analysis once there is one (backend/analysis_store.py), and the import reports how many repeat.
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+from backend.analysis_store import normalized_text_hash
+from backend.migrations import apply_migrations
+from backend.response_cache import bump_data_version
+
+REFERENCE_DATE = '2025-06-11' # Scrape date of the CSVs shipped in mrt_reviews_csvs
+RELATIVE_DATE_PATTERN = r'^(a|an|one|\d+)\s+(minute|hour|day|week|month|year)s?\s+ago$'
+
+INSERT_REVIEW_SQL = """
+    INSERT INTO reviews (station_id, station_name, review_date, raw_reviews, precise_review_datetime,
+                         is_estimated_date, content_hash, text_hash, review_month, review_year)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def review_content_hash(station_name, text, occurrence):
+    # occurrence counts identical texts within a station (1, 2, ...), so reviews that really are repeated
+    # ("good", "clean") are kept, while the same file imported twice maps onto the same hashes
+    return hashlib.sha1(f"{station_name}\x1f{text}\x1f{occurrence}".encode('utf-8')).hexdigest()
+
+def station_name_for(csv_path):
+    return os.path.splitext(os.path.basename(csv_path))[0].strip().upper()
+
+def resolve_review_dates(dates, reference_date):
+    # dates: pandas Series of raw date strings. Returns (datetimes, is_estimated): relative dates counted back
+    # from reference_date (months and years by calendar, keeping the day of month where it exists), other
+    # values parsed as absolute dates; NaT where neither works.
+    import numpy as np
+    import pandas as pd
+
+    reference = pd.Timestamp(reference_date).normalize()
+    parts = dates.str.strip().str.lower().str.extract(RELATIVE_DATE_PATTERN)
+    amount = pd.to_numeric(parts[0].replace({'a': '1', 'an': '1', 'one': '1'}), errors='coerce')
+    unit = parts[1]
+
+    resolved = pd.Series(pd.NaT, index=dates.index, dtype='datetime64[ns]')
+    for unit_name, step in (('minute', 'min'), ('hour', 'h'), ('day', 'D'), ('week', 'W')):
+        mask = unit == unit_name
+        resolved[mask] = reference - pd.to_timedelta(amount[mask], unit=step)
+
+    calendar = unit.isin(['month', 'year'])
+    if calendar.any():
+        months_back = (amount[calendar] * np.where(unit[calendar] == 'year', 12, 1)).astype('int64')
+        month_index = reference.year * 12 + (reference.month - 1) - months_back
+        first_of_month = pd.to_datetime(pd.DataFrame({'year': month_index // 12, 'month': month_index % 12 + 1, 'day': 1}))
+        day = np.minimum(reference.day, first_of_month.dt.days_in_month) - 1
+        resolved[calendar] = first_of_month + pd.to_timedelta(day, unit='D')
+
+    is_estimated = unit.notna()
+    absolute = ~is_estimated & dates.notna()
+    resolved[absolute] = pd.to_datetime(dates[absolute], errors='coerce', format='mixed')
+    return resolved, is_estimated
+
+def _station_id(conn, station_name):
+    conn.execute("INSERT OR IGNORE INTO stations (station_name) VALUES (?)", (station_name,))
+    return conn.execute("SELECT station_id FROM stations WHERE station_name = ?", (station_name,)).fetchone()[0]
+
+def _known_text_hashes(conn, text_hashes, batch_size=500):
+    text_hashes = list(text_hashes)
+    known = set()
+    for start in range(0, len(text_hashes), batch_size):
+        batch = text_hashes[start:start + batch_size]
+        known.update(row[0] for row in conn.execute(
+            f"SELECT DISTINCT text_hash FROM reviews WHERE text_hash IN ({','.join('?' * len(batch))})", batch))
+    return known
+
+def ingest_csv(conn, csv_path, reference_date=REFERENCE_DATE, chunk_size=1000):
+    import pandas as pd
+
+    station_name = station_name_for(csv_path)
+    stats = {'file': os.path.basename(csv_path), 'station': station_name, 'rows': 0, 'inserted': 0,
+             'duplicates': 0, 'empty': 0, 'undated': 0, 'text_duplicates': 0}
+    with conn: # One transaction per file: either the whole file is imported or none of it
+        station_id = _station_id(conn, station_name)
+        seen = {row[0] for row in conn.execute(
+            "SELECT content_hash FROM reviews WHERE station_id = ? AND content_hash IS NOT NULL", (station_id,))}
+        occurrences = {}
+
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_size, dtype=str, keep_default_na=False):
+            missing = {'date', 'cleaned_reviews'} - set(chunk.columns)
+            if missing:
+                raise ValueError(f"'{csv_path}' is missing the column(s) {', '.join(sorted(missing))}.")
+            stats['rows'] += len(chunk)
+            review_dates = chunk['date'].str.strip()
+            texts = chunk['cleaned_reviews'].str.strip()
+            resolved, is_estimated = resolve_review_dates(review_dates, reference_date)
+            stamps = resolved.dt.strftime('%Y-%m-%d %H:%M:%S')
+
+            text_hashes = [normalized_text_hash(text) for text in texts]
+            known_texts = _known_text_hashes(conn, set(text_hashes)) # Includes rows inserted from earlier chunks
+
+            rows = []
+            for review_date, text, text_hash, stamp, estimated in zip(review_dates, texts, text_hashes, stamps, is_estimated):
+                if not text:
+                    stats['empty'] += 1
+                    continue
+                occurrences[text] = occurrences.get(text, 0) + 1
+                content_hash = review_content_hash(station_name, text, occurrences[text])
+                if content_hash in seen:
+                    stats['duplicates'] += 1
+                    continue
+                seen.add(content_hash)
+                if not isinstance(stamp, str): # NaN: neither a relative nor an absolute date
+                    stamp = None
+                    stats['undated'] += 1
+                if text_hash in known_texts: # Same normalized text as a stored review; its analysis can be reused
+                    stats['text_duplicates'] += 1
+                known_texts.add(text_hash)
+                rows.append((station_id, station_name, review_date, text, stamp, bool(estimated), content_hash, text_hash,
+                             stamp and stamp[:7], stamp and stamp[:4])) # review_month, review_year
+            conn.executemany(INSERT_REVIEW_SQL, rows)
+            stats['inserted'] += len(rows)
+        if stats['inserted']: # New reviews show up in the dashboards; drop their cached responses
+            bump_data_version(conn)
+    return stats
+
+def ingest_directory(db_path, csv_dir, reference_date=REFERENCE_DATE, chunk_size=1000):
+    conn = sqlite3.connect(db_path)
+    try:
+        apply_migrations(conn) # content_hash column (and its backfill) on existing databases
+        results, failed = [], 0
+        for filename in sorted(os.listdir(csv_dir)):
+            if not filename.lower().endswith('.csv'):
+                continue
+            started = time.perf_counter()
+            try:
+                stats = ingest_csv(conn, os.path.join(csv_dir, filename), reference_date, chunk_size)
+            except Exception as e:
+                print(f"[FAILED] {filename}: {e}")
+                failed += 1
+                continue
+            results.append(stats)
+            print(f"[OK] {filename} -> {stats['station']}: {stats['inserted']} inserted, {stats['duplicates']} already imported, "
+                  f"{stats['empty']} empty, {stats['undated']} undated, {stats['text_duplicates']} repeated texts "
+                  f"({time.perf_counter() - started:.2f}s)")
+        inserted = sum(stats['inserted'] for stats in results)
+        duplicates = sum(stats['duplicates'] for stats in results)
+        text_duplicates = sum(stats['text_duplicates'] for stats in results)
+        print(f"Imported {inserted} reviews from {len(results)} files ({duplicates} already imported, {failed} files failed).")
+        # A repeat only saves inference once some review with that text has been analysed (and stored) with the
+        # current versions; existing analyses are seeded into the store by migration 10 (backfill_analysis_store)
+        print(f"Dedup hit rate: {text_duplicates}/{inserted} imported reviews ({text_duplicates / inserted if inserted else 0:.1%}) "
+              f"repeat the text of an earlier review; each distinct text is analysed at most once per model/dictionary version.")
+        return results, failed
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import the scraped station review CSVs into the reviews table.")
+    parser.add_argument('--db', default=os.environ.get('ABSA_DB_PATH', os.path.join('data', 'mrt_reviews_copy.db')))
+    parser.add_argument('--csv-dir', default='mrt_reviews_csvs')
+    parser.add_argument('--reference-date', default=REFERENCE_DATE,
+                        help="Date the CSVs were scraped; relative dates are counted back from it (YYYY-MM-DD).")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="CSV rows read and inserted at a time.")
+    args = parser.parse_args(argv)
+
+    datetime.strptime(args.reference_date, '%Y-%m-%d') # Fail early on a malformed date
+    _, failed = ingest_directory(args.db, args.csv_dir, args.reference_date, args.chunk_size)
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,309 @@
+# backend/migrations.py
+# Versioned schema changes for an existing database (db.create_all() only creates missing tables, it never
+# alters one). MIGRATIONS is an ordered list of (version, step); the database's PRAGMA user_version records
+# the last version applied, and each step runs in its own transaction together with the version bump.
+# Steps also check the current schema first, so a database created by db.create_all() (already current,
+# but at user_version 0) just has its version brought up to date. Run from the repository root:
+#   python -m backend.migrations --db data/mrt_reviews_copy.db
+# create_app() also applies them on startup. New steps go at the end of MIGRATIONS with the next version.
+
+import argparse
+import json
+import os
+import sqlite3
+
+
+def _tables(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+def _add_column(conn, table, column, definition):
+    if column in _columns(conn, table):
+        return False
+    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    return True
+
+def add_analysis_version_columns(conn):
+    # Which weights / aspect dictionary produced each model row; NULL for 'Manual Edit' rows and for rows
+    # written before the columns existed (the incremental re-analysis treats those as out of date)
+    added = _add_column(conn, 'AspectSentiments', 'model_version', 'VARCHAR(64)')
+    added = _add_column(conn, 'AspectSentiments', 'dictionary_version', 'VARCHAR(64)') or added
+    return added
+
+def add_review_content_hash(conn):
+    # Dedup key of reviews imported by backend/ingest.py. Reviews already imported from the CSVs (the ones with
+    # estimated dates) get theirs now, in reviews_id order, so the first ingest run does not import them again.
+    if not _add_column(conn, 'reviews', 'content_hash', 'VARCHAR(40)'):
+        return False
+    from backend.ingest import review_content_hash
+    occurrences, updates = {}, []
+    for review_id, station_name, text in conn.execute(
+            "SELECT reviews_id, station_name, raw_reviews FROM reviews WHERE is_estimated_date = 1 ORDER BY reviews_id"):
+        key = (station_name, text)
+        occurrences[key] = occurrences.get(key, 0) + 1
+        updates.append((review_content_hash(station_name, text, occurrences[key]), review_id))
+    conn.executemany("UPDATE reviews SET content_hash = ? WHERE reviews_id = ?", updates)
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_reviews_content_hash ON reviews (content_hash)")
+    return True
+
+def add_analysis_store(conn):
+    # Normalized-text hash on every review plus the hash -> aspects store (see backend/analysis_store.py)
+    changed = False
+    if _add_column(conn, 'reviews', 'text_hash', 'VARCHAR(40)'):
+        from backend.analysis_store import normalized_text_hash
+        conn.executemany("UPDATE reviews SET text_hash = ? WHERE reviews_id = ?",
+                         [(normalized_text_hash(text), review_id) for review_id, text in conn.execute("SELECT reviews_id, raw_reviews FROM reviews")])
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_reviews_text_hash ON reviews (text_hash)")
+        changed = True
+    if 'analysis_results' not in _tables(conn):
+        conn.execute("""
+            CREATE TABLE analysis_results (
+                text_hash VARCHAR(40) NOT NULL,
+                model_version VARCHAR(64) NOT NULL,
+                dictionary_version VARCHAR(64) NOT NULL,
+                aspects TEXT NOT NULL,
+                created_at DATETIME,
+                PRIMARY KEY (text_hash, model_version, dictionary_version)
+            )
+        """)
+        changed = True
+    return changed
+
+# Same names as the db.Index / index=True declarations in backend/models.py, so fresh databases match
+DASHBOARD_INDEXES = [
+    # Overall distribution (GROUP BY polarity) and top aspects (WHERE polarity = ? GROUP BY category)
+    "CREATE INDEX IF NOT EXISTS ix_aspectsentiments_polarity_category ON AspectSentiments (sentiment_polarity, aspect_category)",
+    # Aspect/polarity breakdowns over all stations
+    "CREATE INDEX IF NOT EXISTS ix_aspectsentiments_category_polarity ON AspectSentiments (aspect_category, sentiment_polarity)",
+    # Per-station breakdowns, station comparison and totals
+    "CREATE INDEX IF NOT EXISTS ix_aspectsentiments_station_category_polarity ON AspectSentiments (station_id, aspect_category, sentiment_polarity)",
+    # Joins with reviews (trends) and the per-review deletes of the re-analysis
+    "CREATE INDEX IF NOT EXISTS ix_aspectsentiments_review_category_polarity ON AspectSentiments (review_id, aspect_category, sentiment_polarity)",
+    "CREATE INDEX IF NOT EXISTS ix_reviews_station_id ON reviews (station_id)",
+    # Latest reviews (ORDER BY ... DESC LIMIT 5) and the per-month / per-year trends
+    "CREATE INDEX IF NOT EXISTS ix_reviews_precise_review_datetime ON reviews (precise_review_datetime)",
+]
+
+def add_dashboard_indexes(conn):
+    for statement in DASHBOARD_INDEXES:
+        conn.execute(statement)
+    conn.execute("DROP INDEX IF EXISTS idx_aspectsentiments_review_id") # Superseded by ix_aspectsentiments_review_category_polarity
+    return True
+
+ASPECT_SENTIMENTS_COLUMNS = [
+    "aspect_sentiment_id INTEGER PRIMARY KEY AUTOINCREMENT",
+    "review_id INTEGER NOT NULL REFERENCES reviews (reviews_id) ON DELETE CASCADE",
+    "station_id INTEGER NOT NULL REFERENCES stations (station_id)",
+    "segment_index INTEGER NOT NULL",
+    "segment_text TEXT NOT NULL",
+    "aspect_category TEXT NOT NULL",
+    "sentiment_polarity TEXT NOT NULL",
+    "extracted_aspect_term TEXT",
+    "analysis_method TEXT",
+    "model_version VARCHAR(64)",
+    "dictionary_version VARCHAR(64)",
+]
+
+def fix_aspect_sentiments_foreign_keys(conn):
+    # The original table declared review_id REFERENCES reviews (review_id), a column that does not exist, so
+    # the key could never be enforced. SQLite cannot alter a constraint: rebuild the table with the right one.
+    if ('reviews', 'review_id', 'reviews_id') in {(row[2], row[3], row[4]) for row in conn.execute("PRAGMA foreign_key_list(AspectSentiments)")}:
+        return False
+    orphans = conn.execute("""
+        SELECT COUNT(*) FROM AspectSentiments a
+        WHERE NOT EXISTS (SELECT 1 FROM reviews r WHERE r.reviews_id = a.review_id)
+           OR NOT EXISTS (SELECT 1 FROM stations s WHERE s.station_id = a.station_id)
+    """).fetchone()[0]
+    if orphans:
+        raise RuntimeError(f"{orphans} AspectSentiments rows reference missing reviews or stations; fix them before migrating.")
+    columns = ', '.join(definition.split()[0] for definition in ASPECT_SENTIMENTS_COLUMNS)
+    sequence = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'AspectSentiments'").fetchone() # AUTOINCREMENT high-water mark
+    conn.execute(f"CREATE TABLE AspectSentiments_new ({', '.join(ASPECT_SENTIMENTS_COLUMNS)})")
+    conn.execute(f"INSERT INTO AspectSentiments_new ({columns}) SELECT {columns} FROM AspectSentiments")
+    conn.execute("DROP TABLE AspectSentiments") # Also drops its indexes
+    conn.execute("ALTER TABLE AspectSentiments_new RENAME TO AspectSentiments")
+    if sequence: # Ids of deleted rows are never handed out again
+        conn.execute("DELETE FROM sqlite_sequence WHERE name = 'AspectSentiments'")
+        conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('AspectSentiments', ?)", sequence)
+    add_dashboard_indexes(conn)
+    violations = conn.execute("PRAGMA foreign_key_check").fetchall()
+    if violations: # Rolls the rebuild back
+        raise RuntimeError(f"{len(violations)} foreign key violations after the rebuild, e.g. {violations[0]}.")
+    return True
+
+# rollup.rebuild_rollup as it was when step 6 shipped: the months came from reviews.precise_review_datetime
+# (AspectSentiments.review_month only exists from step 8, which rebuilds the rollup on it). Kept as a copy so
+# the step runs the same SQL on every database, whatever rollup.py does now.
+_ROLLUP_V6_REBUILD_SQL = """
+    INSERT INTO sentiment_rollup (station_id, aspect_category, sentiment_polarity, month, aspect_count)
+    SELECT a.station_id, a.aspect_category, a.sentiment_polarity,
+           COALESCE(strftime('%Y-%m', r.precise_review_datetime), '') AS month, COUNT(*) AS aspect_count
+    FROM AspectSentiments a JOIN reviews r ON r.reviews_id = a.review_id
+    GROUP BY a.station_id, a.aspect_category, a.sentiment_polarity, month
+"""
+
+def add_sentiment_rollup(conn):
+    # Aggregates the dashboards read (see backend/rollup.py), filled from the existing rows
+    from backend.rollup import CREATE_ROLLUP_SQL
+    conn.execute(CREATE_ROLLUP_SQL)
+    conn.execute("DELETE FROM sentiment_rollup")
+    conn.execute(_ROLLUP_V6_REBUILD_SQL)
+    return True
+
+def add_data_version(conn):
+    # Counter behind the dashboard response cache (see backend/response_cache.py)
+    from backend.response_cache import CREATE_DATA_VERSION_SQL, bump_data_version
+    conn.execute(CREATE_DATA_VERSION_SQL)
+    bump_data_version(conn)
+    return True
+
+# Same names as the declarations in backend/models.py
+MONTH_INDEXES = [
+    # Reviews per year, over all stations or one, optionally within a month range
+    "CREATE INDEX IF NOT EXISTS ix_reviews_year_month ON reviews (review_year, review_month)",
+    "CREATE INDEX IF NOT EXISTS ix_reviews_station_year_month ON reviews (station_id, review_year, review_month)",
+    # Month-range aggregates straight from the aspect rows
+    "CREATE INDEX IF NOT EXISTS ix_aspectsentiments_month_category_polarity ON AspectSentiments (review_month, aspect_category, sentiment_polarity)",
+    # Trend filters on the rollup without a station (with one, its primary key is used)
+    "CREATE INDEX IF NOT EXISTS ix_sentiment_rollup_month_category ON sentiment_rollup (month, aspect_category)",
+]
+
+def add_review_month_columns(conn):
+    # Stored 'YYYY-MM' / 'YYYY' buckets of reviews.precise_review_datetime (NULL when undated), with the month
+    # copied onto the review's aspect rows, so time series group and filter on indexed columns instead of
+    # calling strftime() on every row
+    _add_column(conn, 'reviews', 'review_month', 'VARCHAR(7)')
+    _add_column(conn, 'reviews', 'review_year', 'VARCHAR(4)')
+    _add_column(conn, 'AspectSentiments', 'review_month', 'VARCHAR(7)')
+    conn.execute("""
+        UPDATE reviews
+        SET review_month = strftime('%Y-%m', precise_review_datetime), review_year = strftime('%Y', precise_review_datetime)
+    """)
+    conn.execute("""
+        UPDATE AspectSentiments
+        SET review_month = (SELECT r.review_month FROM reviews r WHERE r.reviews_id = AspectSentiments.review_id)
+    """)
+    from backend.rollup import rebuild_rollup
+    from backend.response_cache import bump_data_version
+    rebuild_rollup(conn) # Now keyed on the stored months
+    bump_data_version(conn) # The data_version table exists since step 7
+    for statement in MONTH_INDEXES:
+        conn.execute(statement)
+    return True
+
+def add_review_analysis_versions(conn):
+    # The versions that last analysed each review, so the incremental re-analysis also settles reviews that
+    # produced no aspects. Reviews whose 'Hybrid' rows agree on one pair of versions inherit it; the rest
+    # (no model rows, mixed versions) stay NULL and are analysed once more.
+    added = _add_column(conn, 'reviews', 'analysis_model_version', 'VARCHAR(64)')
+    added = _add_column(conn, 'reviews', 'analysis_dictionary_version', 'VARCHAR(64)') or added
+    if added:
+        conn.execute("""
+            UPDATE reviews
+            SET (analysis_model_version, analysis_dictionary_version) = (
+                SELECT MIN(a.model_version), MIN(a.dictionary_version)
+                FROM AspectSentiments a
+                WHERE a.review_id = reviews.reviews_id AND a.analysis_method = 'Hybrid'
+                HAVING COUNT(DISTINCT a.model_version) = 1 AND COUNT(DISTINCT a.dictionary_version) = 1
+                   AND COUNT(a.model_version) = COUNT(*) AND COUNT(a.dictionary_version) = COUNT(*)
+            )
+        """)
+    return added
+
+def backfill_analysis_store(conn):
+    # analysis_results starts empty on an existing database; seed it from the reviews whose model analysis is
+    # already stored as aspect rows (their recorded versions, see step 9) so the first run of the web app,
+    # reanalyze or ingest reuses them. Only reviews without 'Manual Edit' rows whose 'Hybrid' rows all carry
+    # the review's versions qualify; the first review of each normalized text wins.
+    from datetime import datetime
+    from backend.analysis_store import INSERT_ANALYSIS_SQL
+    reviews = conn.execute("""
+        SELECT r.reviews_id, r.text_hash, r.analysis_model_version, r.analysis_dictionary_version
+        FROM reviews r
+        WHERE r.text_hash IS NOT NULL AND r.analysis_model_version IS NOT NULL AND r.analysis_dictionary_version IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM AspectSentiments a
+                          WHERE a.review_id = r.reviews_id
+                            AND (a.analysis_method IS NOT 'Hybrid' OR a.model_version IS NOT r.analysis_model_version
+                                 OR a.dictionary_version IS NOT r.analysis_dictionary_version))
+        ORDER BY r.reviews_id
+    """).fetchall()
+    aspects = {}
+    for review_id, term, category, polarity in conn.execute("""
+            SELECT a.review_id, a.extracted_aspect_term, a.aspect_category, a.sentiment_polarity
+            FROM AspectSentiments a JOIN reviews r ON r.reviews_id = a.review_id
+            WHERE a.analysis_method = 'Hybrid' AND a.model_version = r.analysis_model_version
+            """):
+        aspects.setdefault(review_id, []).append({'term': term, 'category': category, 'polarity': polarity})
+    created_at = datetime.now().isoformat(sep=' ', timespec='seconds')
+    rows = [(text_hash, model_version, dictionary_version,
+             json.dumps(sorted(aspects.get(review_id, []), key=lambda aspect: (aspect['category'], aspect['term']))), created_at)
+            for review_id, text_hash, model_version, dictionary_version in reviews]
+    conn.executemany(INSERT_ANALYSIS_SQL, rows) # INSERT OR IGNORE: stored analyses and earlier reviews win
+    return bool(rows)
+
+MIGRATIONS = [
+    (1, add_analysis_version_columns),
+    (2, add_review_content_hash),
+    (3, add_analysis_store),
+    (4, add_dashboard_indexes),
+    (5, fix_aspect_sentiments_foreign_keys),
+    (6, add_sentiment_rollup),
+    (7, add_data_version),
+    (8, add_review_month_columns),
+    (9, add_review_analysis_versions),
+    (10, backfill_analysis_store),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def apply_migrations(conn):
+    # conn is a sqlite3 connection; returns the names of the steps that changed something
+    if not {'reviews', 'AspectSentiments'} <= _tables(conn): # Fresh database; db.create_all() builds the current schema
+        return []
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("PRAGMA foreign_keys = OFF") # Table rebuilds must not cascade; cannot change inside a transaction
+    applied = []
+    current = schema_version(conn)
+    for version, migration in MIGRATIONS:
+        if version <= current:
+            continue
+        # Explicit, so DDL is part of the transaction too; IMMEDIATE takes the write lock up front, so app
+        # workers starting together migrate one after another and the later ones find the step applied
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            if migration(conn):
+                applied.append(migration.__name__)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return applied
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bring an existing database up to the current schema.")
+    parser.add_argument('--db', default=os.environ.get('ABSA_DB_PATH', os.path.join('data', 'mrt_reviews_copy.db')))
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    try:
+        applied = apply_migrations(conn)
+        version = schema_version(conn)
+    finally:
+        conn.close()
+    print(f"Applied: {', '.join(applied)}" if applied else "Schema is up to date.")
+    print(f"Schema version {version} (latest {SCHEMA_VERSION}).")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,96 +1,208 @@
 # backend/model_loader.py
 
 import os
+import copy
+import hashlib
 import torch
-from transformers import BertTokenizer, BertConfig
-from .bert_ate_absa_models import bert_ATE, bert_ABSA
+from safetensors import safe_open
+from safetensors.torch import load_file as load_safetensors
+from transformers import BertTokenizerFast, BertConfig
+from transformers.modeling_utils import no_init_weights
+from .bert_ate_absa_models import bert_ATE, bert_ABSA, bert_ATE_ABSA
+from .inference_scheduler import MicroBatchScheduler
+from .result_cache import ResultCache
+from .dictionary_matcher import DictionaryMatcher
+from .inference_backends import load_torchscript
+from .analysis_store import normalize_review_text
 import re
+import threading
+import time
 import pandas as pd
 
+# Model loading: nothing is loaded at import. ABSA_MODEL_LOADING='background' (default) makes create_app start
+# a warm-up thread, 'lazy' loads on the first inference call, 'eager' blocks app creation.
+MODEL_LOADING = os.environ.get('ABSA_MODEL_LOADING', 'background').strip().lower()
+model_load_state = 'not_loaded' # not_loaded -> loading -> ready | failed
+model_load_error = None
+model_load_seconds = None
+_model_load_lock = threading.Lock()
+_model_load_done = threading.Event()
+
 # Global variables for models and tokenizer
-ate_tokenizer = None
+tokenizer = None # One fast tokenizer shared by every model; calls go through _encode / _tokenizer_lock
+ate_tokenizer = None # Aliases of tokenizer, kept for existing callers
 absa_tokenizer = None
+_tokenizer_lock = threading.Lock() # The Rust tokenizer is not safe to call from two threads at once
 ate_model = None
 absa_model = None
+joint_model = None
 device = None
 aspect_dictionary = {}
+aspect_dictionary_path = None
+dictionary_matcher = None # Built from aspect_dictionary at load time, see identify_dictionary_terms
+loaded_model_paths = [] # Weight files behind the current models, used for the cache fingerprint
+loaded_model_digests = [] # sha1 of the .pkl state dict each loaded model came from, see _source_digest
+MODEL_VERSION = None # Set once the models are loaded, see get_model_version
+MODEL_FINGERPRINT = None
 
 # Declare these as global placeholders that will be populated by _load_absa_models_once
 ATE_ID2LABEL = None
 ABSA_ID2LABEL = None
 
+# Inference mode: 'pipeline' runs bert_ATE then bert_ABSA per term,
+# 'joint' runs bert_ATE_ABSA once per segment and classifies every span from the same hidden states
+INFERENCE_MODE = os.environ.get('ABSA_INFERENCE_MODE', 'pipeline').strip().lower()
+
+# Inference precision applied at load time: 'fp32', 'int8' (dynamic quantization of the nn.Linear
+# layers, CPU only) or 'bf16' (where the hardware supports it). Unsupported choices fall back to fp32.
+INFERENCE_PRECISION = os.environ.get('ABSA_INFERENCE_PRECISION', 'fp32').strip().lower()
+active_precision = None # What was actually applied, after any fallback
+
+# Inference backend: 'eager' runs the nn.Modules built from the .pkl state dicts, 'torchscript' runs
+# the frozen graphs written by `python -m backend.export_models` (pipeline mode only)
+INFERENCE_BACKEND = os.environ.get('ABSA_INFERENCE_BACKEND', 'eager').strip().lower()
+active_backend = None
+
+# Cross-request micro-batching: ATE segments and ABSA pairs from concurrent requests share forward passes
+MICROBATCH_ENABLED = os.environ.get('ABSA_MICROBATCH', '1').strip() != '0'
+MICROBATCH_MAX_SIZE = int(os.environ.get('ABSA_MICROBATCH_MAX_SIZE', '32'))
+MICROBATCH_MAX_WAIT_MS = float(os.environ.get('ABSA_MICROBATCH_MAX_WAIT_MS', '5'))
+ate_scheduler = None
+absa_scheduler = None
+_scheduler_lock = threading.Lock()
+
+# Result caches: whole-review results keyed on preprocessed text, and per-(segment, term) polarities.
+# Both are invalidated whenever the model weights or the aspect dictionary change.
+CACHE_TTL_SECONDS = float(os.environ.get('ABSA_CACHE_TTL_SECONDS', '3600'))
+review_cache = ResultCache('review', int(os.environ.get('ABSA_REVIEW_CACHE_SIZE', '1024')), CACHE_TTL_SECONDS)
+sentiment_cache = ResultCache('sentiment', int(os.environ.get('ABSA_SENTIMENT_CACHE_SIZE', '8192')), CACHE_TTL_SECONDS)
+
 
 # --- NEW: Function to load models and dictionary once ---
 def _load_absa_models_once():
-    global ate_tokenizer, absa_tokenizer, ate_model, absa_model, device, aspect_dictionary
+    global tokenizer, ate_tokenizer, absa_tokenizer, ate_model, absa_model, joint_model, device, loaded_model_paths, loaded_model_digests
     global ATE_ID2LABEL, ABSA_ID2LABEL # Declare these as global inside the loading function
 
     # Set device (GPU if available, else CPU)
     device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
     print(f"Using device: {device}")
 
-    # Load Tokenizers
-    ate_tokenizer = BertTokenizer.from_pretrained("bert-base-uncased")
-    absa_tokenizer = BertTokenizer.from_pretrained("bert-base-uncased")
-    print("Tokenizers 'bert-base-uncased' loaded.")
+    # Load Tokenizer (ATE and ABSA were trained with the same bert-base-uncased vocabulary)
+    tokenizer = BertTokenizerFast.from_pretrained("bert-base-uncased")
+    ate_tokenizer = absa_tokenizer = tokenizer
+    print("Tokenizer 'bert-base-uncased' (fast) loaded.")
 
     # Define Model Configurations and Mappings - these were here previously,
     # but let's make sure they are explicitly assigned to globals
     # ATE Model (Aspect Term Extraction)
     ATE_LABELS = ['non-aspect', 'b-term', 'i-term']
     ATE_ID2LABEL = {i: label for i, label in enumerate(ATE_LABELS)} # Assign to global
-    ATE_LABEL2ID = {label: i for i, label in enumerate(ATE_LABELS)}
     # NUM_ATE_LABELS = len(ATE_LABELS) # This variable is not directly used globally
 
     # ABSA Model (Aspect-Based Sentiment Analysis)
     ABSA_LABELS = ['Negative', 'Neutral', 'Positive']
     ABSA_ID2LABEL = {i: label for i, label in enumerate(ABSA_LABELS)} # Assign to global
-    ABSA_LABEL2ID = {label: i for label, i in enumerate(ABSA_LABELS)}
     # NUM_ABSA_LABELS = len(ABSA_LABELS) # This variable is not directly used globally
 
     # Define absolute paths for models and dictionary - Ensure these paths are correct on your system
     # For more portable deployment, consider relative paths or environment variables.
-    ate_model_path = r"C:\Users\unitf\OneDrive\Desktop\FYP\mrt_absa_webapp\backend\models\ate_model_v1.pkl"
-    absa_model_path = r"C:\Users\unitf\OneDrive\Desktop\FYP\mrt_absa_webapp\backend\models\absa_model_v1.pkl"
-    ASPECT_DICT_PATH = r"C:\Users\unitf\OneDrive\Desktop\FYP\Data\aspect_dictionary.csv"
-
-    # Initialize model architecture
-    ate_config = BertConfig.from_pretrained("bert-base-uncased")
-    absa_config = BertConfig.from_pretrained("bert-base-uncased")
-
-    ate_model_instance = bert_ATE(ate_config)
-    absa_model_instance = bert_ABSA(absa_config)
-
-    try:
-        ate_model_instance.load_state_dict(torch.load(ate_model_path, map_location=device))
-        ate_model = ate_model_instance # Assign to global variable
-        ate_model.to(device)
-        ate_model.eval()
-        print(f"ATE model '{ate_model_path}' loaded successfully on {device}.")
-    except FileNotFoundError:
-        print(f"Error: ATE model file '{ate_model_path}' not found. Please ensure the path is correct.")
-        ate_model = None
-    except Exception as e:
-        print(f"Error loading ATE model from '{ate_model_path}': {e}")
-        ate_model = None
-
+    ate_model_path = os.environ.get('ABSA_ATE_MODEL_PATH', r"C:\Users\unitf\OneDrive\Desktop\FYP\mrt_absa_webapp\backend\models\ate_model_v1.pkl")
+    absa_model_path = os.environ.get('ABSA_ABSA_MODEL_PATH', r"C:\Users\unitf\OneDrive\Desktop\FYP\mrt_absa_webapp\backend\models\absa_model_v1.pkl")
+    joint_model_path = os.environ.get('ABSA_JOINT_MODEL_PATH', r"C:\Users\unitf\OneDrive\Desktop\FYP\mrt_absa_webapp\backend\models\joint_model_v1.pkl")
+    ate_torchscript_path = os.environ.get('ABSA_ATE_TORCHSCRIPT_PATH', torchscript_path_for(ate_model_path))
+    absa_torchscript_path = os.environ.get('ABSA_ABSA_TORCHSCRIPT_PATH', torchscript_path_for(absa_model_path))
+    ASPECT_DICT_PATH = os.environ.get('ABSA_DICT_PATH', r"C:\Users\unitf\OneDrive\Desktop\FYP\Data\aspect_dictionary.csv")
+
+    # Initialize model architecture and load the weights for the selected inference mode and backend
+    backend = _resolve_inference_backend()
+    if INFERENCE_MODE == 'joint':
+        bert_config = BertConfig.from_pretrained("bert-base-uncased")
+        joint_model_path = _resolve_weight_path(joint_model_path)
+        joint_model = _load_model_weights(bert_ATE_ABSA, bert_config, joint_model_path, "Joint ATE+ABSA")
+    elif backend == 'torchscript':
+        ate_model = _load_torchscript_model(ate_torchscript_path, 'ate', "ATE")
+        absa_model = _load_torchscript_model(absa_torchscript_path, 'absa', "ABSA")
+        ate_model_path, absa_model_path = ate_torchscript_path, absa_torchscript_path
+    else:
+        bert_config = BertConfig.from_pretrained("bert-base-uncased")
+        ate_model_path = _resolve_weight_path(ate_model_path)
+        absa_model_path = _resolve_weight_path(absa_model_path)
+
+        ate_model = _load_model_weights(bert_ATE, bert_config, ate_model_path, "ATE")
+        absa_model = _load_model_weights(bert_ABSA, bert_config, absa_model_path, "ABSA")
+
+    loaded_model_paths = [path for path, model in ((ate_model_path, ate_model), (absa_model_path, absa_model), (joint_model_path, joint_model)) if model is not None]
+    loaded_model_digests = [_source_digest(path, model) for path, model in ((ate_model_path, ate_model), (absa_model_path, absa_model), (joint_model_path, joint_model)) if model is not None]
+
+    # Load Aspect Dictionary (this also refreshes the result caches for the new models)
+    _load_aspect_dictionary(ASPECT_DICT_PATH)
+
+# --- Lazy / background loading ---
+def _models_available():
+    if INFERENCE_MODE == 'joint':
+        models_missing = joint_model is None or ate_tokenizer is None
+    else:
+        models_missing = ate_model is None or absa_model is None or ate_tokenizer is None or absa_tokenizer is None
+    return not models_missing and ATE_ID2LABEL is not None and ABSA_ID2LABEL is not None
+
+def _claim_model_loading():
+    # Only the first caller loads; everyone else waits on _model_load_done
+    global model_load_state
+    with _model_load_lock:
+        if model_load_state != 'not_loaded':
+            return False
+        model_load_state = 'loading'
+        return True
+
+def _run_model_loading():
+    global model_load_state, model_load_error, model_load_seconds, MODEL_VERSION
+    print("Loading ABSA models...")
+    start = time.perf_counter()
     try:
-        absa_model_instance.load_state_dict(torch.load(absa_model_path, map_location=device))
-        absa_model = absa_model_instance # Assign to global variable
-        absa_model.to(device)
-        absa_model.eval()
-        print(f"ABSA model '{absa_model_path}' loaded successfully on {device}.")
-    except FileNotFoundError:
-        print(f"Error: ABSA model file '{absa_model_path}' not found. Please ensure the path is correct.")
-        absa_model = None
+        _load_absa_models_once()
+        # Here rather than on first use, so a preloading gunicorn master hashes any weights once before forking
+        MODEL_VERSION = _compute_model_version()
+        if _models_available():
+            model_load_state = 'ready'
+        else:
+            model_load_state = 'failed'
+            model_load_error = "One or more models or tokenizers failed to load; see the log above."
     except Exception as e:
-        print(f"Error loading ABSA model from '{absa_model_path}': {e}")
-        absa_model = None
-
-    # Load Aspect Dictionary
+        print(f"Model loading failed: {e}. Inference endpoints will not function.")
+        model_load_state = 'failed'
+        model_load_error = str(e)
+    finally:
+        model_load_seconds = round(time.perf_counter() - start, 2)
+        _model_load_done.set()
+    print(f"ABSA model loading finished in {model_load_seconds}s ({model_load_state}).")
+
+def ensure_models_loaded(timeout=None):
+    # Loads the models in this thread if nobody has started yet, otherwise waits for the load in progress
+    if _claim_model_loading():
+        _run_model_loading()
+    _model_load_done.wait(timeout)
+    return model_load_state == 'ready'
+
+def get_model_load_status():
+    return {
+        'state': model_load_state,
+        'ready': model_load_state == 'ready',
+        'loading_mode': MODEL_LOADING,
+        'inference_mode': INFERENCE_MODE,
+        'backend': active_backend,
+        'precision': active_precision,
+        'load_seconds': model_load_seconds,
+        'error': model_load_error,
+    }
+
+# --- Load (or reload) the aspect dictionary ---
+def _load_aspect_dictionary(dict_path):
+    global aspect_dictionary_path, dictionary_matcher
+    aspect_dictionary_path = dict_path
+    aspect_dictionary.clear()
     try:
-        if os.path.exists(ASPECT_DICT_PATH):
-            aspect_dict_df = pd.read_csv(ASPECT_DICT_PATH)
+        if os.path.exists(dict_path):
+            aspect_dict_df = pd.read_csv(dict_path)
             if 'term' in aspect_dict_df.columns and 'category' in aspect_dict_df.columns:
                 for index, row in aspect_dict_df.iterrows():
                     term = str(row['term']).strip().lower()
@@ -100,46 +212,287 @@ def _load_absa_models_once():
                             aspect_dictionary[term] = []
                         if category not in aspect_dictionary[term]:
                             aspect_dictionary[term].append(category)
-                print(f"Aspect dictionary '{ASPECT_DICT_PATH}' loaded successfully with {len(aspect_dictionary)} terms.")
+                print(f"Aspect dictionary '{dict_path}' loaded successfully with {len(aspect_dictionary)} terms.")
             else:
-                print(f"Warning: '{ASPECT_DICT_PATH}' must contain 'term' and 'category' columns. Category lookup will not work.")
+                print(f"Warning: '{dict_path}' must contain 'term' and 'category' columns. Category lookup will not work.")
         else:
-            print(f"Warning: Aspect dictionary file '{ASPECT_DICT_PATH}' not found. Category lookup will not work.")
+            print(f"Warning: Aspect dictionary file '{dict_path}' not found. Category lookup will not work.")
     except Exception as e:
         print(f"Error loading aspect dictionary: {e}. Category lookup will not work.")
+    dictionary_matcher = _build_dictionary_matcher()
+    refresh_result_caches()
+
+def _build_dictionary_matcher(dictionary=None):
+    # Longest terms first (the order identify_dictionary_terms has always reported them in),
+    # with categories resolved once here instead of on every match
+    dictionary = aspect_dictionary if dictionary is None else dictionary
+    entries = []
+    for term in sorted(dictionary.keys(), key=len, reverse=True):
+        categories = dictionary.get(_clean_text(term), [])
+        if categories: # Terms without a specific category are never reported
+            entries.append((term, categories[0]))
+    return DictionaryMatcher(entries)
+
+def reload_aspect_dictionary(dict_path=None):
+    # Re-read the dictionary (e.g. after it was edited) and drop results computed with the old one
+    _load_aspect_dictionary(dict_path or aspect_dictionary_path)
+
+# --- Fingerprint of the current weights + dictionary, used to version the result caches ---
+def _compute_model_fingerprint():
+    fingerprint = hashlib.sha1()
+    fingerprint.update(f"{INFERENCE_MODE}:{active_backend}:{active_precision}".encode())
+    for path in loaded_model_paths:
+        try:
+            stat = os.stat(path)
+            fingerprint.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        except OSError:
+            fingerprint.update(path.encode())
+    fingerprint.update(get_dictionary_version().encode())
+    return fingerprint.hexdigest()[:16]
+
+# --- Versions stored with every model-produced AspectSentiments row (see backend/reanalyze.py) ---
+_file_digests = {} # (path, size, mtime) -> sha1 of the file contents
+
+def file_digest(path):
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    if key not in _file_digests:
+        digest = hashlib.sha1()
+        with open(path, 'rb') as weights:
+            for block in iter(lambda: weights.read(1 << 20), b''):
+                digest.update(block)
+        _file_digests[key] = digest.hexdigest()
+    return _file_digests[key]
+
+def _source_digest(path, model):
+    # Digest of the .pkl state dict behind a weight file. Converted files carry it (safetensors metadata,
+    # TorchScript extra file), so the same weights give the same version whatever format is loaded.
+    try:
+        if path.endswith('.safetensors'):
+            with safe_open(path, framework='pt') as weights:
+                digest = (weights.metadata() or {}).get('source_sha1')
+        else:
+            digest = getattr(model, 'source_digest', None)
+        if digest:
+            return digest
+        if path.endswith(('.safetensors', '.torchscript.pt')):
+            print(f"Warning: '{path}' does not record its source .pkl digest; re-run the conversion to keep model_version stable.")
+        return file_digest(path)
+    except OSError:
+        return path
+
+def _compute_model_version():
+    version = hashlib.sha1(f"{INFERENCE_MODE}:{active_precision}".encode())
+    for digest in loaded_model_digests:
+        version.update(digest.encode())
+    return version.hexdigest()[:12]
+
+def get_model_version():
+    # Source weights plus the settings that change their outputs; computed once when the models load
+    return MODEL_VERSION
+
+def get_dictionary_version():
+    version = hashlib.sha1()
+    for term in sorted(aspect_dictionary):
+        version.update(f"{term}={','.join(aspect_dictionary[term])};".encode())
+    return version.hexdigest()[:12]
+
+def refresh_result_caches():
+    global MODEL_FINGERPRINT
+    MODEL_FINGERPRINT = _compute_model_fingerprint()
+    review_cache.invalidate(MODEL_FINGERPRINT)
+    sentiment_cache.invalidate(MODEL_FINGERPRINT)
+
+def get_cache_stats():
+    return {'model_fingerprint': MODEL_FINGERPRINT, 'review': review_cache.stats(), 'sentiment': sentiment_cache.stats()}
+
+# --- Weight files ---
+# ABSA_WEIGHT_FORMAT='auto' (default) uses the .safetensors file written by `python -m backend.convert_weights`
+# next to a .pkl whenever it exists; 'pickle' always reads the .pkl.
+WEIGHT_FORMAT = os.environ.get('ABSA_WEIGHT_FORMAT', 'auto').strip().lower()
+
+def safetensors_path_for(model_path):
+    return os.path.splitext(model_path)[0] + '.safetensors'
+
+def _resolve_weight_path(model_path):
+    if WEIGHT_FORMAT == 'pickle' or model_path.endswith('.safetensors'):
+        return model_path
+    converted = safetensors_path_for(model_path)
+    return converted if os.path.exists(converted) else model_path
+
+# --- Build a model straight from its weight file, returning None on failure ---
+def _load_model_weights(model_class, config, model_path, model_name):
+    try:
+        if model_path.endswith('.safetensors'):
+            # Memory-mapped: on CPU the tensors point into the file's pages, nothing is read or copied up front
+            state_dict = load_safetensors(model_path, device=str(device))
+        else:
+            state_dict = torch.load(model_path, map_location=device)
+        # Skip the random initialization; assign=True then adopts the loaded tensors instead of copying them
+        with no_init_weights():
+            model_instance = model_class(config)
+        model_instance.load_state_dict(state_dict, assign=True)
+        model_instance.to(device)
+        model_instance.eval()
+        model_instance = _apply_inference_precision(model_instance, model_name)
+        print(f"{model_name} model '{model_path}' loaded successfully on {device} ({active_precision}).")
+        return model_instance
+    except FileNotFoundError:
+        print(f"Error: {model_name} model file '{model_path}' not found. Please ensure the path is correct.")
+    except Exception as e:
+        print(f"Error loading {model_name} model from '{model_path}': {e}")
+    return None
+
+# --- Inference backend helpers ---
+def torchscript_path_for(model_path):
+    # Where `python -m backend.export_models` writes the graph for a given .pkl state dict
+    return os.path.splitext(model_path)[0] + '.torchscript.pt'
+
+def _resolve_inference_backend():
+    global active_backend
+    backend = INFERENCE_BACKEND
+    if backend not in ('eager', 'torchscript'):
+        print(f"Warning: unknown ABSA_INFERENCE_BACKEND '{backend}'; using eager.")
+        backend = 'eager'
+    elif backend == 'torchscript' and INFERENCE_MODE == 'joint':
+        print("Warning: the joint model has no TorchScript export; using eager.")
+        backend = 'eager'
+    active_backend = backend
+    return backend
+
+def _load_torchscript_model(model_path, kind, model_name):
+    global active_precision
+    try:
+        model_instance = load_torchscript(model_path, kind, device)
+        # The graph keeps the fp32 weights it was exported with; ABSA_INFERENCE_PRECISION is not re-applied
+        if INFERENCE_PRECISION != 'fp32':
+            print(f"Warning: ABSA_INFERENCE_PRECISION '{INFERENCE_PRECISION}' does not apply to TorchScript graphs; running {model_name} in fp32.")
+        active_precision = 'fp32'
+        print(f"{model_name} TorchScript graph '{model_path}' loaded successfully on {device}.")
+        return model_instance
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {model_name} TorchScript graph '{model_path}' not found or unreadable ({e}). Run `python -m backend.export_models` first.")
+    except Exception as e:
+        print(f"Error loading {model_name} TorchScript graph from '{model_path}': {e}")
+    return None
+
+# --- Precision helpers ---
+def _bf16_supported():
+    if device is not None and device.type == 'cuda':
+        return torch.cuda.is_bf16_supported()
+    try:
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except Exception:
+        return False
+
+def _apply_inference_precision(model_instance, model_name):
+    global active_precision
+    precision = INFERENCE_PRECISION
+    if precision == 'int8' and device.type != 'cpu':
+        print(f"Warning: int8 dynamic quantization only runs on CPU; keeping {model_name} in fp32 on {device}.")
+        precision = 'fp32'
+    elif precision == 'bf16' and not _bf16_supported():
+        print(f"Warning: bf16 is not supported on this {device.type}; keeping {model_name} in fp32.")
+        precision = 'fp32'
+    elif precision not in ('fp32', 'int8', 'bf16'):
+        print(f"Warning: unknown ABSA_INFERENCE_PRECISION '{precision}'; keeping {model_name} in fp32.")
+        precision = 'fp32'
+
+    if precision == 'int8':
+        # Weights of every nn.Linear (attention, feed-forward, classifier heads) become int8;
+        # activations are quantized on the fly, so no calibration or retraining is needed
+        model_instance = torch.ao.quantization.quantize_dynamic(model_instance, {torch.nn.Linear}, dtype=torch.qint8)
+    elif precision == 'bf16':
+        model_instance = model_instance.to(torch.bfloat16)
+
+    active_precision = precision
+    return model_instance
+
+def _encode(*args, **kwargs):
+    # Every batch encode goes through the shared tokenizer under the lock (micro-batch workers run in parallel)
+    with _tokenizer_lock:
+        return tokenizer(*args, **kwargs)
 
 # --- Text Preprocessing (Slightly less aggressive punctuation removal) ---
+def _clean_text(text):
+    # Shared with the persistent analysis store, whose text hashes must agree with the review cache keys
+    return normalize_review_text(text)
+
 def preprocess_text(text):
     if not isinstance(text, str):
         print(f"DEBUG: preprocess_text received non-string: {type(text)}")
         return ""
     original_text = text
-    text = text.lower()
-    # Keep common punctuation that might impact sentiment: .,!?;'
-    # Remove other special characters that are usually noise
-    text = re.sub(r'[^a-z0-9\s.,!?;\'\u2019]', '', text) # \u2019 is unicode for right single quotation mark
-    text = re.sub(r'\s+', ' ', text).strip() # Replace multiple spaces with single space
+    text = _clean_text(text)
     print(f"DEBUG: Preprocessed '{original_text}' to '{text}'")
     return text
 
 # --- Aspect Term Extraction (ATE) Function ---
 def extract_aspect_terms_bert(review_text, max_len=128):
-    print(f"DEBUG: ATE input review_text: '{review_text}'")
+    # Single-text wrapper around the batched extractor so both paths share one decoder
+    return extract_aspect_terms_bert_batch([review_text], max_len=max_len)[0]
+
+# --- BIO decoding for one row of ATE predictions ---
+def _decode_ate_spans(predictions, valid_length):
+    # Returns (start, end) token positions of each predicted aspect, end exclusive
+    spans = []
+    current_start = None
+
+    for i in range(1, valid_length - 1): # Exclude CLS and SEP tokens from direct processing for terms
+        predicted_label = ATE_ID2LABEL.get(int(predictions[i]), 'non-aspect') # Access global ATE_ID2LABEL
+
+        if predicted_label == 'b-term':
+            if current_start is not None:
+                spans.append((current_start, i))
+            current_start = i
+        elif predicted_label == 'i-term':
+            # Only extends an aspect we are already building; a stray 'i-term' is ignored
+            continue
+        else: # 'non-aspect' (O) label
+            if current_start is not None: # If we were building an aspect, finalize it
+                spans.append((current_start, i))
+                current_start = None # Reset for next aspect
+
+    # Add the last aspect if the loop finishes with one in progress
+    if current_start is not None:
+        spans.append((current_start, valid_length - 1))
+    return spans
+
+def _span_to_term(original_tokens, span):
+    start, end = span
+    # Same joining rule as BertTokenizer.convert_tokens_to_string (the fast tokenizer's decoder also cleans up spacing)
+    return " ".join(original_tokens[start:end]).replace(' ##', '').strip()
+
+def _decode_ate_predictions(original_tokens, predictions, valid_length):
+    extracted_aspects = [_span_to_term(original_tokens, span) for span in _decode_ate_spans(predictions, valid_length)]
+    # Deduplicate and clean up any empty strings
+    return list(set([aspect for aspect in extracted_aspects if aspect]))
+
+# --- Batched Aspect Term Extraction (ATE) Function ---
+def extract_aspect_terms_bert_batch(review_texts, max_len=128):
+    """
+    Runs a single bert_ATE forward pass over all texts, padded only to the
+    longest text in the batch. Returns one list of extracted terms per input text.
+    """
+    print(f"DEBUG: ATE batch input ({len(review_texts)} texts): {review_texts}")
+    results = [[] for _ in review_texts]
     if ate_model is None or ate_tokenizer is None or device is None or ATE_ID2LABEL is None: # Added ATE_ID2LABEL check
         print("ERROR: ATE model, tokenizer, device, or ATE_ID2LABEL not loaded for extraction.")
-        return []
+        return results
 
-    preprocessed_text = preprocess_text(review_text)
-    if not preprocessed_text:
-        print("DEBUG: ATE: Preprocessed text is empty.")
-        return []
+    preprocessed_texts = [preprocess_text(text) for text in review_texts]
+    # Empty texts keep their empty result and are left out of the batch
+    batch_indices = [i for i, text in enumerate(preprocessed_texts) if text]
+    if not batch_indices:
+        print("DEBUG: ATE: All preprocessed texts are empty.")
+        return results
 
     try:
-        encoding = ate_tokenizer.encode_plus(
-            preprocessed_text,
+        encoding = _encode(
+            [preprocessed_texts[i] for i in batch_indices],
             add_special_tokens=True,
             max_length=max_len,
-            padding='max_length',
+            padding='longest',
             truncation=True,
             return_tensors='pt',
         )
@@ -149,72 +502,58 @@ def extract_aspect_terms_bert(review_text, max_len=128):
         with torch.no_grad():
             outputs = ate_model(input_ids, attention_mask=attention_mask)
             logits = outputs['logits']
-        
-        predictions = torch.argmax(logits, dim=2).squeeze().cpu().numpy()
-        
-        extracted_aspects = []
-        current_aspect_tokens = []
-        original_tokens = ate_tokenizer.convert_ids_to_tokens(input_ids.squeeze().cpu().numpy())
-        valid_length = (attention_mask.squeeze() == 1).sum().item()
-        
-        print(f"DEBUG: ATE original tokens: {original_tokens[:valid_length]}")
-        print(f"DEBUG: ATE predictions (first valid tokens): {predictions[:valid_length]}")
 
-        for i in range(1, valid_length - 1): # Exclude CLS and SEP tokens from direct processing for terms
-            token = original_tokens[i]
-            predicted_label_id = predictions[i]
-            predicted_label = ATE_ID2LABEL.get(predicted_label_id, 'non-aspect') # Access global ATE_ID2LABEL
-            
-            if predicted_label == 'b-term':
-                if current_aspect_tokens:
-                    # Clean up the previous aspect term before adding the new one
-                    extracted_aspects.append(ate_tokenizer.convert_tokens_to_string(current_aspect_tokens).replace(' ##', ''))
-                current_aspect_tokens = [token]
-            elif predicted_label == 'i-term':
-                if current_aspect_tokens: # Only append if we are already building an aspect
-                    current_aspect_tokens.append(token)
-                # else: # If 'i-term' appears without a preceding 'b-term', treat as 'O' or ignore
-                #     current_aspect_tokens = []
-            else: # 'non-aspect' (O) label
-                if current_aspect_tokens: # If we were building an aspect, finalize it
-                    extracted_aspects.append(ate_tokenizer.convert_tokens_to_string(current_aspect_tokens).replace(' ##', ''))
-                    current_aspect_tokens = [] # Reset for next aspect
-
-        # Add the last aspect if the loop finishes with one in progress
-        if current_aspect_tokens:
-            extracted_aspects.append(ate_tokenizer.convert_tokens_to_string(current_aspect_tokens).replace(' ##', ''))
-        
-        # Deduplicate and clean up any empty strings
-        final_extracted = list(set([aspect.strip() for aspect in extracted_aspects if aspect.strip()]))
-        print(f"DEBUG: ATE Final extracted aspects: {final_extracted}")
-        return final_extracted
+        predictions = torch.argmax(logits, dim=2).cpu().numpy()
+        input_ids_cpu = input_ids.cpu().numpy()
+        valid_lengths = attention_mask.sum(dim=1).tolist()
+
+        for row, text_index in enumerate(batch_indices):
+            with _tokenizer_lock:
+                original_tokens = tokenizer.convert_ids_to_tokens(input_ids_cpu[row])
+            valid_length = valid_lengths[row]
+            print(f"DEBUG: ATE original tokens: {original_tokens[:valid_length]}")
+            print(f"DEBUG: ATE predictions (first valid tokens): {predictions[row][:valid_length]}")
+            results[text_index] = _decode_ate_predictions(original_tokens, predictions[row], valid_length)
+            print(f"DEBUG: ATE Final extracted aspects: {results[text_index]}")
+        return results
     except Exception as e:
         print(f"ERROR: Exception during ATE model prediction: {e}")
-        return []
+        return [[] for _ in review_texts]
 
 # --- Aspect-Based Sentiment Analysis (ABSA) Function ---
 def analyze_sentiment_for_term(review_text, aspect_term, max_len=128):
-    print(f"DEBUG: ABSA input review: '{review_text}', aspect: '{aspect_term}'")
+    # Single-pair wrapper around the batched sentiment scorer
+    return analyze_sentiment_for_terms_batch([(review_text, aspect_term)], max_len=max_len)[0]
+
+# --- Batched Aspect-Based Sentiment Analysis (ABSA) Function ---
+def analyze_sentiment_for_terms_batch(context_aspect_pairs, max_len=128):
+    """
+    Scores every (context, aspect) pair with a single bert_ABSA forward pass,
+    padded only to the longest pair in the batch. Returns one polarity per pair,
+    or "N/A" for pairs that could not be analyzed.
+    """
+    print(f"DEBUG: ABSA batch input ({len(context_aspect_pairs)} pairs): {context_aspect_pairs}")
+    results = ["N/A"] * len(context_aspect_pairs)
     if absa_model is None or absa_tokenizer is None or device is None or ABSA_ID2LABEL is None: # Added ABSA_ID2LABEL check
         print("ERROR: ABSA model, tokenizer, device, or ABSA_ID2LABEL not loaded for sentiment analysis.")
-        return "N/A"
+        return results
 
-    preprocessed_review = preprocess_text(review_text)
-    preprocessed_aspect = preprocess_text(aspect_term)
-
-    if not preprocessed_review or not preprocessed_aspect:
+    preprocessed_pairs = [(preprocess_text(review), preprocess_text(aspect)) for review, aspect in context_aspect_pairs]
+    # Pairs with an empty side keep "N/A" and are left out of the batch
+    batch_indices = [i for i, (review, aspect) in enumerate(preprocessed_pairs) if review and aspect]
+    if not batch_indices:
         print("DEBUG: ABSA: Preprocessed review or aspect is empty. Cannot analyze sentiment.")
-        return "N/A"
+        return results
 
     try:
         # Crucial step: Encode review and aspect as two segments for aspect-level sentiment.
         # The BERT model's [CLS] token will then represent the sentiment of the review w.r.t the aspect.
-        inputs = absa_tokenizer.encode_plus(
-            preprocessed_review,
-            preprocessed_aspect,
+        inputs = _encode(
+            [preprocessed_pairs[i][0] for i in batch_indices],
+            [preprocessed_pairs[i][1] for i in batch_indices],
             add_special_tokens=True,
             max_length=max_len,
-            padding='max_length',
+            padding='longest',
             truncation=True,
             return_attention_mask=True,
             return_tensors='pt',
@@ -228,14 +567,129 @@ def analyze_sentiment_for_term(review_text, aspect_term, max_len=128):
         with torch.no_grad():
             outputs = absa_model(input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids)
             logits = outputs['logits']
-        
-        predicted_class_id = torch.argmax(logits, dim=1).item()
-        sentiment = ABSA_ID2LABEL.get(predicted_class_id, "Unknown Sentiment") # Access global ABSA_ID2LABEL
-        print(f"DEBUG: ABSA result for '{aspect_term}': {sentiment}")
-        return sentiment
+
+        predicted_class_ids = torch.argmax(logits, dim=1).tolist()
+        for pair_index, predicted_class_id in zip(batch_indices, predicted_class_ids):
+            sentiment = ABSA_ID2LABEL.get(predicted_class_id, "Unknown Sentiment") # Access global ABSA_ID2LABEL
+            results[pair_index] = sentiment
+            print(f"DEBUG: ABSA result for '{context_aspect_pairs[pair_index][1]}': {sentiment}")
+        return results
     except Exception as e:
         print(f"ERROR: Exception during ABSA model prediction: {e}")
-        return "N/A"
+        return ["N/A"] * len(context_aspect_pairs)
+
+# --- Joint ATE+ABSA: one encoder pass for all segments ---
+def _joint_encode_segments(segments, max_len=128):
+    """
+    Runs a single bert_ATE_ABSA encoder pass over all segments and decodes aspect
+    spans from the token logits. The hidden states are kept so that span polarities
+    can be classified later without re-encoding.
+    """
+    state = {'hidden': None, 'tokens': [], 'valid_lengths': [], 'term_spans': [], 'terms': []}
+    if not segments:
+        return state
+    if joint_model is None or ate_tokenizer is None or device is None or ATE_ID2LABEL is None:
+        print("ERROR: Joint model, tokenizer, device, or ATE_ID2LABEL not loaded for extraction.")
+        state['terms'] = [[] for _ in segments]
+        return state
+
+    preprocessed_segments = [preprocess_text(segment) for segment in segments]
+    try:
+        encoding = _encode(
+            preprocessed_segments,
+            add_special_tokens=True,
+            max_length=max_len,
+            padding='longest',
+            truncation=True,
+            return_tensors='pt',
+        )
+        input_ids = encoding['input_ids'].to(device)
+        attention_mask = encoding['attention_mask'].to(device)
+
+        with torch.no_grad():
+            hidden, logits = joint_model.encode(input_ids, attention_mask=attention_mask)
+
+        predictions = torch.argmax(logits, dim=2).cpu().numpy()
+        input_ids_cpu = input_ids.cpu().numpy()
+        state['hidden'] = hidden
+        state['valid_lengths'] = attention_mask.sum(dim=1).tolist()
+
+        for row in range(len(segments)):
+            with _tokenizer_lock:
+                original_tokens = tokenizer.convert_ids_to_tokens(input_ids_cpu[row])
+            term_spans = {}
+            for span in _decode_ate_spans(predictions[row], state['valid_lengths'][row]):
+                term = _span_to_term(original_tokens, span)
+                if term and term not in term_spans:
+                    term_spans[term] = span
+            state['tokens'].append(original_tokens)
+            state['term_spans'].append(term_spans)
+            state['terms'].append(list(term_spans.keys()))
+            print(f"DEBUG: Joint ATE extracted aspects for segment {row + 1}: {state['terms'][-1]}")
+        return state
+    except Exception as e:
+        print(f"ERROR: Exception during joint model extraction: {e}")
+        return {'hidden': None, 'tokens': [], 'valid_lengths': [], 'term_spans': [], 'terms': [[] for _ in segments]}
+
+# --- Joint ATE+ABSA: locate a term's token span inside an encoded segment ---
+def _joint_find_span(state, row, term):
+    valid_length = state['valid_lengths'][row]
+    whole_segment = (1, valid_length - 1)
+    if term is None:
+        return whole_segment
+    if term in state['term_spans'][row]:
+        return state['term_spans'][row][term]
+
+    # Dictionary terms were not tagged by the model, so search for their word pieces
+    with _tokenizer_lock:
+        term_tokens = tokenizer.tokenize(preprocess_text(term))
+    segment_tokens = state['tokens'][row][:valid_length - 1]
+    for start in range(1, len(segment_tokens) - len(term_tokens) + 1):
+        if term_tokens and segment_tokens[start:start + len(term_tokens)] == term_tokens:
+            return (start, start + len(term_tokens))
+    # Fall back to the whole segment when the term was truncated away
+    return whole_segment
+
+# --- Joint ATE+ABSA: classify span polarities from the cached hidden states ---
+def _joint_classify_terms(state, requests):
+    """
+    requests is a list of (segment_index, term) pairs; a term of None scores the
+    whole segment. Returns one polarity per request, or "N/A" when unavailable.
+    """
+    results = ["N/A"] * len(requests)
+    if not requests or state['hidden'] is None or ABSA_ID2LABEL is None:
+        return results
+
+    hidden = state['hidden']
+    spans_per_row = {}
+    scored = []
+    for request_index, (row, term) in enumerate(requests):
+        if state['valid_lengths'][row] <= 2: # Only [CLS] and [SEP]: nothing to classify
+            continue
+        spans_per_row.setdefault(row, []).append(_joint_find_span(state, row, term))
+        scored.append((request_index, row, len(spans_per_row[row]) - 1))
+    if not scored:
+        return results
+
+    try:
+        max_spans = max(len(spans) for spans in spans_per_row.values())
+        span_mask = torch.zeros((hidden.size(0), max_spans, hidden.size(1)), device=device)
+        for row, spans in spans_per_row.items():
+            for span_index, (start, end) in enumerate(spans):
+                span_mask[row, span_index, start:end] = 1
+
+        with torch.no_grad():
+            polarity_logits = joint_model.classify_spans(hidden, span_mask)
+        predicted_class_ids = torch.argmax(polarity_logits, dim=2).tolist()
+
+        for request_index, row, span_index in scored:
+            sentiment = ABSA_ID2LABEL.get(predicted_class_ids[row][span_index], "Unknown Sentiment")
+            results[request_index] = sentiment
+            print(f"DEBUG: Joint ABSA result for '{requests[request_index][1]}': {sentiment}")
+        return results
+    except Exception as e:
+        print(f"ERROR: Exception during joint model span classification: {e}")
+        return ["N/A"] * len(requests)
 
 # --- Function to get category from dictionary ---
 def get_category_for_term(term):
@@ -249,44 +703,61 @@ def get_category_for_term(term):
 # --- Function to identify terms directly from the dictionary in the review text ---
 def identify_dictionary_terms(review_text):
     print(f"DEBUG: Identifying dictionary terms in: '{review_text}'")
-    found_terms_and_categories = []
     preprocessed_review = preprocess_text(review_text)
-    
-    # Sort terms by length in descending order to match longer phrases first
-    sorted_dict_terms = sorted(aspect_dictionary.keys(), key=len, reverse=True)
-
-    for term in sorted_dict_terms:
-        # Use regex with word boundaries to ensure full term matching
-        # re.escape handles special characters in the term
-        if re.search(r'\b' + re.escape(term) + r'\b', preprocessed_review):
-            # Only add if a specific category is found (not 'other/uncategorized' from get_category_for_term's default)
-            category = get_category_for_term(term)
-            if category != "other/uncategorized":
-                found_terms_and_categories.append({'term': term, 'category': category})
-    
-    # Remove duplicates (if a shorter term is part of a longer one, but both are in dict)
-    # Convert to dictionary and then back to list to keep unique terms based on the term string
-    unique_terms = {item['term']: item for item in found_terms_and_categories}.values()
-    final_dict_terms = list(unique_terms)
+
+    # One pass of the prebuilt Aho-Corasick matcher finds every dictionary term on word
+    # boundaries, already paired with its category ('other/uncategorized' terms are excluded)
+    matcher = dictionary_matcher
+    final_dict_terms = matcher.find(preprocessed_review) if matcher is not None else []
     print(f"DEBUG: Dictionary found terms: {final_dict_terms}")
     return final_dict_terms
 
-# --- Main analysis function to be called from Flask ---
-def perform_absa_analysis(user_review):
-    print(f"\nDEBUG: --- Starting ABSA analysis for review: '{user_review}' ---")
-    # Check if models/tokenizers/labels are loaded
-    if ate_model is None or absa_model is None or ate_tokenizer is None or \
-       absa_tokenizer is None or ATE_ID2LABEL is None or ABSA_ID2LABEL is None:
-        print("ERROR: ABSA models, tokenizers, or ID2LABEL mappings not loaded. Cannot perform analysis.")
-        raise RuntimeError("ABSA models or tokenizers failed to load at application startup.")
-
-    if not user_review.strip():
-        print("DEBUG: Review is empty, returning empty results.")
-        return []
-
-    processed_results = []
-    processed_term_texts = set() # Keep track of terms already processed to avoid duplicates
+# --- Route batched ATE/ABSA work through the cross-request schedulers ---
+def _get_schedulers():
+    global ate_scheduler, absa_scheduler
+    with _scheduler_lock:
+        if ate_scheduler is None:
+            ate_scheduler = MicroBatchScheduler('ate', extract_aspect_terms_bert_batch, MICROBATCH_MAX_SIZE, MICROBATCH_MAX_WAIT_MS)
+            absa_scheduler = MicroBatchScheduler('absa', analyze_sentiment_for_terms_batch, MICROBATCH_MAX_SIZE, MICROBATCH_MAX_WAIT_MS)
+    return ate_scheduler, absa_scheduler
+
+def _run_ate_batch(segments):
+    if not MICROBATCH_ENABLED:
+        return extract_aspect_terms_bert_batch(segments)
+    return _get_schedulers()[0].submit(segments)
+
+def _run_absa_batch(context_aspect_pairs):
+    # Serve repeated (segment, term) pairs from the sentiment cache and only score the misses
+    results = [None] * len(context_aspect_pairs)
+    miss_indices, miss_pairs = [], []
+    for index, (context, aspect) in enumerate(context_aspect_pairs):
+        hit, sentiment = sentiment_cache.get((preprocess_text(context), preprocess_text(aspect)))
+        if hit:
+            results[index] = sentiment
+        else:
+            miss_indices.append(index)
+            miss_pairs.append((context, aspect))
 
+    if miss_pairs:
+        if MICROBATCH_ENABLED:
+            scored = _get_schedulers()[1].submit(miss_pairs)
+        else:
+            scored = analyze_sentiment_for_terms_batch(miss_pairs)
+        for index, (context, aspect), sentiment in zip(miss_indices, miss_pairs, scored):
+            results[index] = sentiment
+            if sentiment != "N/A": # Failures are retried next time
+                sentiment_cache.put((preprocess_text(context), preprocess_text(aspect)), sentiment)
+    return results
+
+def get_inference_metrics():
+    # Queue depth, batch size and wait-time statistics for the micro-batch schedulers, plus cache hit rates
+    if not MICROBATCH_ENABLED:
+        return {'microbatch_enabled': False, 'cache': get_cache_stats()}
+    ate, absa = _get_schedulers()
+    return {'microbatch_enabled': True, 'ate': ate.metrics(), 'absa': absa.metrics(), 'cache': get_cache_stats()}
+
+# --- Segmentation and term collection, shared by the single-review and bulk analysis paths ---
+def _split_review_segments(user_review):
     # NEW LOGIC: Split sentence based on contrastive conjunctions
     contrastive_conjunctions = ['but', 'however', 'although', 'yet', 'nevertheless', 'though', 'whereas', 'while']
     
@@ -298,31 +769,29 @@ def perform_absa_analysis(user_review):
     # Filter out empty strings from split and strip whitespace
     segments = [s.strip() for s in segments if s.strip()]
 
-    print(f"DEBUG: Sentence split into segments: {segments}")
+    # We need to consider if the segment is a conjunction itself. If it is, skip it.
+    segments = [s for s in segments if s.lower() not in contrastive_conjunctions]
+    return segments
+
+def _collect_pending_terms(segments, batch_extracted_terms):
+    # (segment, term) pairs waiting for batched sentiment scoring, each term only once per review
+    pending_terms = []
+    processed_term_texts = set() # Keep track of terms already processed to avoid duplicates
 
     # Process each segment independently
     for i, segment in enumerate(segments):
-        # We need to consider if the segment is a conjunction itself. If it is, skip it.
-        if segment.lower() in contrastive_conjunctions:
-            continue
-
         print(f"DEBUG: Processing segment {i+1}: '{segment}'")
         
         # Approach 1: Terms identified by BERT ATE model within this segment
-        bert_extracted_terms = extract_aspect_terms_bert(segment)
+        bert_extracted_terms = batch_extracted_terms[i]
         print(f"DEBUG: BERT ATE extracted terms for segment '{segment}': {bert_extracted_terms}")
         for term in bert_extracted_terms:
             preprocessed_term = preprocess_text(term)
             # Only add if this term hasn't been processed across *all* segments already
             if preprocessed_term not in processed_term_texts:
                 category = get_category_for_term(term)
-                # Perform aspect-specific sentiment analysis using the *original segment* as context
-                sentiment = analyze_sentiment_for_term(segment, term)
-                processed_results.append({
-                    'term': term,
-                    'category': category,
-                    'polarity': sentiment
-                })
+                # Sentiment is scored later, using the *original segment* as context
+                pending_terms.append({'term': term, 'category': category, 'segment': segment, 'segment_index': i})
                 processed_term_texts.add(preprocessed_term)
 
         # Approach 2: Terms explicitly found from the dictionary within this segment
@@ -334,14 +803,57 @@ def perform_absa_analysis(user_review):
             preprocessed_term = preprocess_text(term)
             
             if preprocessed_term not in processed_term_texts: # Ensure not to re-process terms already found
-                # Perform aspect-specific sentiment analysis using the *original segment* as context
-                sentiment = analyze_sentiment_for_term(segment, term)
-                processed_results.append({
-                    'term': term,
-                    'category': category,
-                    'polarity': sentiment
-                })
+                # Sentiment is scored later, using the *original segment* as context
+                pending_terms.append({'term': term, 'category': category, 'segment': segment, 'segment_index': i})
                 processed_term_texts.add(preprocessed_term)
+    return pending_terms
+
+# --- Main analysis function to be called from Flask ---
+def perform_absa_analysis(user_review):
+    print(f"\nDEBUG: --- Starting ABSA analysis for review: '{user_review}' ---")
+    use_joint = INFERENCE_MODE == 'joint'
+    # Load the models on first use (or wait for the background warm-up), then check they are usable
+    ensure_models_loaded()
+    if not _models_available():
+        print("ERROR: ABSA models, tokenizers, or ID2LABEL mappings not loaded. Cannot perform analysis.")
+        raise RuntimeError("ABSA models or tokenizers failed to load.")
+
+    if not user_review.strip():
+        print("DEBUG: Review is empty, returning empty results.")
+        return []
+
+    # Identical (after preprocessing) reviews skip BERT entirely
+    cache_key = (INFERENCE_MODE, preprocess_text(user_review))
+    hit, cached_results = review_cache.get(cache_key)
+    if hit:
+        print(f"DEBUG: --- ABSA analysis served from cache: {cached_results} ---")
+        return copy.deepcopy(cached_results)
+
+    processed_results = []
+    segments = _split_review_segments(user_review)
+    print(f"DEBUG: Sentence split into segments: {segments}")
+
+    # Run ATE for every segment in one batched forward pass
+    if use_joint:
+        joint_state = _joint_encode_segments(segments)
+        batch_extracted_terms = joint_state['terms']
+    else:
+        batch_extracted_terms = _run_ate_batch(segments)
+
+    pending_terms = _collect_pending_terms(segments, batch_extracted_terms)
+
+    # Perform aspect-specific sentiment analysis for all collected (segment, term) pairs in one batch
+    if pending_terms:
+        if use_joint:
+            sentiments = _joint_classify_terms(joint_state, [(item['segment_index'], item['term']) for item in pending_terms])
+        else:
+            sentiments = _run_absa_batch([(item['segment'], item['term']) for item in pending_terms])
+        for item, sentiment in zip(pending_terms, sentiments):
+            processed_results.append({
+                'term': item['term'],
+                'category': item['category'],
+                'polarity': sentiment
+            })
     
     # Handle cases where no specific aspects are found (even after splitting) but there's a review
     # In this case, we might analyze the overall sentiment of the original review
@@ -349,7 +861,10 @@ def perform_absa_analysis(user_review):
         print("DEBUG: No specific aspects found after splitting, analyzing general review sentiment from original review.")
         # For general sentiment, you can choose to analyze the review against itself as an "aspect"
         # or use a separate general sentiment model if available.
-        general_sentiment = analyze_sentiment_for_term(user_review, user_review) 
+        if use_joint:
+            general_sentiment = _joint_classify_terms(_joint_encode_segments([user_review]), [(0, None)])[0]
+        else:
+            general_sentiment = _run_absa_batch([(user_review, user_review)])[0]
         if general_sentiment != "N/A":
             processed_results.append({
                 'term': 'general_review',
@@ -359,12 +874,100 @@ def perform_absa_analysis(user_review):
     
     # Sort results for consistent output
     processed_results.sort(key=lambda x: (x['category'], x['term']))
+    if all(item['polarity'] != "N/A" for item in processed_results): # Failures are retried next time
+        review_cache.put(cache_key, copy.deepcopy(processed_results))
     print(f"DEBUG: --- ABSA analysis finished. Final results: {processed_results} ---")
     return processed_results
 
-# Call the model loading function once when the module is imported
-print("Attempting to load ABSA models on startup...")
-try:
-    _load_absa_models_once()
-except Exception as e:
-    print(f"Initial model loading failed: {e}. Flask app might not function as expected.")
\ No newline at end of file
+# --- Bulk analysis for offline jobs (see backend/reanalyze.py) ---
+def _length_sorted_batches(batch_fn, items, batch_size, length_key):
+    # Runs batch_fn over batches of similar-length items (less padding), returning results in input order
+    order = sorted(range(len(items)), key=lambda index: length_key(items[index]))
+    results = [None] * len(items)
+    for start in range(0, len(order), batch_size):
+        chunk = order[start:start + batch_size]
+        for index, result in zip(chunk, batch_fn([items[i] for i in chunk])):
+            results[index] = result
+    return results
+
+def perform_absa_analysis_bulk(user_reviews, batch_size=64):
+    """
+    Offline counterpart of perform_absa_analysis for many reviews at once. ATE runs over the segments
+    of every review and ABSA over every (segment, term) pair in length-sorted batches of batch_size,
+    instead of one small batch per review. Returns one list per review with the same aspects as
+    perform_absa_analysis, each also carrying the 'segment_index' and 'segment' it was found in.
+    The result caches and the micro-batch schedulers are bypassed.
+    """
+    ensure_models_loaded()
+    if not _models_available():
+        raise RuntimeError("ABSA models or tokenizers failed to load.")
+    use_joint = INFERENCE_MODE == 'joint'
+
+    review_segments = [_split_review_segments(review) if review and review.strip() else [] for review in user_reviews]
+    flat_segments = [segment for segments in review_segments for segment in segments]
+
+    # ATE over the segments of every review
+    if use_joint:
+        def encode(batch):
+            state = _joint_encode_segments(batch)
+            return [(state, row) for row in range(len(batch))]
+        encoded = _length_sorted_batches(encode, flat_segments, batch_size, len)
+        flat_terms = [state['terms'][row] for state, row in encoded]
+    else:
+        flat_terms = _length_sorted_batches(extract_aspect_terms_bert_batch, flat_segments, batch_size, len)
+
+    # Terms per review, deduplicated exactly as perform_absa_analysis does
+    pending = [] # (review index, pending term, index into flat_segments)
+    position = 0
+    for review_index, segments in enumerate(review_segments):
+        for item in _collect_pending_terms(segments, flat_terms[position:position + len(segments)]):
+            pending.append((review_index, item, position + item['segment_index']))
+        position += len(segments)
+
+    # ABSA over every (segment, term) pair
+    if use_joint:
+        sentiments = [None] * len(pending)
+        by_state = {}
+        for k, (_, item, flat_index) in enumerate(pending):
+            state, row = encoded[flat_index]
+            by_state.setdefault(id(state), (state, []))[1].append((k, row, item['term']))
+        for state, requests in by_state.values():
+            for (k, _, _), sentiment in zip(requests, _joint_classify_terms(state, [(row, term) for _, row, term in requests])):
+                sentiments[k] = sentiment
+    else:
+        sentiments = _length_sorted_batches(analyze_sentiment_for_terms_batch, [(item['segment'], item['term']) for _, item, _ in pending],
+                                            batch_size, lambda pair: len(pair[0]))
+
+    results = [[] for _ in user_reviews]
+    for (review_index, item, _), sentiment in zip(pending, sentiments):
+        results[review_index].append({
+            'term': item['term'],
+            'category': item['category'],
+            'polarity': sentiment,
+            'segment_index': item['segment_index'],
+            'segment': item['segment'],
+        })
+
+    # Reviews without any aspect get the general sentiment of the whole review
+    fallback = [r for r, review in enumerate(user_reviews) if not results[r] and review and review.strip()]
+    if fallback:
+        if use_joint:
+            def classify_general(batch):
+                return _joint_classify_terms(_joint_encode_segments(batch), [(row, None) for row in range(len(batch))])
+            general = _length_sorted_batches(classify_general, [user_reviews[r] for r in fallback], batch_size, len)
+        else:
+            general = _length_sorted_batches(analyze_sentiment_for_terms_batch, [(user_reviews[r], user_reviews[r]) for r in fallback],
+                                             batch_size, lambda pair: len(pair[0]))
+        for review_index, sentiment in zip(fallback, general):
+            if sentiment != "N/A":
+                results[review_index].append({
+                    'term': 'general_review',
+                    'category': 'other/uncategorized',
+                    'polarity': sentiment,
+                    'segment_index': 0,
+                    'segment': user_reviews[review_index],
+                })
+
+    for review_results in results:
+        review_results.sort(key=lambda x: (x['category'], x['term']))
+    return results
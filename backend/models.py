@@ -13,22 +13,41 @@ class Station(db.Model):
 
 class Review(db.Model):
     __tablename__ = 'reviews'  # Actual table name in DB
+    # Time-series indexes; keep in sync with migrations.MONTH_INDEXES
+    __table_args__ = (
+        db.Index('ix_reviews_year_month', 'review_year', 'review_month'),
+        db.Index('ix_reviews_station_year_month', 'station_id', 'review_year', 'review_month'),
+    )
 
     reviews_id = db.Column(db.Integer, primary_key=True)
-    station_id = db.Column(db.Integer, db.ForeignKey('stations.station_id'), nullable=False)
+    station_id = db.Column(db.Integer, db.ForeignKey('stations.station_id'), nullable=False, index=True)
     review_date = db.Column(db.String(255), nullable=False)  # TEXT in SQLite, so String here
     raw_reviews = db.Column(db.Text, nullable=False)
     station_name = db.Column(db.String(255), nullable=False)
      # These are the columns you just added to your SQLite database
-    precise_review_datetime = db.Column(db.DateTime) # For storing converted datetime objects. SQLAlchemy handles TEXT to DateTime.
+    precise_review_datetime = db.Column(db.DateTime, index=True) # For storing converted datetime objects. SQLAlchemy handles TEXT to DateTime.
     is_estimated_date = db.Column(db.Boolean)    # SQLite stores BOOLEAN as INTEGER 0 or 1. SQLAlchemy handles this.
+    content_hash = db.Column(db.String(40), index=True) # Set by backend/ingest.py for CSV-imported reviews; NULL for app submissions
+    text_hash = db.Column(db.String(40), index=True) # analysis_store.normalized_text_hash(raw_reviews)
+    review_month = db.Column(db.String(7)) # 'YYYY-MM' of precise_review_datetime, NULL when undated; set by every writer
+    review_year = db.Column(db.String(4)) # 'YYYY' of precise_review_datetime
+    analysis_model_version = db.Column(db.String(64)) # Versions of the last model analysis, NULL if never analysed
+    analysis_dictionary_version = db.Column(db.String(64)) # (see backend/reanalyze.py --incremental)
 
 
 class AspectSentiments(db.Model):
     __tablename__ = 'AspectSentiments' # Ensure this matches your actual table name
+    # Covering indexes for the dashboard queries; keep in sync with migrations.DASHBOARD_INDEXES
+    __table_args__ = (
+        db.Index('ix_aspectsentiments_polarity_category', 'sentiment_polarity', 'aspect_category'),
+        db.Index('ix_aspectsentiments_category_polarity', 'aspect_category', 'sentiment_polarity'),
+        db.Index('ix_aspectsentiments_station_category_polarity', 'station_id', 'aspect_category', 'sentiment_polarity'),
+        db.Index('ix_aspectsentiments_review_category_polarity', 'review_id', 'aspect_category', 'sentiment_polarity'),
+        db.Index('ix_aspectsentiments_month_category_polarity', 'review_month', 'aspect_category', 'sentiment_polarity'),
+    )
 
     aspect_sentiment_id = db.Column(db.Integer, primary_key=True)
-    review_id = db.Column(db.Integer, nullable=False) # Consider making this a ForeignKey if 'reviews' table has matching IDs
+    review_id = db.Column(db.Integer, db.ForeignKey('reviews.reviews_id', ondelete='CASCADE'), nullable=False)
     station_id = db.Column(db.Integer, db.ForeignKey('stations.station_id'), nullable=False) # Link to stations table
     segment_index = db.Column(db.Integer, nullable=False)
     segment_text = db.Column(db.Text, nullable=False)
@@ -36,7 +55,41 @@ class AspectSentiments(db.Model):
     sentiment_polarity = db.Column(db.String(50), nullable=False)
     extracted_aspect_term = db.Column(db.Text)
     analysis_method = db.Column(db.String(50))
+    model_version = db.Column(db.String(64)) # Set on 'Hybrid' rows analysed in-process; see backend/migrations.py
+    dictionary_version = db.Column(db.String(64))
+    review_month = db.Column(db.String(7)) # Copy of the review's reviews.review_month; the rollup months come from it
 
     # Optional: Add a relationship if you want to access review details from an aspect sentiment
     # review = db.relationship('Review', foreign_keys=[review_id], primaryjoin="Review.reviews_id == AspectSentiments.review_id")
     # station_rel = db.relationship('Station', foreign_keys=[station_id], primaryjoin="Station.station_id == AspectSentiments.station_id")
+
+
+class AnalysisResult(db.Model):
+    __tablename__ = 'analysis_results' # Stored model output per normalized review text, see backend/analysis_store.py
+
+    text_hash = db.Column(db.String(40), primary_key=True)
+    model_version = db.Column(db.String(64), primary_key=True)
+    dictionary_version = db.Column(db.String(64), primary_key=True)
+    aspects = db.Column(db.Text, nullable=False) # JSON list of aspects as returned by the analysis
+    created_at = db.Column(db.DateTime)
+
+
+class DataVersion(db.Model):
+    __tablename__ = 'data_version' # Bumped by every write the dashboards can see, see backend/response_cache.py
+
+    id = db.Column(db.Integer, db.CheckConstraint('id = 1'), primary_key=True)
+    version = db.Column(db.Integer, nullable=False)
+
+
+class SentimentRollup(db.Model):
+    __tablename__ = 'sentiment_rollup' # AspectSentiments counts for the dashboards, see backend/rollup.py
+    __table_args__ = (
+        db.Index('ix_sentiment_rollup_month_category', 'month', 'aspect_category'),
+        {'sqlite_with_rowid': False},
+    )
+
+    station_id = db.Column(db.Integer, primary_key=True)
+    aspect_category = db.Column(db.String(255), primary_key=True)
+    sentiment_polarity = db.Column(db.String(50), primary_key=True)
+    month = db.Column(db.String(7), primary_key=True) # Review month 'YYYY-MM'; '' when the review has no date
+    aspect_count = db.Column(db.Integer, nullable=False)
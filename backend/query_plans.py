@@ -0,0 +1,116 @@
+# backend/query_plans.py
+# Checks that no dashboard query falls back to a full table scan. Every dashboard endpoint is called
+# once through the Flask test client (dashboard service mode, so no models are loaded), the SELECTs it
+# sends to SQLite are captured, and EXPLAIN QUERY PLAN is run on each. Run from the repository root:
+#   python -m backend.query_plans --db data/mrt_reviews_copy.db
+# Exits with status 1 if any plan has a "SCAN <table>" step without an index on a large table, e.g. after
+# a query change that no index in migrations.DASHBOARD_INDEXES covers any more.
+# tests/test_query_plans.py runs the same check on a small fixture database with every test run.
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+
+from sqlalchemy import event
+
+DASHBOARD_ENDPOINTS = [
+    '/api/stations',
+    '/api/station_sentiment/{station_id}',
+    '/api/station_sentiment',
+    '/api/dashboard/overall_sentiment',
+    '/api/dashboard/aspect_sentiment',
+    '/api/dashboard/top_aspects',
+    '/api/dashboard/station_comparison',
+    '/api/total_reviews_all_stations',
+    '/api/overall_positive_sentiment_percentage',
+    '/api/trend/aspect_sentiment',
+    '/api/dashboard/reviews_over_time',
+    '/api/dashboard/sentiment_counts_over_time',
+    '/api/dashboard/latest_reviews',
+    '/api/overall_sentiment_analysis',
+    '/api/dashboard/total_reviews_by_station',
+    '/api/dashboard/summary',
+    # Time-series filters
+    '/api/trend/aspect_sentiment?station_id={station_id}&aspect=cleanliness&start=2023-01&end=2024-12',
+    '/api/trend/aspect_sentiment?start=2024-01',
+    '/api/dashboard/sentiment_counts_over_time?station_id={station_id}&start=2024-01-01',
+    '/api/dashboard/reviews_over_time?start=2023-06&end=2024-06',
+    '/api/dashboard/reviews_over_time?station_id={station_id}&end=2024-12',
+]
+
+# A few dozen rows (stations), or bounded by stations x categories x polarities x months rather than by the
+# number of reviews (sentiment_rollup); scanning them is fine
+SMALL_TABLES = {'stations', 'sentiment_rollup'}
+
+TABLE_SCAN = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+
+
+def capture_dashboard_queries(app, station_id):
+    # [(endpoint, statement, parameters)] for every SELECT the dashboard endpoints run
+    from backend import db
+
+    captured, current = [], {'endpoint': None}
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            captured.append((current['endpoint'], statement, parameters))
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        client = app.test_client()
+        for endpoint in DASHBOARD_ENDPOINTS:
+            current['endpoint'] = endpoint.format(station_id=station_id)
+            response = client.get(current['endpoint'])
+            if response.status_code != 200:
+                raise RuntimeError(f"{current['endpoint']} answered {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    return captured
+
+def table_scans(conn, statement, parameters):
+    # (plan lines, full table scans) for one statement
+    plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ())]
+    scans = [line for line in plan if (match := TABLE_SCAN.match(line)) and match.group(1) not in SMALL_TABLES]
+    return plan, scans
+
+def check_query_plans(db_path, verbose=False):
+    # Returns the [(endpoint, statement, scans)] that scan a large table
+    from backend import create_app
+
+    conn = sqlite3.connect(db_path)
+    try:
+        # Also applies the migrations (indexes); absolute because Flask-SQLAlchemy resolves relative paths against instance/
+        app = create_app(load_models=False, service_mode='dashboard', db_path=os.path.abspath(db_path))
+        station_id = conn.execute("SELECT MIN(station_id) FROM stations").fetchone()[0]
+        problems = []
+        for endpoint, statement, parameters in capture_dashboard_queries(app, station_id):
+            plan, scans = table_scans(conn, statement, parameters)
+            if verbose or scans:
+                print(f"{'SCAN ' if scans else 'ok   '}{endpoint}\n  " + "\n  ".join(plan))
+            if scans:
+                problems.append((endpoint, ' '.join(statement.split()), scans))
+        return problems
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fail if a dashboard query does a full table scan.")
+    parser.add_argument('--db', default=os.environ.get('ABSA_DB_PATH', os.path.join('data', 'mrt_reviews_copy.db')))
+    parser.add_argument('--verbose', action='store_true', help="Print every query plan, not only the failing ones.")
+    args = parser.parse_args(argv)
+
+    problems = check_query_plans(args.db, args.verbose)
+    for endpoint, statement, scans in problems:
+        print(f"[FAIL] {endpoint}: {', '.join(scans)}\n       {statement}")
+    print(f"{len(problems)} dashboard queries scan a whole table." if problems else "All dashboard queries use an index.")
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,287 @@
+# backend/reanalyze.py
+# Offline bulk re-analysis of the reviews table. Run from the repository root:
+#   python -m backend.reanalyze --db data/mrt_reviews_copy.db
+# Reviews are streamed in chunks of --chunk-size (consecutive reviews_id ranges), analysed with batched
+# ATE/ABSA, and each chunk's AspectSentiments rows are replaced in one transaction together with the job's
+# checkpoint. An interrupted run resumes after the last committed chunk; --restart starts over.
+# Reviews with 'Manual Edit' aspects are never re-analysed.
+#
+# --workers N analyses the chunks (reviews_id ranges) in N processes, each with its own models and
+# --torch-threads threads; this process stays the single SQLite writer and commits chunks in order.
+#
+# Every row records the model_version and dictionary_version that produced it, and each review records the
+# versions that last analysed it (also when that produced no aspects). --incremental only analyses reviews
+# last analysed with other versions or never, so after a model or dictionary update only the affected
+# reviews are redone. Each review's old rows are replaced by its new ones in the same transaction, so
+# readers never see a review half-updated.
+#
+# Reviews whose normalized text was already analysed with the current versions (analysis_results, see
+# backend/analysis_store.py) reuse the stored aspects; each distinct text of a chunk is analysed only once.
+
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+from backend.analysis_store import INSERT_ANALYSIS_SQL, analysis_row, is_storable, load_stored_analyses, normalized_text_hash
+from backend.migrations import apply_migrations
+from backend.response_cache import bump_data_version
+from backend.rollup import apply_rollup_delta
+
+ANALYSIS_METHOD = 'Hybrid' # Same label the web app stores for model-produced rows
+
+INSERT_ASPECT_SQL = """
+    INSERT INTO AspectSentiments (review_id, station_id, segment_index, segment_text, aspect_category,
+                                  sentiment_polarity, extracted_aspect_term, analysis_method,
+                                  model_version, dictionary_version, review_month)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+SELECT_CHUNK_SQL = """
+    SELECT {columns}
+    FROM reviews r
+    WHERE r.reviews_id > ? AND r.reviews_id <= ?
+      AND NOT EXISTS (SELECT 1 FROM AspectSentiments a
+                      WHERE a.review_id = r.reviews_id AND a.analysis_method = 'Manual Edit')
+"""
+
+# Appended in incremental mode, with the current (model_version, dictionary_version) as parameters
+STALE_FILTER_SQL = """
+      AND (r.analysis_model_version IS NOT ? OR r.analysis_dictionary_version IS NOT ?)
+"""
+
+# Per-process state of the analysis side (this process, or each pool worker)
+_worker_conn = None
+_worker_model_loader = None
+_worker_versions = None
+
+
+def _prepare(conn):
+    apply_migrations(conn) # Version columns, analysis store and the review_id index every chunk deletes by
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS reanalysis_checkpoints (
+            job_name TEXT PRIMARY KEY,
+            last_review_id INTEGER NOT NULL,
+            reviews_done INTEGER NOT NULL,
+            aspects_written INTEGER NOT NULL,
+            started_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            finished_at TEXT
+        )
+    """)
+    conn.commit()
+
+def _load_checkpoint(conn, job_name, restart):
+    if restart:
+        with conn:
+            conn.execute("DELETE FROM reanalysis_checkpoints WHERE job_name = ?", (job_name,))
+    row = conn.execute("SELECT last_review_id, reviews_done, aspects_written, finished_at FROM reanalysis_checkpoints WHERE job_name = ?",
+                       (job_name,)).fetchone()
+    if row is None:
+        now = datetime.now().isoformat(timespec='seconds')
+        with conn:
+            conn.execute("INSERT INTO reanalysis_checkpoints VALUES (?, 0, 0, 0, ?, ?, NULL)", (job_name, now, now))
+        return {'last_review_id': 0, 'reviews_done': 0, 'aspects_written': 0, 'finished_at': None}
+    return dict(zip(('last_review_id', 'reviews_done', 'aspects_written', 'finished_at'), row))
+
+def _aspect_rows(review_id, station_id, text, review_month, aspects, versions):
+    rows, failed = [], 0
+    for aspect in aspects:
+        if aspect['polarity'] == "N/A": # Model failure; not worth a row
+            failed += 1
+            continue
+        # Aspects stored by the web app carry no segment; like crud, fall back to the first segment / the text
+        rows.append((review_id, station_id, aspect.get('segment_index', 0), aspect.get('segment', text), aspect['category'],
+                     aspect['polarity'], aspect['term'], ANALYSIS_METHOD, *versions, review_month))
+    return rows, failed
+
+def _write_chunk(conn, job_name, review_ids, rows, checkpoint, versions, stored_analyses=()):
+    # One transaction: old model rows out, new rows in, dashboard rollup, data version and checkpoint forward. A crash leaves the chunk untouched.
+    placeholders = ','.join('?' * len(review_ids))
+    deleted = 0
+    with conn:
+        if review_ids:
+            apply_rollup_delta(conn, review_ids, -1, ANALYSIS_METHOD)
+            deleted = conn.execute(f"DELETE FROM AspectSentiments WHERE analysis_method = ? AND review_id IN ({placeholders})",
+                                   [ANALYSIS_METHOD, *review_ids]).rowcount
+            conn.execute(f"UPDATE reviews SET analysis_model_version = ?, analysis_dictionary_version = ? WHERE reviews_id IN ({placeholders})",
+                         [*versions, *review_ids])
+        conn.executemany(INSERT_ASPECT_SQL, rows)
+        if review_ids:
+            apply_rollup_delta(conn, review_ids, 1, ANALYSIS_METHOD)
+        conn.executemany(INSERT_ANALYSIS_SQL, stored_analyses)
+        if deleted or rows: # Cached dashboard responses stay valid when no aspect row changed
+            bump_data_version(conn)
+        conn.execute("""
+            UPDATE reanalysis_checkpoints
+            SET last_review_id = ?, reviews_done = ?, aspects_written = ?, updated_at = ?
+            WHERE job_name = ?
+        """, (checkpoint['last_review_id'], checkpoint['reviews_done'], checkpoint['aspects_written'],
+              datetime.now().isoformat(timespec='seconds'), job_name))
+
+def _init_analysis(db_path, torch_threads=None):
+    # Runs once per analysis process: its own read connection and its own copy of the models
+    global _worker_conn, _worker_model_loader, _worker_versions
+    with contextlib.redirect_stdout(io.StringIO()):
+        import torch
+        if torch_threads:
+            torch.set_num_threads(torch_threads)
+        from backend import model_loader
+        model_loader.ensure_models_loaded()
+    if model_loader.model_load_state != 'ready':
+        raise RuntimeError(f"Models failed to load: {model_loader.model_load_error}")
+    _worker_conn = sqlite3.connect(db_path)
+    _worker_model_loader = model_loader
+    _worker_versions = (model_loader.get_model_version(), model_loader.get_dictionary_version())
+
+def _current_versions(_=None):
+    return _worker_versions
+
+def _chunk_query(columns, incremental):
+    return SELECT_CHUNK_SQL.format(columns=columns) + (STALE_FILTER_SQL if incremental else "") + "ORDER BY r.reviews_id"
+
+def _analyze_range(task):
+    # Analyses the reviews with lower_id < reviews_id <= upper_id; returns what the writer needs
+    lower_id, upper_id, batch_size, incremental = task
+    params = (lower_id, upper_id, *_worker_versions) if incremental else (lower_id, upper_id)
+    chunk = _worker_conn.execute(_chunk_query("r.reviews_id, r.station_id, r.raw_reviews, r.text_hash, r.review_month", incremental), params).fetchall()
+    text_hashes = [text_hash or normalized_text_hash(text) for _, _, text, text_hash, _ in chunk]
+
+    # Only texts with no stored analysis go through the models, each once
+    analyses = load_stored_analyses(_worker_conn, set(text_hashes), _worker_versions)
+    pending = {}
+    for (_, _, text, _, _), text_hash in zip(chunk, text_hashes):
+        if text_hash not in analyses:
+            pending.setdefault(text_hash, text or "")
+    reused = len(chunk) - len(pending) # Stored hits and repeats within the chunk
+    with contextlib.redirect_stdout(io.StringIO()): # model_loader's DEBUG output
+        new_analyses = _worker_model_loader.perform_absa_analysis_bulk(list(pending.values()), batch_size=batch_size)
+    stored_analyses = [analysis_row(text_hash, _worker_versions, aspects)
+                       for text_hash, aspects in zip(pending, new_analyses) if is_storable(aspects)]
+    analyses.update(zip(pending, new_analyses))
+
+    rows, failed = [], 0
+    for (review_id, station_id, text, _, review_month), text_hash in zip(chunk, text_hashes):
+        review_rows, review_failed = _aspect_rows(review_id, station_id, text, review_month, analyses[text_hash], _worker_versions)
+        rows.extend(review_rows)
+        failed += review_failed
+    return upper_id, [review_id for review_id, *_ in chunk], rows, failed, stored_analyses, reused
+
+def _review_id_ranges(conn, after_id, chunk_size, limit, stale_versions=None):
+    # Consecutive (lower, upper] reviews_id ranges of chunk_size reviews each; only the ids are read here.
+    # With stale_versions, only reviews the incremental mode would analyse are counted.
+    if stale_versions:
+        last_id = conn.execute("SELECT COALESCE(MAX(reviews_id), 0) FROM reviews").fetchone()[0]
+        review_ids = [row[0] for row in conn.execute(_chunk_query("r.reviews_id", True), (after_id, last_id, *stale_versions))]
+    else:
+        review_ids = [row[0] for row in conn.execute("SELECT reviews_id FROM reviews WHERE reviews_id > ? ORDER BY reviews_id", (after_id,))]
+    if limit:
+        review_ids = review_ids[:limit]
+    ranges, lower_id = [], after_id
+    for start in range(0, len(review_ids), chunk_size):
+        upper_id = review_ids[min(start + chunk_size, len(review_ids)) - 1]
+        ranges.append((lower_id, upper_id, min(chunk_size, len(review_ids) - start)))
+        lower_id = upper_id
+    return ranges
+
+def _format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m{seconds:02d}s"
+
+def reanalyze(db_path, job_name='full', chunk_size=256, batch_size=64, limit=None, restart=False, workers=1, torch_threads=None,
+              incremental=False):
+    conn = sqlite3.connect(db_path)
+    pool = None
+    try:
+        _prepare(conn)
+        checkpoint = _load_checkpoint(conn, job_name, restart)
+        if checkpoint['finished_at']:
+            if not incremental:
+                print(f"Job '{job_name}' already finished at {checkpoint['finished_at']}; use --restart to run it again.")
+                return checkpoint
+            checkpoint = _load_checkpoint(conn, job_name, True) # Each incremental run looks at the whole table again
+
+        print(f"Loading models in {workers} process{'es' if workers > 1 else ''}...")
+        if workers > 1:
+            # spawn: every worker starts clean and loads its own models (also the only option on Windows)
+            torch_threads = torch_threads or max(1, (os.cpu_count() or 1) // workers)
+            pool = multiprocessing.get_context('spawn').Pool(workers, initializer=_init_analysis, initargs=(db_path, torch_threads))
+            versions = pool.apply(_current_versions)
+        else:
+            _init_analysis(db_path, torch_threads)
+            versions = _current_versions()
+        print(f"model_version {versions[0]}, dictionary_version {versions[1]}")
+
+        ranges = _review_id_ranges(conn, checkpoint['last_review_id'], chunk_size, limit, versions if incremental else None)
+        total = sum(size for _, _, size in ranges)
+        if checkpoint['reviews_done']:
+            print(f"Resuming job '{job_name}' after reviews_id {checkpoint['last_review_id']} ({checkpoint['reviews_done']} reviews already done).")
+        if incremental:
+            print(f"{total} reviews were never analysed or were analysed with other versions.")
+
+        tasks = [(lower_id, upper_id, batch_size, incremental) for lower_id, upper_id, _ in ranges]
+        if pool is not None:
+            results = pool.imap(_analyze_range, tasks) # Results come back in task order, so checkpoints stay monotonic
+        else:
+            results = map(_analyze_range, tasks)
+
+        started = time.perf_counter()
+        processed = failed = reused = 0
+        for (_, _, size), (upper_id, review_ids, rows, chunk_failed, stored_analyses, chunk_reused) in zip(ranges, results):
+            checkpoint['last_review_id'] = upper_id
+            checkpoint['reviews_done'] += len(review_ids)
+            checkpoint['aspects_written'] += len(rows)
+            _write_chunk(conn, job_name, review_ids, rows, checkpoint, versions, stored_analyses)
+
+            processed += size
+            failed += chunk_failed
+            reused += chunk_reused
+            elapsed = time.perf_counter() - started
+            rate = processed / elapsed
+            eta = (total - processed) / rate if rate else 0
+            print(f"{processed}/{total} reviews ({processed / total:.1%}) | {checkpoint['aspects_written']} aspects | "
+                  f"{reused} reused | {rate:.1f} reviews/s | ETA {_format_duration(eta)}", flush=True)
+
+        if not limit or processed < limit:
+            checkpoint['finished_at'] = datetime.now().isoformat(timespec='seconds')
+            with conn:
+                conn.execute("UPDATE reanalysis_checkpoints SET finished_at = ? WHERE job_name = ?",
+                             (checkpoint['finished_at'], job_name))
+        elapsed = time.perf_counter() - started
+        checkpoint['reviews_per_second'] = processed / elapsed if elapsed else 0.0
+        checkpoint['reused'] = reused
+        print(f"Re-analysed {processed} reviews in {_format_duration(elapsed)} "
+              f"({checkpoint['reviews_per_second']:.1f} reviews/s); {failed} aspects failed and were skipped.")
+        print(f"{reused} reviews ({reused / processed if processed else 0:.1%}) reused the analysis of an identical (normalized) text.")
+        return checkpoint
+    finally:
+        if pool is not None:
+            pool.terminate()
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-analyse every review in the database with the current models.")
+    parser.add_argument('--db', default=os.environ.get('ABSA_DB_PATH', os.path.join('data', 'mrt_reviews_copy.db')))
+    parser.add_argument('--job', default=None, help="Checkpoint name; runs with the same name resume each other (default: 'full' or 'incremental').")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only analyse reviews never analysed or analysed with other model/dictionary versions.")
+    parser.add_argument('--chunk-size', type=int, default=256, help="Reviews per transaction / checkpoint.")
+    parser.add_argument('--batch-size', type=int, default=64, help="Segments or (segment, term) pairs per forward pass.")
+    parser.add_argument('--limit', type=int, default=None, help="Stop after this many reviews (the job can be resumed).")
+    parser.add_argument('--restart', action='store_true', help="Ignore the checkpoint and start from the first review.")
+    parser.add_argument('--workers', type=int, default=1, help="Analysis processes; this process remains the only writer.")
+    parser.add_argument('--torch-threads', type=int, default=None, help="Torch threads per analysis process (default: cores // workers).")
+    args = parser.parse_args(argv)
+
+    job_name = args.job or ('incremental' if args.incremental else 'full')
+    reanalyze(args.db, job_name, args.chunk_size, args.batch_size, args.limit, args.restart, args.workers, args.torch_threads,
+              args.incremental)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+# backend/response_cache.py
+# In-process cache for the read-only dashboard endpoints. Entries are keyed by path and query string and
+# tagged with the data version, a counter in the data_version table that every writer (crud, reanalyze,
+# ingest) bumps in the same transaction as its changes. A cached request costs one primary-key read of that
+# counter: the stored body is served while the version is unchanged, and a matching If-None-Match gets a
+# 304 without a body. Each worker process has its own cache, but the counter lives in the database, so a
+# review submitted through any worker invalidates all of them.
+#   ABSA_RESPONSE_CACHE_SIZE   cached responses per process (default 256, 0 disables the cache)
+
+import functools
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from flask import current_app, make_response, request
+from sqlalchemy import text as sql_text
+from backend import db
+
+CREATE_DATA_VERSION_SQL = """
+    CREATE TABLE IF NOT EXISTS data_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL
+    )
+"""
+
+# A database created by db.create_all() has the table but not the row; both statements cope with that
+DATA_VERSION_SQL = "SELECT COALESCE((SELECT version FROM data_version WHERE id = 1), 0)"
+
+BUMP_DATA_VERSION_SQL = """
+    INSERT INTO data_version (id, version) VALUES (1, 1)
+    ON CONFLICT (id) DO UPDATE SET version = version + 1
+"""
+
+
+def bump_data_version(conn):
+    # conn: a sqlite3 connection or the SQLAlchemy session; call inside the writer's transaction
+    conn.execute(BUMP_DATA_VERSION_SQL)
+
+
+class ResponseCache:
+    # LRU of (body, mimetype) for one data version; the first entry of a newer version drops the rest
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            if version != self._version or key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, version, entry):
+        with self._lock:
+            if self._version is not None and version < self._version: # Computed before a newer write was seen
+                return
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+
+response_cache = ResponseCache(int(os.environ.get('ABSA_RESPONSE_CACHE_SIZE', '256')))
+
+
+def _cache_key():
+    # Argument order does not matter: ?a=1&b=2 and ?b=2&a=1 share an entry
+    return request.path + '?' + '&'.join(f"{name}={value}" for name, value in sorted(request.args.items(multi=True)))
+
+
+def cached_response(view):
+    # Decorates a GET view whose JSON depends only on its URL and the database contents. Error responses
+    # are never cached.
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if response_cache.max_entries <= 0:
+            return view(*args, **kwargs)
+        version = db.session.execute(sql_text(DATA_VERSION_SQL)).scalar()
+        key = _cache_key()
+        etag = hashlib.sha1(f"{version}:{key}".encode()).hexdigest()[:20]
+
+        if request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+        else:
+            entry = response_cache.get(key, version)
+            if entry is None:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                entry = (response.get_data(), response.mimetype)
+                response_cache.put(key, version, entry)
+            response = current_app.response_class(entry[0], mimetype=entry[1])
+        # no-cache: browsers keep the body but revalidate it with If-None-Match on every load
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    return wrapper
@@ -0,0 +1,82 @@
+# backend/result_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with an optional time-to-live. Entries are stored under
+    (version, key), so bumping the version (new weights, new dictionary) makes every
+    older entry unreachable; clear() then frees their memory.
+    """
+
+    def __init__(self, name, max_entries=1024, ttl_seconds=3600):
+        self.name = name
+        self.max_entries = max(0, int(max_entries))
+        self.ttl = float(ttl_seconds) if ttl_seconds else None
+        self.version = None
+
+        self._entries = OrderedDict() # (version, key) -> (stored_at, value)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def get(self, key):
+        # Returns (True, value) on a hit and (False, None) on a miss
+        if not self.enabled:
+            return False, None
+        with self._lock:
+            entry_key = (self.version, key)
+            entry = self._entries.get(entry_key)
+            if entry is not None and (self.ttl is None or time.monotonic() - entry[0] <= self.ttl):
+                self._entries.move_to_end(entry_key)
+                self._hits += 1
+                return True, entry[1]
+            if entry is not None: # Expired
+                del self._entries[entry_key]
+            self._misses += 1
+            return False, None
+
+    def put(self, key, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            entry_key = (self.version, key)
+            self._entries[entry_key] = (time.monotonic(), value)
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, version):
+        # Switch to a new version and drop everything cached under the old one
+        with self._lock:
+            if version != self.version:
+                self._invalidations += 1
+            self.version = version
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'name': self.name,
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations,
+                'version': self.version,
+            }
@@ -0,0 +1,106 @@
+# backend/rollup.py
+# sentiment_rollup holds the number of AspectSentiments rows per (station_id, aspect_category,
+# sentiment_polarity, month) — month is the review's 'YYYY-MM' (AspectSentiments.review_month), or '' when
+# the review has no date. The dashboard aggregates read it instead of the whole AspectSentiments table, so
+# their cost depends on the number of stations, categories and months, not on the number of aspect rows.
+# Writers keep it current in the same transaction as their AspectSentiments changes (apply_rollup_delta);
+# it can always be rebuilt from scratch. Run from the repository root:
+#   python -m backend.rollup --db data/mrt_reviews_copy.db            # rebuild
+#   python -m backend.rollup --db data/mrt_reviews_copy.db --check    # compare with a fresh aggregation
+# The module itself imports only the standard library (the CLI's rebuild also uses backend.response_cache);
+# the SQL runs on sqlite3 connections and through SQLAlchemy's text() alike.
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+
+CREATE_ROLLUP_SQL = """
+    CREATE TABLE IF NOT EXISTS sentiment_rollup (
+        station_id INTEGER NOT NULL,
+        aspect_category VARCHAR(255) NOT NULL,
+        sentiment_polarity VARCHAR(50) NOT NULL,
+        month VARCHAR(7) NOT NULL,
+        aspect_count INTEGER NOT NULL,
+        PRIMARY KEY (station_id, aspect_category, sentiment_polarity, month)
+    ) WITHOUT ROWID
+"""
+
+_AGGREGATE_SQL = """
+    SELECT a.station_id, a.aspect_category, a.sentiment_polarity, COALESCE(a.review_month, '') AS month, {count} AS aspect_count
+    FROM AspectSentiments a
+    WHERE {where}
+    GROUP BY a.station_id, a.aspect_category, a.sentiment_polarity, month
+"""
+
+# :review_ids is a JSON list; :analysis_method NULL means every row of those reviews; :sign is 1 after
+# inserting rows and -1 before deleting them
+ROLLUP_DELTA_SQL = "INSERT INTO sentiment_rollup (station_id, aspect_category, sentiment_polarity, month, aspect_count)" + _AGGREGATE_SQL.format(
+    count=":sign * COUNT(*)",
+    where="a.review_id IN (SELECT value FROM json_each(:review_ids)) AND (:analysis_method IS NULL OR a.analysis_method = :analysis_method)",
+) + """
+    ON CONFLICT (station_id, aspect_category, sentiment_polarity, month)
+    DO UPDATE SET aspect_count = aspect_count + excluded.aspect_count
+"""
+
+DELETE_EMPTY_SQL = "DELETE FROM sentiment_rollup WHERE aspect_count = 0"
+
+REBUILD_SQL = "INSERT INTO sentiment_rollup (station_id, aspect_category, sentiment_polarity, month, aspect_count)" + _AGGREGATE_SQL.format(
+    count="COUNT(*)", where="1")
+
+
+def rollup_delta_params(review_ids, sign, analysis_method=None):
+    return {'review_ids': json.dumps(list(review_ids)), 'sign': sign, 'analysis_method': analysis_method}
+
+def apply_rollup_delta(conn, review_ids, sign, analysis_method=None):
+    # Adds (sign=1, after inserting) or removes (sign=-1, before deleting) the aspect rows of review_ids
+    conn.execute(ROLLUP_DELTA_SQL, rollup_delta_params(review_ids, sign, analysis_method))
+    if sign < 0:
+        conn.execute(DELETE_EMPTY_SQL)
+
+def rebuild_rollup(conn):
+    # Caller owns the transaction
+    conn.execute(CREATE_ROLLUP_SQL)
+    conn.execute("DELETE FROM sentiment_rollup")
+    conn.execute(REBUILD_SQL)
+
+def rollup_differences(conn):
+    # Keys whose stored count differs from a fresh aggregation: [(key, stored, actual)]
+    actual = {tuple(row[:4]): row[4] for row in conn.execute(_AGGREGATE_SQL.format(count="COUNT(*)", where="1"))}
+    stored = {tuple(row[:4]): row[4] for row in conn.execute(
+        "SELECT station_id, aspect_category, sentiment_polarity, month, aspect_count FROM sentiment_rollup")}
+    return [(key, stored.get(key, 0), actual.get(key, 0)) for key in sorted(set(actual) | set(stored), key=str)
+            if stored.get(key, 0) != actual.get(key, 0)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild or check the sentiment_rollup table.")
+    parser.add_argument('--db', default=os.environ.get('ABSA_DB_PATH', os.path.join('data', 'mrt_reviews_copy.db')))
+    parser.add_argument('--check', action='store_true', help="Only compare the rollup with AspectSentiments.")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    try:
+        if args.check:
+            differences = rollup_differences(conn)
+            for key, stored, actual in differences[:20]:
+                print(f"{key}: rollup {stored}, AspectSentiments {actual}")
+            print(f"{len(differences)} rollup entries differ." if differences else "Rollup matches AspectSentiments.")
+            if differences:
+                sys.exit(1)
+        else:
+            from backend.response_cache import CREATE_DATA_VERSION_SQL, bump_data_version
+            with conn:
+                rebuild_rollup(conn)
+                # Cached dashboard responses (and their ETags) were computed from the old rollup
+                conn.execute(CREATE_DATA_VERSION_SQL)
+                bump_data_version(conn)
+            total, entries = conn.execute("SELECT COALESCE(SUM(aspect_count), 0), COUNT(*) FROM sentiment_rollup").fetchone()
+            print(f"Rebuilt sentiment_rollup: {entries} entries covering {total} aspect rows.")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -3,8 +3,11 @@
 from flask import Blueprint, render_template, request, jsonify
 from . import crud
 from backend import db
-from backend.models import Station, AspectSentiments, Review
+from backend.models import Station, AspectSentiments, Review, SentimentRollup
+from backend.response_cache import cached_response
 from sqlalchemy import func
+from datetime import datetime
+import re
 import traceback # Import traceback for more detailed server-side error logging
 
 
@@ -39,12 +42,40 @@ def submit_review():
             'review_id': review.reviews_id,
             'analyzed_aspects': analyzed_aspects
         })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except crud.InferenceUnavailableError as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         print("❌ Error submitting review:", e)
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
 
+@bp.route('/api/reviews/batch', methods=['POST'])
+def submit_reviews_batch():
+    # {'reviews': [{'stationId', 'review', 'analyzedAspects' (optional)}]}, written in one transaction
+    data = request.get_json(silent=True)
+    if not data or 'reviews' not in data:
+        return jsonify({'error': 'Missing reviews'}), 400
+
+    try:
+        review_ids, analyzed_aspects = crud.create_station_reviews_batch(data['reviews'])
+        return jsonify({
+            'message': f'{len(review_ids)} reviews submitted successfully!',
+            'review_ids': review_ids,
+            'analyzed_aspects': analyzed_aspects
+        })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except crud.InferenceUnavailableError as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        print("❌ Error submitting reviews:", e)
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+
 @bp.route('/api/stations', methods=['GET'])
 def get_stations():
     try:
@@ -61,76 +92,34 @@ def get_stations():
 
 
 @bp.route('/api/station_sentiment/<int:station_id>', methods=['GET'])
+@cached_response
 def get_station_sentiment(station_id):
     try:
-        target_aspects = ['cleanliness', 'comfort', 'safety', 'service', 'facilities', 'other/uncategorized']
-        sentiment_data = {}
-        overall_total_reviews = 0 # Initialize overall total
-
-        # Initialize all aspect categories with counts and total
-        for aspect in target_aspects:
-            sentiment_data[aspect] = {
-                'Positive': 0,
-                'Negative': 0,
-                'Neutral': 0,
-                'total': 0    # This will be the direct count per aspect category
-            }
-
-        # Query for counts by aspect_category and sentiment_polarity
-        polarity_results = db.session.query(
-            AspectSentiments.aspect_category,
-            AspectSentiments.sentiment_polarity,
-            db.func.count(AspectSentiments.aspect_sentiment_id)
-        ).filter(
-            AspectSentiments.station_id == station_id
-        ).group_by(
-            AspectSentiments.aspect_category,
-            AspectSentiments.sentiment_polarity
-        ).all()
-
-        # Populate polarity counts and sum for 'total' from polarity_results
-        for aspect_category, sentiment_polarity, count in polarity_results:
-            normalized_aspect = aspect_category.lower()
-            if normalized_aspect == 'other':
-                normalized_aspect = 'other/uncategorized'
-
-            if normalized_aspect in sentiment_data:
-                capitalized_polarity = sentiment_polarity.capitalize()
-                if capitalized_polarity in sentiment_data[normalized_aspect]:
-                    sentiment_data[normalized_aspect][capitalized_polarity] += count
-            else:
-                print(f"Warning: Untracked aspect category '{aspect_category}' for station {station_id}")
-
-        # Query for raw total count per aspect (to match your DB filter)
-        raw_total_results = db.session.query(
-            AspectSentiments.aspect_category,
-            db.func.count(AspectSentiments.aspect_sentiment_id)
-        ).filter(
-            AspectSentiments.station_id == station_id
-        ).group_by(
-            AspectSentiments.aspect_category
-        ).all()
-
-        # Update the 'total' field for each aspect with the raw count and sum for overall_total_reviews
-        for category, count in raw_total_results:
-            normalized_category = category.lower()
-            if normalized_category == 'other':
-                normalized_category = 'other/uncategorized'
-
-            if normalized_category in sentiment_data:
-                sentiment_data[normalized_category]['total'] = count # Overwrite with raw count
-                overall_total_reviews += count # Add to the overall total
-
         # Return both the detailed aspect data and the overall total
-        return jsonify({
-            'aspect_data': sentiment_data,
-            'overall_total_reviews': overall_total_reviews
-        })
+        return jsonify(crud.get_station_sentiments([station_id])[station_id])
 
     except Exception as e:
         print(f"Error fetching station sentiment for station_id {station_id}: {e}")
         return jsonify({"error": str(e)}), 500
 
+# Every station's breakdown from one query (?station_ids=1,2,3 for a subset), instead of one request per station
+@bp.route('/api/station_sentiment', methods=['GET'])
+@cached_response
+def get_all_station_sentiments():
+    try:
+        # Absent: every station. Present but empty (e.g. ?station_ids=,): an empty subset, so no stations
+        station_ids = request.args.get('station_ids')
+        if station_ids is not None:
+            try:
+                station_ids = [int(station_id) for station_id in station_ids.split(',') if station_id.strip()]
+            except ValueError:
+                return jsonify({"error": "station_ids must be a comma-separated list of integers"}), 400
+        return jsonify({'stations': crud.get_all_station_sentiments(station_ids)})
+    except Exception as e:
+        print(f"Error fetching station sentiments: {e}")
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
 # NEW ROUTE: For analyzing review without saving
 @bp.route('/api/analyze_review', methods=['POST'])
 def analyze_review_endpoint():
@@ -146,14 +135,32 @@ def analyze_review_endpoint():
             'message': 'Review analyzed successfully!',
             'analyzed_aspects': analyzed_aspects
         })
+    except crud.InferenceUnavailableError as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         print("❌ Error analyzing review:", e)
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+# Micro-batching metrics for the inference endpoints (queue depth, batch sizes, wait times)
+@bp.route('/api/inference/metrics', methods=['GET'])
+def inference_metrics():
+    try:
+        return jsonify(crud.get_inference_metrics())
+    except Exception as e:
+        print(f"Error fetching inference metrics: {e}")
+        return jsonify({"error": str(e)}), 500
+
+# Readiness of the inference models; returns 503 until they are loaded so load balancers can wait for it
+@bp.route('/api/health/ready', methods=['GET'])
+def health_ready():
+    status = crud.get_model_load_status()
+    return jsonify(status), 200 if status['ready'] else 503
+
 # --- NEW DASHBOARD ENDPOINTS ---
 
 @bp.route('/api/dashboard/overall_sentiment', methods=['GET'])
+@cached_response
 def get_overall_sentiment():
     try:
         data = crud.get_overall_sentiment_distribution()
@@ -163,6 +170,7 @@ def get_overall_sentiment():
         return jsonify({"error": str(e)}), 500
 
 @bp.route('/api/dashboard/aspect_sentiment', methods=['GET'])
+@cached_response
 def get_aspect_sentiment():
     try:
         data = crud.get_sentiment_by_aspect_category()
@@ -172,6 +180,7 @@ def get_aspect_sentiment():
         return jsonify({"error": str(e)}), 500
 
 @bp.route('/api/dashboard/top_aspects', methods=['GET'])
+@cached_response
 def get_top_aspects():
     try:
         data = crud.get_top_n_aspects()
@@ -181,6 +190,7 @@ def get_top_aspects():
         return jsonify({"error": str(e)}), 500
 
 @bp.route('/api/dashboard/station_comparison', methods=['GET'])
+@cached_response
 def get_station_comparison():
     try:
         data = crud.get_station_sentiment_comparison()
@@ -190,8 +200,25 @@ def get_station_comparison():
         return jsonify({"error": str(e)}), 500
 
 
+# Every panel above (and the totals below) in one response from one aggregate read; ?fields=a,b limits the panels
+@bp.route('/api/dashboard/summary', methods=['GET'])
+@cached_response
+def get_dashboard_summary():
+    try:
+        fields = request.args.get('fields')
+        fields = [field.strip() for field in fields.split(',') if field.strip()] if fields else None
+        return jsonify(crud.get_dashboard_summary(fields))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error fetching dashboard summary: {e}")
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
 # NEW ROUTE: Get total reviews for all stations (Already exists, good!)
 @bp.route('/api/total_reviews_all_stations', methods=['GET'])
+@cached_response
 def get_total_reviews_all_stations_route():
     try:
         total = crud.get_total_reviews_all_stations()
@@ -202,40 +229,70 @@ def get_total_reviews_all_stations_route():
 
 # NEW ROUTE: Get overall positive sentiment percentage for quick insight
 @bp.route('/api/overall_positive_sentiment_percentage', methods=['GET'])
+@cached_response
 def get_overall_positive_sentiment_percentage():
     try:
-        # Query total positive, neutral, and negative sentiments
-        sentiment_counts = db.session.query(
-            AspectSentiments.sentiment_polarity,
-            func.count(AspectSentiments.sentiment_polarity)
-        ).group_by(AspectSentiments.sentiment_polarity).all()
-
-        total_sentiments = sum(count for _, count in sentiment_counts)
-        positive_sentiments = next((count for polarity, count in sentiment_counts if polarity.lower() == 'positive'), 0)
-
-        if total_sentiments == 0:
-            percentage = 0
-        else:
-            percentage = (positive_sentiments / total_sentiments) * 100
-
-        return jsonify({'positive_sentiment_percentage': round(percentage, 2)})
+        percentage = crud.get_overall_positive_sentiment_percentage()
+        return jsonify({'positive_sentiment_percentage': percentage})
     except Exception as e:
         print(f"Error fetching overall positive sentiment percentage: {e}")
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
 
+def _time_series_filters(allow_aspect=True):
+    # Optional filters of the time-series endpoints: ?station_id=4, ?aspect=cleanliness and an inclusive month
+    # range ?start=2024-01&end=2024-12 (a full date is cut to its month). Raises ValueError for bad values.
+    filters = {}
+    if request.args.get('station_id'):
+        if not request.args['station_id'].isdigit():
+            raise ValueError("station_id must be an integer")
+        filters['station_id'] = int(request.args['station_id'])
+    if request.args.get('aspect'):
+        if not allow_aspect:
+            raise ValueError("aspect is not supported by this endpoint")
+        filters['aspect'] = request.args['aspect'].strip().lower()
+    for bound in ('start', 'end'):
+        if request.args.get(bound):
+            value = request.args[bound]
+            # The regex fixes the shape (strptime also takes '2024-1'), strptime the ranges ('2024-13', '2024-02-30')
+            try:
+                if not re.fullmatch(r'\d{4}-\d{2}(-\d{2})?', value):
+                    raise ValueError
+                datetime.strptime(value, '%Y-%m-%d' if len(value) == 10 else '%Y-%m')
+            except ValueError:
+                raise ValueError(f"{bound} must be a valid month (YYYY-MM) or date (YYYY-MM-DD)") from None
+            filters[bound] = value[:7]
+    return filters
+
+def _filter_rollup(query, filters):
+    # Station (and aspect) filters use the rollup's primary key, month ranges ix_sentiment_rollup_month_category
+    if 'station_id' in filters:
+        query = query.filter(SentimentRollup.station_id == filters['station_id'])
+    if 'aspect' in filters:
+        query = query.filter(SentimentRollup.aspect_category == filters['aspect'])
+    if 'start' in filters:
+        query = query.filter(SentimentRollup.month >= filters['start'])
+    if 'end' in filters:
+        query = query.filter(SentimentRollup.month <= filters['end'])
+    return query
+
+
 @bp.route('/api/trend/aspect_sentiment', methods=['GET'])
+@cached_response
 def get_aspect_sentiment_trend():
     try:
-        results = db.session.query(
-            func.strftime('%Y-%m', Review.precise_review_datetime).label("month"),
-            AspectSentiments.aspect_category,
-            AspectSentiments.sentiment_polarity,
-            func.count().label("count")
-        ).join(Review, AspectSentiments.review_id == Review.reviews_id) \
-         .group_by("month", AspectSentiments.aspect_category, AspectSentiments.sentiment_polarity) \
-         .order_by("month").all()
+        # Months come precomputed from the rollup; undated reviews ('') have no month to show
+        query = db.session.query(
+            SentimentRollup.month,
+            SentimentRollup.aspect_category,
+            SentimentRollup.sentiment_polarity,
+            func.sum(SentimentRollup.aspect_count).label("count")
+        ).filter(
+            SentimentRollup.month != ''
+        )
+        results = _filter_rollup(query, _time_series_filters()).group_by(SentimentRollup.month, SentimentRollup.aspect_category, SentimentRollup.sentiment_polarity) \
+         .order_by(SentimentRollup.month).all()
 
         trend_data = {}
         for month, aspect, polarity, count in results:
@@ -245,24 +302,38 @@ def get_aspect_sentiment_trend():
             trend_data[month][key] = count
 
         return jsonify(trend_data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 # NEW: Endpoint for overall review counts over time
 @bp.route('/api/dashboard/reviews_over_time', methods=['GET'])
+@cached_response
 def get_reviews_over_time():
     try:
-        results = db.session.query(
-            func.strftime('%Y', Review.precise_review_datetime).label("year"), # Changed from %Y-%m to %Y, and label from month to year
-            func.count(Review.reviews_id).label("review_count")
+        # review_year / review_month are stored and indexed (ix_reviews_year_month, ix_reviews_station_year_month)
+        filters = _time_series_filters(allow_aspect=False)
+        query = db.session.query(
+            Review.review_year.label("year"),
+            func.count().label("review_count")
         ).filter(
-            Review.precise_review_datetime.isnot(None) # Exclude null dates
-        ).group_by("year") \
-         .order_by("year").all()
-
-        data = {year: count for year, count in results} # Changed from month to year
+            Review.review_year.isnot(None) # Exclude null dates
+        )
+        if 'station_id' in filters:
+            query = query.filter(Review.station_id == filters['station_id'])
+        # The year bounds let the month range use the (year, month) indexes
+        if 'start' in filters:
+            query = query.filter(Review.review_year >= filters['start'][:4], Review.review_month >= filters['start'])
+        if 'end' in filters:
+            query = query.filter(Review.review_year <= filters['end'][:4], Review.review_month <= filters['end'])
+        results = query.group_by(Review.review_year).order_by(Review.review_year).all()
+
+        data = {year: count for year, count in results}
         return jsonify(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Error fetching reviews over time: {e}")
         traceback.print_exc()
@@ -271,17 +342,18 @@ def get_reviews_over_time():
 
 # NEW: Endpoint for sentiment counts over time (for stacked bar chart)
 @bp.route('/api/dashboard/sentiment_counts_over_time', methods=['GET'])
+@cached_response
 def get_sentiment_counts_over_time():
     try:
-        results = db.session.query(
-            func.strftime('%Y-%m', Review.precise_review_datetime).label("month"),
-            AspectSentiments.sentiment_polarity,
-            func.count(AspectSentiments.aspect_sentiment_id).label("count")
-        ).join(Review, AspectSentiments.review_id == Review.reviews_id) \
-         .filter(
-            Review.precise_review_datetime.isnot(None)
-         ).group_by("month", AspectSentiments.sentiment_polarity) \
-         .order_by("month", AspectSentiments.sentiment_polarity).all()
+        query = db.session.query(
+            SentimentRollup.month,
+            SentimentRollup.sentiment_polarity,
+            func.sum(SentimentRollup.aspect_count).label("count")
+        ).filter(
+            SentimentRollup.month != '' # Reviews without a date
+        )
+        results = _filter_rollup(query, _time_series_filters()).group_by(SentimentRollup.month, SentimentRollup.sentiment_polarity) \
+         .order_by(SentimentRollup.month, SentimentRollup.sentiment_polarity).all()
 
         # Transform data into a format suitable for the frontend
         # { "month1": { "positive": X, "neutral": Y, "negative": Z }, "month2": ... }
@@ -302,6 +374,8 @@ def get_sentiment_counts_over_time():
             }
 
         return jsonify(final_data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Error fetching sentiment counts over time: {e}")
         traceback.print_exc()
@@ -310,6 +384,7 @@ def get_sentiment_counts_over_time():
 
 # in routes.py
 @bp.route("/api/dashboard/latest_reviews", methods=["GET"])
+@cached_response
 def get_latest_reviews():
     db_session = db.session
     results = (
@@ -324,6 +399,7 @@ def get_latest_reviews():
     return jsonify({"reviews": reviews})
 
 @bp.route('/api/overall_sentiment_analysis', methods=['GET'])
+@cached_response
 def overall_sentiment_analysis():
     try:
         data = crud.get_overall_sentiment_analysis()
@@ -334,19 +410,10 @@ def overall_sentiment_analysis():
 
 # NEW ROUTE for total reviews by station
 @bp.route('/api/dashboard/total_reviews_by_station', methods=['GET'])
+@cached_response
 def get_total_reviews_by_station():
     try:
-        results = db.session.query(
-            Station.station_name,
-            func.count(AspectSentiments.aspect_sentiment_id).label('total_reviews')
-        ).join(AspectSentiments, Station.station_id == AspectSentiments.station_id) \
-         .group_by(Station.station_name) \
-         .order_by(Station.station_name).all()
-
-        data = {
-            'labels': [r.station_name for r in results],
-            'total_reviews': [r.total_reviews for r in results]
-        }
+        data = crud.get_total_reviews_by_station()
         return jsonify(data)
     except Exception as e:
         print(f"Error fetching total reviews by station: {e}")
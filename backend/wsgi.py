@@ -0,0 +1,21 @@
+# backend/wsgi.py
+# Production entry point (Linux/macOS), served by gunicorn with backend/gunicorn.conf.py:
+#   gunicorn -c backend/gunicorn.conf.py backend.wsgi:app
+# The config preloads this module in the master process, so the models are loaded once and every
+# forked worker shares the weight pages copy-on-write. backend/app.py remains the development server.
+import os
+from flask_cors import CORS
+
+# Load the models now, in the master, rather than on a warm-up thread (threads do not survive fork)
+os.environ.setdefault('ABSA_MODEL_LOADING', 'eager')
+
+from backend import create_app, db
+
+app = create_app()
+CORS(app)
+
+with app.app_context():
+    db.create_all()
+    # A pooled SQLite connection must not be shared across fork; every worker opens its own
+    for engine in db.engines.values():
+        engine.dispose()
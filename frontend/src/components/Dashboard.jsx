@@ -16,12 +16,9 @@ import { Pie, Bar, Line } from 'react-chartjs-2';
 
 // Import the new dashboard API calls, including getTotalReviewsByStationData
 import {
-  getOverallSentimentData,
-  getAspectSentimentData,
-  getStationComparisonData,
+  getDashboardSummary,
   getReviewsOverTimeData,
-  getSentimentCountsOverTimeData,
-  getTotalReviewsByStationData // New import for total reviews by station
+  getSentimentCountsOverTimeData
 } from '../utils/db'; // Removed .js extension to resolve the import error
 
 // Register Chart.js components
@@ -66,28 +63,23 @@ const Dashboard = ({ darkMode, toggleDarkMode }) => {
     const fetchData = async () => {
       try {
         setLoading(true); // Set loading to true before fetching
+        // The count panels come together from the summary endpoint; the time series have their own
         const [
-          overallRes,
-          aspectRes,
-          stationCompRes,
+          summary,
           reviewsTimeRes,
-          sentimentCountsTimeRes,
-          totalReviewsStationData // Fetch new data
+          sentimentCountsTimeRes
         ] = await Promise.all([
-          getOverallSentimentData(),
-          getAspectSentimentData(),
-          getStationComparisonData(),
+          getDashboardSummary(['overall_sentiment', 'aspect_sentiment', 'station_comparison', 'total_reviews_by_station']),
           getReviewsOverTimeData(),
-          getSentimentCountsOverTimeData(),
-          getTotalReviewsByStationData() // Call new function
+          getSentimentCountsOverTimeData()
         ]);
 
-        setOverallSentiment(overallRes);
-        setAspectSentiment(aspectRes);
-        setStationComparison(stationCompRes);
+        setOverallSentiment(summary.overall_sentiment);
+        setAspectSentiment(summary.aspect_sentiment);
+        setStationComparison(summary.station_comparison);
         setReviewsOverTime(reviewsTimeRes);
         setSentimentCountsOverTime(sentimentCountsTimeRes);
-        setTotalReviewsByStation(totalReviewsStationData); // Set new state
+        setTotalReviewsByStation(summary.total_reviews_by_station);
 
       } catch (err) {
         console.error("Failed to fetch dashboard data:", err);
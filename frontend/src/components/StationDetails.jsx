@@ -4,7 +4,7 @@ import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { Chart as ChartJS, ArcElement, Tooltip, Legend } from 'chart.js';
 import { Pie } from 'react-chartjs-2';
-import { getAllStations, getTotalReviewsAllStations, getOverallSentimentAnalysis, getStationSentimentAnalysis } from '../utils/db'; // Import new function
+import { getAllStations, getTotalReviewsAllStations, getOverallSentimentAnalysis, getStationSentimentAnalysis, getAllStationSentiments } from '../utils/db'; // Import new function
 import VerticalStationSelector from "./VerticalStationSelector";
 
 // Register Chart.js components
@@ -18,6 +18,7 @@ const StationDetails = () => {
   const [errorMessage, setErrorMessage] = useState('');
   const [overallStationTotal, setOverallStationTotal] = useState(0); // Total reviews for a specific station OR all stations
   const [allStationsTotalReviews, setAllStationsTotalReviews] = useState(null); // Total reviews across all stations (for initial display)
+  const [stationSentiments, setStationSentiments] = useState({}); // Breakdown per station_id, loaded once for every station
 
 
   useEffect(() => {
@@ -34,6 +35,13 @@ const StationDetails = () => {
         console.error('Error fetching initial data:', error);
         setErrorMessage('Failed to load initial data (stations or total reviews).');
       }
+      try {
+        // Switching stations then needs no request; without it each station is fetched on selection
+        const breakdowns = await getAllStationSentiments();
+        setStationSentiments(Object.fromEntries(breakdowns.map(station => [String(station.station_id), station])));
+      } catch (error) {
+        console.error('Error prefetching station sentiments:', error);
+      }
     };
     fetchData();
   }, []);
@@ -50,6 +58,8 @@ const StationDetails = () => {
         let data;
         if (selectedStationId === 'all_stations') {
           data = await getOverallSentimentAnalysis(); // Call new function for overall data
+        } else if (stationSentiments[String(selectedStationId)]) {
+          data = stationSentiments[String(selectedStationId)]; // Already loaded with every other station
         } else if (selectedStationId) {
           data = await getStationSentimentAnalysis(selectedStationId); // Call existing function for single station
         } else {
@@ -79,7 +89,7 @@ const StationDetails = () => {
     };
 
     loadSentiment();
-  }, [selectedStationId]); // Dependency array includes selectedStationId
+  }, [selectedStationId, stationSentiments]); // Dependency array includes selectedStationId
 
   const aspects = [
     { id: 'cleanliness', label: 'Cleanliness' },
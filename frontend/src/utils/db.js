@@ -46,6 +46,21 @@ export async function getStationSentimentAnalysis(stationId) {
   }
 }
 
+// Sentiment breakdown of every station (or of stationIds) in one request; each entry has station_id,
+// station_name, aspect_data and overall_total_reviews like getStationSentimentAnalysis
+export async function getAllStationSentiments(stationIds) {
+  try {
+    const query = stationIds && stationIds.length ? `?station_ids=${stationIds.join(',')}` : '';
+    const response = await fetch(`${API_BASE_URL}/station_sentiment${query}`);
+    if (!response.ok) throw new Error(`Failed to fetch station sentiments: ${response.status} ${response.statusText}`);
+    const data = await response.json();
+    return data.stations;
+  } catch (error) {
+    console.error('Error fetching station sentiments:', error);
+    throw error;
+  }
+}
+
 // Submit a new review
 export async function submitReview(stationId, review, analyzedAspects) { // Added analyzedAspects
   try {
@@ -243,10 +258,17 @@ export async function getOverallSentimentAnalysis() {
   }
 }
 
+// Optional filters for the time series: { station_id, aspect, start, end } (months as 'YYYY-MM', inclusive)
+function timeSeriesQuery(filters = {}) {
+  const params = new URLSearchParams(Object.entries(filters).filter(([, value]) => value !== undefined && value !== null && value !== ''));
+  const query = params.toString();
+  return query ? `?${query}` : '';
+}
+
 // NEW API Call for Number of Reviews Over Time (Graph 1)
-export async function getReviewsOverTimeData() {
+export async function getReviewsOverTimeData(filters) { // aspect is not supported here
   try {
-    const response = await fetch(`${API_BASE_URL}/dashboard/reviews_over_time`);
+    const response = await fetch(`${API_BASE_URL}/dashboard/reviews_over_time${timeSeriesQuery(filters)}`);
     if (!response.ok) throw new Error(`Failed to fetch reviews over time: ${response.statusText}`);
     const data = await response.json();
     console.log('Reviews Over Time Data:', data);
@@ -258,9 +280,9 @@ export async function getReviewsOverTimeData() {
 }
 
 // NEW API Call for Sentiment Counts Over Time (Graph 2 Stacked Bar Chart)
-export async function getSentimentCountsOverTimeData() {
+export async function getSentimentCountsOverTimeData(filters) {
   try {
-    const response = await fetch(`${API_BASE_URL}/dashboard/sentiment_counts_over_time`);
+    const response = await fetch(`${API_BASE_URL}/dashboard/sentiment_counts_over_time${timeSeriesQuery(filters)}`);
     if (!response.ok) throw new Error(`Failed to fetch sentiment counts over time: ${response.statusText}`);
     const data = await response.json();
     console.log('Sentiment Counts Over Time Data:', data);
@@ -283,4 +305,20 @@ export async function getTotalReviewsByStationData() {
         console.error('Error fetching total reviews by station data:', error);
         throw error;
     }
-}
\ No newline at end of file
+}
+
+// Several dashboard panels in one request, e.g. getDashboardSummary(['overall_sentiment', 'station_comparison']).
+// Each field holds the same data as the panel's own endpoint; omit fields to get all of them
+export async function getDashboardSummary(fields) {
+    try {
+        const query = fields && fields.length ? `?fields=${fields.join(',')}` : '';
+        const response = await fetch(`${API_BASE_URL}/dashboard/summary${query}`);
+        if (!response.ok) throw new Error(`Failed to fetch dashboard summary: ${response.statusText}`);
+        const data = await response.json();
+        console.log('Dashboard Summary Data:', data);
+        return data;
+    } catch (error) {
+        console.error('Error fetching dashboard summary data:', error);
+        throw error;
+    }
+}
@@ -0,0 +1,53 @@
+# tests/conftest.py
+# Run from the repository root: python -m pytest -q
+
+import sqlite3
+
+import pytest
+
+from backend import create_app, db
+from backend.rollup import rebuild_rollup
+
+STATIONS = ['Ang Mo Kio', 'Bishan', 'City Hall', 'Dhoby Ghaut']
+CATEGORIES = ['cleanliness', 'crowdedness', 'service', 'facilities']
+POLARITIES = ['Positive', 'Neutral', 'Negative']
+
+
+def build_fixture_db(db_path, reviews_per_station=30):
+    # A small database with the current schema (db.create_all) and reviews spread over two years, with the
+    # rollup built the way the migrations build it
+    app = create_app(load_models=False, service_mode='dashboard', db_path=str(db_path))
+    with app.app_context():
+        db.create_all()
+        for engine in db.engines.values():
+            engine.dispose()
+
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            for number, station_name in enumerate(STATIONS):
+                station_id = conn.execute("INSERT INTO stations (station_name) VALUES (?)", (station_name,)).lastrowid
+                for index in range(reviews_per_station):
+                    month = f"{2023 + index % 2}-{index % 12 + 1:02d}"
+                    review_id = conn.execute("""
+                        INSERT INTO reviews (station_id, review_date, raw_reviews, station_name, precise_review_datetime,
+                                             is_estimated_date, review_month, review_year)
+                        VALUES (?, ?, ?, ?, ?, 0, ?, ?)
+                    """, (station_id, f"{month}-15", f"Review {index} of {station_name}", station_name,
+                          f"{month}-15 08:00:00.000000", month, month[:4])).lastrowid
+                    for aspect in range(1 + index % 3):
+                        conn.execute("""
+                            INSERT INTO AspectSentiments (review_id, station_id, segment_index, segment_text, aspect_category,
+                                                          sentiment_polarity, extracted_aspect_term, analysis_method, review_month)
+                            VALUES (?, ?, 0, ?, ?, ?, ?, 'Hybrid', ?)
+                        """, (review_id, station_id, f"Review {index}", CATEGORIES[(index + aspect) % len(CATEGORIES)],
+                              POLARITIES[(index + number + aspect) % len(POLARITIES)], 'platform', month))
+            rebuild_rollup(conn)
+    finally:
+        conn.close()
+    return db_path
+
+
+@pytest.fixture
+def fixture_db(tmp_path):
+    return build_fixture_db(tmp_path / 'fixture.db')
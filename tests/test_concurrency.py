@@ -0,0 +1,32 @@
+# tests/test_concurrency.py
+# Review submissions and dashboard reads from separate processes at the same time, as gunicorn workers would
+# send them (see benchmarks.benchmark_concurrency): no request may fail and no acknowledged write may be lost.
+
+import contextlib
+import os
+import sqlite3
+
+import pytest
+
+from backend.benchmarks import SQLITE_SETTINGS, run_concurrency_workers
+from backend.rollup import rollup_differences
+
+
+def _review_count(db_path):
+    with contextlib.closing(sqlite3.connect(db_path)) as conn:
+        return conn.execute("SELECT COUNT(*) FROM reviews").fetchone()[0]
+
+
+@pytest.mark.parametrize('setting', ['wal', 'wal-readonly-dashboard'])
+def test_concurrent_writes_and_dashboard_reads(fixture_db, setting):
+    reviews_before = _review_count(fixture_db)
+
+    results = run_concurrency_workers(fixture_db, writers=3, readers=3, duration=3.0,
+                                      environment={**os.environ, **SQLITE_SETTINGS[setting]}, start_delay=5.0)
+    (written, writer_errors), (read, reader_errors) = results['writer'], results['reader']
+
+    assert writer_errors == {} and reader_errors == {} # e.g. no 'database is locked'
+    assert written and read
+    assert _review_count(fixture_db) == reviews_before + len(written)
+    with contextlib.closing(sqlite3.connect(fixture_db)) as conn:
+        assert rollup_differences(conn) == []
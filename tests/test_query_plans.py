@@ -0,0 +1,16 @@
+# tests/test_query_plans.py
+# Every dashboard query must use an index (see backend/query_plans.py)
+
+import os
+
+from backend.query_plans import check_query_plans
+
+
+def test_dashboard_queries_use_an_index(fixture_db):
+    assert check_query_plans(str(fixture_db)) == []
+
+
+def test_check_query_plans_leaves_the_environment_alone(fixture_db, monkeypatch):
+    monkeypatch.setenv('ABSA_DB_PATH', '/nonexistent/other.db')
+    check_query_plans(str(fixture_db))
+    assert os.environ['ABSA_DB_PATH'] == '/nonexistent/other.db'